@@ -0,0 +1,6 @@
+# backend/__main__.py
+import sys
+
+from backend.cli import main
+
+sys.exit(main())
@@ -1,52 +1,182 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify
 from flask_cors import CORS
 from io import StringIO
 import sys
+import time
 import uuid
 
 from backend.lexer import lexer
 from backend.parser import Parser
+from backend.optimiser import optimise
 
 from backend.interpreter.runtime import make_runtime, RuntimeErrorMS
 from backend.interpreter.evaluator import Evaluator
-from backend.interpreter.debugger import Debugger
+from backend.interpreter.transpiler import CompiledEvaluator
 from backend.errors import format_error
+from backend.debug_channel import DebugChannel
+from backend.metrics import REGISTRY, CONTENT_TYPE
 
 app = Flask(__name__)
 CORS(app, resources={r"/*": {"origins": "*"}})
 
 SESSIONS = {}         # { session_id: {"runtime": Runtime, "evaluator": Evaluator, "buffer": ""} }
-DEBUG_SESSIONS = {}   # { session_id: {"debugger": Debugger, "ast": Program} }
-
-
-def _eval_with_capture(code, runtime=None, evaluator=None):
+DEBUG_SESSIONS = {}   # { session_id: {"debugger": Debugger, "ast": Program, "channel": DebugChannel} }
+
+PHASE_SECONDS = REGISTRY.histogram(
+    "microscript_phase_seconds", "Durée des phases d'exécution d'un script.", ["phase"])
+STATEMENTS = REGISTRY.counter(
+    "microscript_statements_total", "Statements exécutés.")
+SCRIPT_ERRORS = REGISTRY.counter(
+    "microscript_script_errors_total", "Erreurs de script par type et phase.", ["type", "phase"])
+OUTPUT_BYTES = REGISTRY.counter(
+    "microscript_output_bytes_total", "Octets de sortie produits par les scripts.")
+REQUEST_SECONDS = REGISTRY.histogram(
+    "microscript_http_request_seconds", "Durée des requêtes HTTP par endpoint.", ["endpoint"])
+REQUESTS = REGISTRY.counter(
+    "microscript_http_requests_total", "Requêtes HTTP par endpoint et statut.", ["endpoint", "status"])
+# moteurs sélectionnables par /run : arbre (défaut) ou transpilation vers Python
+ENGINES = {"tree": Evaluator, "compiled": CompiledEvaluator}
+
+REGISTRY.gauge(
+    "microscript_sessions", "Sessions actives.",
+    lambda: {("repl",): len(SESSIONS), ("debug",): len(DEBUG_SESSIONS)}, ["kind"])
+
+
+@app.before_request
+def _start_timer():
+    g.t0 = time.perf_counter()
+
+
+@app.after_request
+def _observe_request(response):
+    t0 = g.get("t0")
+    endpoint = request.endpoint or "inconnu"
+    if t0 is not None:
+        REQUEST_SECONDS.observe(time.perf_counter() - t0, endpoint=endpoint)
+    REQUESTS.inc(endpoint=endpoint, status=str(response.status_code))
+    return response
+
+
+def _eval_with_capture(code, runtime=None, evaluator=None, optimised=False, coverage=False, engine="tree"):
     old_stdout = sys.stdout
-    sys.stdout = StringIO()
+    buf = sys.stdout = StringIO()
+    clock = time.perf_counter
+    steps = runtime.steps if runtime is not None else 0
+    phase = "lex"
     try:
+        t0 = clock()
         tokens = lexer(code)
+        t1 = clock()
+        PHASE_SECONDS.observe(t1 - t0, phase="lex")
+        phase = "parse"
         parser = Parser(tokens)
         ast = parser.parse()
+        t2 = clock()
+        PHASE_SECONDS.observe(t2 - t1, phase="parse")
+        if optimised:
+            phase = "optimise"
+            optimise(ast)
+            t3 = clock()
+            PHASE_SECONDS.observe(t3 - t2, phase="optimise")
+            t2 = t3
+        phase = "eval"
 
         if runtime is None:
             runtime = make_runtime(filename="<stdin>")
         if evaluator is None:
-            evaluator = Evaluator(runtime)
+            evaluator = ENGINES[engine](runtime)
+        if coverage:
+            runtime.cover(ast)
 
         evaluator.eval(ast)
-        output = sys.stdout.getvalue()
+        t3 = clock()
+        PHASE_SECONDS.observe(t3 - t2, phase="eval")
+        output = buf.getvalue()
+        PHASE_SECONDS.observe(clock() - t3, phase="capture")
+        OUTPUT_BYTES.inc(len(output.encode("utf-8")))
         return True, output, runtime, evaluator
     except Exception as e:
+        SCRIPT_ERRORS.inc(type=type(e).__name__, phase=phase)
         return False, f"Erreur : {format_error(e)}", runtime, evaluator
     finally:
         sys.stdout = old_stdout
+        if runtime is not None:
+            STATEMENTS.inc(runtime.steps - steps)
+
+
+def _debug_run(dbg, run):
+    """Exécute run() (commandes du débogueur) avec les métriques de la phase eval."""
+    rt, steps, error = dbg.runtime, dbg.runtime.steps, dbg.error
+    t0 = time.perf_counter()
+    try:
+        return run()
+    finally:
+        PHASE_SECONDS.observe(time.perf_counter() - t0, phase="eval")
+        executed = rt.steps - steps
+        if dbg.runtime is not rt:  # exécution reprise depuis le début
+            executed += dbg.runtime.steps
+        STATEMENTS.inc(executed)
+        if dbg.error is not None and (error is None or dbg.runtime is not rt):
+            SCRIPT_ERRORS.inc(type=dbg.error_type, phase="eval")
+
+
+def _encoded(payload, status=200):
+    """jsonify chronométré (phase encode)."""
+    t0 = time.perf_counter()
+    response = jsonify(payload)
+    PHASE_SECONDS.observe(time.perf_counter() - t0, phase="encode")
+    return response, status
 
 
 @app.route("/run", methods=["POST"])
 def run_code():
     data = request.get_json() or {}
     code = data.get("code", "")
-    ok, out, _, _ = _eval_with_capture(code)
-    return jsonify({"success": ok, "output": out})
+    engine = data.get("engine", "tree")
+    if engine not in ENGINES:
+        return jsonify({"success": False, "error": f"Moteur inconnu : {engine} ({', '.join(ENGINES)})."}), 400
+    # programme complet : la passe d'optimisation est sûre, mais reste à la demande
+    ok, out, rt, ev = _eval_with_capture(
+        code, optimised=bool(data.get("optimise")), coverage=bool(data.get("coverage")), engine=engine)
+    payload = {"success": ok, "output": out}
+    if engine == "compiled" and ev is not None:
+        payload["fallback"] = ev.fallback  # raison du repli sur l'Evaluator, sinon None
+    if rt is not None and rt.coverage is not None:
+        payload["coverage"] = rt.coverage.report()  # aussi en cas d'erreur : lignes atteintes
+    return _encoded(payload)
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    return Response(REGISTRY.render(), mimetype=CONTENT_TYPE)
+
+
+@app.route("/run/batch", methods=["POST"])
+def run_code_batch():
+    from backend.batch import run_batch, MAX_ITEMS  # pool de processus : chargé au premier lot
+
+    data = request.get_json() or {}
+    items = data.get("items")
+    if not isinstance(items, list) or not all(isinstance(it, dict) for it in items):
+        return jsonify({"success": False, "error": "items doit être une liste de {code, inputs}."}), 400
+    if len(items) > MAX_ITEMS:
+        return jsonify({"success": False, "error": f"Au plus {MAX_ITEMS} items par lot."}), 400
+
+    t0 = time.perf_counter()
+    coverage = {} if data.get("coverage") else None
+    results = run_batch(items, coverage=coverage)
+    payload = {
+        "success": all(r["success"] for r in results),
+        "results": results,
+        "time_ms": (time.perf_counter() - t0) * 1000,
+    }
+    if coverage is not None:
+        # une entrée par source distincte, fusionnée sur tous ses items
+        payload["coverage"] = [
+            {"items": [i for i, it in enumerate(items) if str(it.get("code", "")) == code], **cov.report()}
+            for code, cov in coverage.items()
+        ]
+    return jsonify(payload)
 
 
 @app.route("/repl/init", methods=["POST"])
@@ -58,6 +188,29 @@ def repl_init():
     return jsonify({"session_id": session_id})
 
 
+@app.route("/repl/fork", methods=["POST"])
+def repl_fork():
+    data = request.get_json() or {}
+    sid = data.get("session_id")
+    if not sid or sid not in SESSIONS:
+        return jsonify({"success": False, "output": "Session inconnue."}), 400
+    try:
+        count = int(data.get("count", 1))
+    except (TypeError, ValueError):
+        count = 0
+    if not 1 <= count <= 1000:
+        return jsonify({"success": False, "output": "count doit être entre 1 et 1000."}), 400
+
+    snap = SESSIONS[sid]["runtime"].snapshot()
+    ids = []
+    for _ in range(count):
+        rt = snap.fork()
+        new_sid = str(uuid.uuid4())
+        SESSIONS[new_sid] = {"runtime": rt, "evaluator": Evaluator(rt), "buffer": ""}
+        ids.append(new_sid)
+    return jsonify({"success": True, "session_id": ids[0], "session_ids": ids})
+
+
 @app.route("/repl/reset", methods=["POST"])
 def repl_reset():
     data = request.get_json() or {}
@@ -98,16 +251,22 @@ def repl_exec():
         SESSIONS[sid]["buffer"] = ""
         SESSIONS[sid]["runtime"] = rt
         SESSIONS[sid]["evaluator"] = ev
-        return jsonify({"success": True, "output": out, "more": False})
+        return _encoded({"success": True, "output": out, "more": False})
     else:
         if line.strip().endswith(":"):
             SESSIONS[sid]["buffer"] = code
             return jsonify({"success": True, "output": "... (suite attendue)", "more": True})
-        return jsonify({"success": False, "output": out, "more": False}), 400
+        return _encoded({"success": False, "output": out, "more": False}, 400)
 
 
-def _make_debugger():
-    return Debugger(lambda rt: Evaluator(rt), filename="<stdin>")
+def _make_debugger(data):
+    from backend.interpreter.debugger import Debugger, DEFAULT_INTERVAL, DEFAULT_BUDGET
+
+    return Debugger(
+        filename="<stdin>",
+        interval=int(data.get("checkpoint_interval") or DEFAULT_INTERVAL),
+        budget=int(data.get("checkpoint_budget") or DEFAULT_BUDGET),
+    )
 
 
 @app.route("/debug/start", methods=["POST"])
@@ -117,20 +276,28 @@ def debug_start():
     bps = data.get("breakpoints", []) or []
 
     try:
+        t0 = time.perf_counter()
         tokens = lexer(code)
+        t1 = time.perf_counter()
         parser = Parser(tokens)
         ast = parser.parse()
+        PHASE_SECONDS.observe(t1 - t0, phase="lex")
+        PHASE_SECONDS.observe(time.perf_counter() - t1, phase="parse")
 
-        dbg = _make_debugger()
+        dbg = _make_debugger(data)
         dbg.load_program(ast)
         if bps:
             dbg.set_breakpoints(bps)
+        for name in data.get("watches", []) or []:
+            dbg.watch(name)
 
-        state = dbg.step()
+        state = _debug_run(dbg, dbg.step)
         sid = str(uuid.uuid4())
-        DEBUG_SESSIONS[sid] = {"debugger": dbg, "ast": ast}
-        return jsonify({"session_id": sid, "state": state})
+        channel = DebugChannel(dbg, state)
+        DEBUG_SESSIONS[sid] = {"debugger": dbg, "ast": ast, "channel": channel}
+        return jsonify({"session_id": sid, "state": state, "version": channel.version})
     except Exception as e:
+        SCRIPT_ERRORS.inc(type=type(e).__name__, phase="debug")
         return jsonify({"error": format_error(e)}), 400
 
 
@@ -143,8 +310,43 @@ def debug_set_breakpoints():
         return jsonify({"error": "Session debug inconnue"}), 400
 
     dbg = DEBUG_SESSIONS[sid]["debugger"]
-    dbg.set_breakpoints(bps)
-    return jsonify({"ok": True, "breakpoints": dbg.runtime.breakpoints.snapshot()})
+    try:
+        DEBUG_SESSIONS[sid]["channel"].call(lambda d: d.set_breakpoints(bps))
+    except Exception as e:
+        return jsonify({"error": format_error(e)}), 400
+    return jsonify({
+        "ok": True,
+        "breakpoints": dbg.breakpoints.snapshot(),
+        "details": dbg.breakpoints.details(),
+    })
+
+
+@app.route("/debug/watch", methods=["POST"])
+def debug_watch():
+    data = request.get_json() or {}
+    sid = data.get("session_id")
+    name = data.get("name")
+    if not sid or sid not in DEBUG_SESSIONS:
+        return jsonify({"error": "Session debug inconnue"}), 400
+    if not name:
+        return jsonify({"error": "Paramètre 'name' requis"}), 400
+
+    watches = DEBUG_SESSIONS[sid]["channel"].call(lambda d: d.watch(name))
+    return jsonify({"ok": True, "watches": watches})
+
+
+@app.route("/debug/unwatch", methods=["POST"])
+def debug_unwatch():
+    data = request.get_json() or {}
+    sid = data.get("session_id")
+    name = data.get("name")
+    if not sid or sid not in DEBUG_SESSIONS:
+        return jsonify({"error": "Session debug inconnue"}), 400
+    if not name:
+        return jsonify({"error": "Paramètre 'name' requis"}), 400
+
+    watches = DEBUG_SESSIONS[sid]["channel"].call(lambda d: d.unwatch(name))
+    return jsonify({"ok": True, "watches": watches})
 
 
 @app.route("/debug/continue", methods=["POST"])
@@ -154,9 +356,10 @@ def debug_continue():
     if not sid or sid not in DEBUG_SESSIONS:
         return jsonify({"error": "Session debug inconnue"}), 400
 
-    dbg = DEBUG_SESSIONS[sid]["debugger"]
-    state = dbg.continue_()
-    return jsonify({"state": state})
+    session = DEBUG_SESSIONS[sid]
+    channel = session["channel"]
+    _debug_run(session["debugger"], lambda: channel.send(["continue"]))
+    return jsonify({"state": channel.state})
 
 
 @app.route("/debug/step", methods=["POST"])
@@ -166,9 +369,40 @@ def debug_step():
     if not sid or sid not in DEBUG_SESSIONS:
         return jsonify({"error": "Session debug inconnue"}), 400
 
-    dbg = DEBUG_SESSIONS[sid]["debugger"]
-    state = dbg.step()
-    return jsonify({"state": state})
+    session = DEBUG_SESSIONS[sid]
+    channel = session["channel"]
+    _debug_run(session["debugger"], lambda: channel.send(["step"]))
+    return jsonify({"state": channel.state})
+
+
+@app.route("/debug/back", methods=["POST"])
+def debug_back():
+    data = request.get_json() or {}
+    sid = data.get("session_id")
+    if not sid or sid not in DEBUG_SESSIONS:
+        return jsonify({"error": "Session debug inconnue"}), 400
+
+    session = DEBUG_SESSIONS[sid]
+    channel = session["channel"]
+    _debug_run(session["debugger"], lambda: channel.send(["back"]))
+    return jsonify({"state": channel.state})
+
+
+@app.route("/debug/goto", methods=["POST"])
+def debug_goto():
+    data = request.get_json() or {}
+    sid = data.get("session_id")
+    if not sid or sid not in DEBUG_SESSIONS:
+        return jsonify({"error": "Session debug inconnue"}), 400
+    try:
+        step = int(data.get("step"))
+    except (TypeError, ValueError):
+        return jsonify({"error": "Paramètre 'step' entier requis"}), 400
+
+    session = DEBUG_SESSIONS[sid]
+    channel = session["channel"]
+    _debug_run(session["debugger"], lambda: channel.send([f"goto {step}"]))
+    return jsonify({"state": channel.state})
 
 
 @app.route("/debug/state", methods=["GET"])
@@ -177,18 +411,44 @@ def debug_state():
     if not sid or sid not in DEBUG_SESSIONS:
         return jsonify({"error": "Session debug inconnue"}), 400
 
-    dbg = DEBUG_SESSIONS[sid]["debugger"]
-    state = {
-        "paused": dbg.is_paused(),
-        "output": dbg.last_output(),
-        "variables": dbg.variables(),
-        "callstack": dbg.callstack(),
-        "breakpoints": dbg.runtime.breakpoints.snapshot(),
-        "filename": dbg.filename,
-    }
+    session = DEBUG_SESSIONS[sid]
+    state = dict(session["channel"].state)
+    state["filename"] = session["debugger"].filename
     return jsonify({"state": state})
 
 
+@app.route("/debug/channel", methods=["POST"])
+def debug_channel_send():
+    """Commandes en rafale ({"commands": [...], "since": version}) ; retourne le delta d'état."""
+    data = request.get_json() or {}
+    sid = data.get("session_id")
+    if not sid or sid not in DEBUG_SESSIONS:
+        return jsonify({"error": "Session debug inconnue"}), 400
+    commands = data.get("commands", [])
+    if not isinstance(commands, list):
+        return jsonify({"error": "Paramètre 'commands' : liste attendue"}), 400
+    try:
+        since = int(data.get("since") or 0)
+        session = DEBUG_SESSIONS[sid]
+        return jsonify(_debug_run(session["debugger"], lambda: session["channel"].send(commands, since)))
+    except Exception as e:
+        return jsonify({"error": format_error(e)}), 400
+
+
+@app.route("/debug/channel", methods=["GET"])
+def debug_channel_poll():
+    """Long-poll : répond dès que l'état dépasse la version `since`, ou après `timeout` s."""
+    sid = request.args.get("session_id")
+    if not sid or sid not in DEBUG_SESSIONS:
+        return jsonify({"error": "Session debug inconnue"}), 400
+    try:
+        since = int(request.args.get("since", 0))
+        timeout = float(request.args.get("timeout", 25))
+    except ValueError:
+        return jsonify({"error": "Paramètres 'since' et 'timeout' numériques requis"}), 400
+    return jsonify(DEBUG_SESSIONS[sid]["channel"].wait(since, timeout))
+
+
 @app.route("/health", methods=["GET"])
 def health():
     return jsonify({"status": "ok"})
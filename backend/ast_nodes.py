@@ -17,6 +17,11 @@ class BinaryOp:
         self.left = left
         self.op = op
         self.right = right
+        # spécialisation par types observés (cf. Evaluator._quicken)
+        self.q_left = None
+        self.q_right = None
+        self.q_fn = None
+        self.q_deopts = 0
     def __repr__(self):
         return f"BinaryOp({self.left}, '{self.op}', {self.right})"
 
@@ -83,6 +88,15 @@ class FunctionCall:
     def __init__(self, name, args):
         self.name = name
         self.args = args
+        # cache en ligne de la résolution de `name` (cf. CallSites)
+        self.ic_version = -1
+        self.ic_root = None
+        self.ic_value = None
+    def __getstate__(self):
+        # le cache en ligne référence le runtime : il n'est pas sérialisé
+        state = self.__dict__.copy()
+        state.update(ic_version=-1, ic_root=None, ic_value=None)
+        return state
     def __repr__(self):
         return f'Call({self.name}, {self.args})'
 
@@ -108,6 +122,29 @@ class Dict:
         return f'Dict({self.pairs})'
 
 
+class ListComp:
+    """`[expr for var in iterable if condition]` (condition facultative)."""
+    def __init__(self, expr, var_name, iterable, condition=None):
+        self.expr = expr
+        self.var_name = var_name
+        self.iterable = iterable
+        self.condition = condition
+    def __repr__(self):
+        return f'ListComp({self.expr}, {self.var_name}, {self.iterable}, {self.condition})'
+
+
+class DictComp:
+    """`{key: value for var in iterable if condition}` (condition facultative)."""
+    def __init__(self, key, value, var_name, iterable, condition=None):
+        self.key = key
+        self.value = value
+        self.var_name = var_name
+        self.iterable = iterable
+        self.condition = condition
+    def __repr__(self):
+        return f'DictComp({self.key}, {self.value}, {self.var_name}, {self.iterable}, {self.condition})'
+
+
 class Index:
     def __init__(self, target, index):
         self.target = target
@@ -130,3 +167,48 @@ class Return:
         self.value = value
     def __repr__(self):
         return f'Return({self.value})'
+
+
+class ImportStmt:
+    """`import nom` : rend visibles les définitions du module nom.ms."""
+    def __init__(self, name):
+        self.name = name
+    def __repr__(self):
+        return f'Import({self.name})'
+
+
+class LoopInvariant:
+    """
+    Sous-expression invariante d'une boucle (cf. backend.optimiser) : évaluée
+    au premier passage, puis relue sous `key` dans le cache de la frame
+    courante (Runtime.invariants(), hors des variables du programme).
+    """
+    def __init__(self, key, expr):
+        self.key = key
+        self.expr = expr
+    def __repr__(self):
+        return f'Invariant({self.key}, {self.expr})'
+
+
+class ResetInvariants:
+    """Oublie les invariants d'une boucle, avant chacune de ses exécutions et à sa sortie."""
+    def __init__(self, keys):
+        self.keys = keys
+    def __repr__(self):
+        return f'ResetInvariants({self.keys})'
+
+
+def walk(node):
+    """Parcourt un AST en profondeur (nœuds, listes et tuples de nœuds)."""
+    stack = [node]
+    while stack:
+        n = stack.pop()
+        if isinstance(n, (list, tuple)):
+            stack.extend(reversed(n))
+            continue
+        if type(n).__module__ != __name__:
+            continue
+        yield n
+        children = [v for v in vars(n).values()
+                    if isinstance(v, (list, tuple)) or type(v).__module__ == __name__]
+        stack.extend(reversed(children))
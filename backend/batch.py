@@ -0,0 +1,159 @@
+# backend/batch.py
+"""
+Exécution groupée de scripts MicroScript (endpoint /run/batch).
+
+Les items partageant la même source ne sont parsés qu'une fois par processus ;
+les groupes sont découpés en lots répartis sur un pool de processus, et les
+résultats sont rendus dans l'ordre des items, avec leur durée. La couverture
+de lignes, si demandée, s'accumule dans un seul bitmap par lot puis se
+fusionne par source.
+"""
+import io
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.lexer import lexer
+from backend.parser import Parser
+from backend.interpreter.runtime import make_runtime
+from backend.interpreter.coverage import Coverage
+from backend.interpreter.evaluator import Evaluator
+from backend.interpreter.parallel import mark_worker
+from backend.errors import format_error
+
+MAX_ITEMS = 10_000
+
+_AST_CACHE: Dict[str, Any] = {}  # par processus : source -> Program (ou exception de parsing)
+_AST_CACHE_MAX = 512
+_POOL: Optional[ProcessPoolExecutor] = None
+_POOL_SIZE = 0
+
+
+def _parse_cached(code: str) -> Any:
+    ast = _AST_CACHE.get(code)
+    if ast is None:
+        try:
+            ast = Parser(lexer(code)).parse()
+        except Exception as e:
+            ast = e
+        if len(_AST_CACHE) >= _AST_CACHE_MAX:
+            _AST_CACHE.clear()
+        _AST_CACHE[code] = ast
+    return ast
+
+
+def run_item(code: str, inputs: Optional[List[Any]] = None, coverage: Optional[Coverage] = None) -> Dict[str, Any]:
+    """
+    Exécute un script isolé ; `inputs` alimente les appels à input().
+    `coverage` (Coverage du même source) accumule les statements exécutés.
+    """
+    t0 = time.perf_counter()
+    old_stdout, old_stdin = sys.stdout, sys.stdin
+    sys.stdout = out = io.StringIO()
+    sys.stdin = io.StringIO("".join(f"{v}\n" for v in (inputs or [])))
+    try:
+        ast = _parse_cached(code)
+        if isinstance(ast, Exception):
+            raise ast
+        rt = make_runtime(filename="<stdin>")
+        if coverage is not None:
+            rt.cover(ast, coverage)
+        Evaluator(rt).eval(ast)
+        ok, text = True, out.getvalue()
+    except Exception as e:
+        ok, text = False, f"Erreur : {format_error(e)}"
+    finally:
+        sys.stdout, sys.stdin = old_stdout, old_stdin
+    return {"success": ok, "output": text, "time_ms": (time.perf_counter() - t0) * 1000}
+
+
+def _run_chunk(
+    code: str, chunk: List[Tuple[int, List[Any]]], coverage: bool = False,
+) -> Tuple[List[Tuple[int, Dict[str, Any]]], Optional[bytes]]:
+    """Résultats du lot et, si demandé, son bitmap de couverture (None si le source ne parse pas)."""
+    cov = None
+    if coverage:
+        ast = _parse_cached(code)
+        cov = None if isinstance(ast, Exception) else Coverage(ast)
+    results = [(i, run_item(code, inputs, cov)) for i, inputs in chunk]
+    return results, (bytes(cov.bits) if cov is not None else None)
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    global _POOL, _POOL_SIZE
+    if _POOL is None or _POOL_SIZE != workers:
+        _reset_pool()
+        _POOL = ProcessPoolExecutor(max_workers=workers, initializer=mark_worker)
+        _POOL_SIZE = workers
+    return _POOL
+
+
+def _reset_pool() -> None:
+    global _POOL
+    if _POOL is not None:
+        _POOL.shutdown(wait=False)
+    _POOL = None
+
+
+def run_batch(
+    items: List[Dict[str, Any]],
+    workers: Optional[int] = None,
+    coverage: Optional[Dict[str, Coverage]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Exécute `items` ([{code, inputs}]) et retourne un résultat par item, dans
+    l'ordre. L'échec d'un item (inputs invalides, erreur de script ou de
+    worker) n'interrompt pas les autres. Si `coverage` est un dict, il reçoit la couverture
+    fusionnée de chaque source (hors sources qui ne parsent pas).
+    """
+    workers = workers or os.cpu_count() or 1
+
+    results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+    groups: Dict[str, List[Tuple[int, List[Any]]]] = {}
+    for i, item in enumerate(items):
+        inputs = item.get("inputs")
+        if inputs is None:
+            inputs = []
+        elif not isinstance(inputs, list):
+            results[i] = {"success": False, "output": "Erreur : inputs doit être une liste.", "time_ms": 0.0}
+            continue
+        groups.setdefault(str(item.get("code", "")), []).append((i, inputs))
+    covering = coverage is not None
+
+    def collect(code: str, bits: Optional[bytes]) -> None:
+        if bits is not None:
+            if code not in coverage:
+                coverage[code] = Coverage(_parse_cached(code))
+            coverage[code].merge(bits)
+
+    if workers <= 1 or sum(len(g) for g in groups.values()) < 2:
+        for code, group in groups.items():
+            pairs, bits = _run_chunk(code, group, covering)
+            for i, res in pairs:
+                results[i] = res
+            collect(code, bits)
+        return results  # type: ignore[return-value]
+
+    # lots d'environ len(items) / (4 * workers) items pour équilibrer la charge
+    size = max(1, len(items) // (workers * 4))
+    pool = _get_pool(workers)
+    futures = []
+    for code, group in groups.items():
+        for k in range(0, len(group), size):
+            chunk = group[k:k + size]
+            futures.append((code, chunk, pool.submit(_run_chunk, code, chunk, covering)))
+    for code, chunk, fut in futures:
+        try:
+            pairs, bits = fut.result()
+            for i, res in pairs:
+                results[i] = res
+            collect(code, bits)
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool):
+                _reset_pool()
+            for i, _ in chunk:
+                results[i] = {"success": False, "output": f"Erreur : {format_error(e)}", "time_ms": 0.0}
+    return results  # type: ignore[return-value]
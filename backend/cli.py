@@ -0,0 +1,271 @@
+# backend/cli.py
+"""
+Lanceur en ligne de commande, hors Flask :
+
+    python -m backend run script.ms [--engine tree|task|compiled] [--bench N]
+                                    [--profile] [--json [FICHIER]] [--no-optimise]
+                                    [--coverage] [--path DIR]... [--data-root DIR]
+                                    [--max-steps N] [--timeout S] [--max-depth N]
+
+Chaque exécution est découpée en phases chronométrées (lex, parse, optimise,
+eval). `--bench N` répète le script N fois (sortie du script ignorée) et
+affiche min / médiane / moyenne / écart-type par phase ; `--json` émet les
+mêmes mesures en JSON (sur stdout, ou dans FICHIER). `--coverage` relève
+les lignes exécutées, cumulées sur toutes les exécutions. Les modules
+importés sont cherchés dans le répertoire du script, puis dans chaque
+`--path`, puis dans MICROSCRIPT_PATH. `--data-root` est le seul répertoire
+accessible aux builtins de fichiers (read_lines, read_csv, writer...).
+"""
+import argparse
+import io
+import json
+import mmap
+import os
+import statistics
+import sys
+import time
+from contextlib import redirect_stdout
+from typing import Any, Callable, Dict, List, Optional
+
+from backend.lexer import lexer
+from backend.parser import Parser
+from backend.optimiser import optimise
+from backend.interpreter.runtime import Runtime, make_runtime
+from backend.interpreter.evaluator import Evaluator
+from backend.interpreter import files, modules
+from backend.errors import format_error
+
+PHASES = ("lex", "parse", "optimise", "eval")
+
+
+def read_source(path: str) -> str:
+    """
+    Lit le script ; les fichiers sont mappés en mémoire et décodés directement
+    depuis la projection, sans copie intermédiaire en bytes. Les fins de ligne
+    CRLF sont normalisées comme le ferait open() en mode texte.
+    """
+    if path == "-":
+        return sys.stdin.read()
+    with open(path, "rb") as f:
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m, memoryview(m) as view:
+                # la vue est libérée avant la fermeture de la projection
+                return str(view, "utf-8").replace("\r\n", "\n")
+        except ValueError:
+            return ""  # fichier vide : mmap refuse une taille nulle
+
+
+# --- moteurs --------------------------------------------------------------
+
+def _run_tree(ev: Evaluator, ast: Any) -> None:
+    ev.eval(ast)
+
+
+def _run_task(ev: Evaluator, ast: Any) -> None:
+    # moteur générateur de l'ordonnanceur, piloté directement (une seule tâche)
+    gen = ev.run(ast)
+    value = None
+    while True:
+        try:
+            req = gen.send(value)
+        except StopIteration:
+            return
+        value = None
+        if req[0] == "sleep":
+            time.sleep(req[1])
+        elif req[0] == "input":
+            value = input(str(req[1]))
+
+
+def _task_evaluator(rt: Runtime) -> Evaluator:
+    from backend.interpreter.scheduler import TaskEvaluator
+
+    return TaskEvaluator(rt)
+
+
+def _compiled_evaluator(rt: Runtime) -> Any:
+    from backend.interpreter.transpiler import CompiledEvaluator
+
+    return CompiledEvaluator(rt)
+
+
+# nom -> (fabrique d'évaluateur, exécution)
+ENGINES: Dict[str, Any] = {
+    "tree": (Evaluator, _run_tree),
+    "task": (_task_evaluator, _run_task),
+    "compiled": (_compiled_evaluator, _run_tree),
+}
+
+
+# --- exécution chronométrée -----------------------------------------------
+
+def run_once(
+    code: str,
+    engine: str = "tree",
+    filename: str = "<stdin>",
+    limits: Optional[Dict[str, Any]] = None,
+    optimised: bool = True,
+    coverage: bool = False,
+):
+    """
+    Exécute code une fois ; retourne (durées par phase en secondes, évaluateur).
+    Avec `coverage`, la couverture de lignes est disponible sur ev.rt.coverage.
+    """
+    make_evaluator, execute = ENGINES[engine]
+    timings: Dict[str, float] = {}
+    clock = time.perf_counter
+
+    t0 = clock()
+    tokens = lexer(code)
+    t1 = clock()
+    ast = Parser(tokens).parse()
+    t2 = clock()
+    rt = make_runtime(filename=filename)
+    ev = make_evaluator(rt)
+    if optimised:
+        optimise(ast)
+    ev._watch_call_sites(ast)  # pré-passe sur l'AST : sites d'appel à surveiller
+    t3 = clock()
+    rt.limit(**(limits or {}))
+    if coverage:
+        rt.cover(ast)
+    try:
+        execute(ev, ast)
+    finally:
+        t4 = clock()
+        timings.update(lex=t1 - t0, parse=t2 - t1, optimise=t3 - t2, eval=t4 - t3)
+    return timings, ev
+
+
+def summarize(samples: List[Dict[str, float]]) -> Dict[str, Dict[str, float]]:
+    """Statistiques par phase (millisecondes)."""
+    out = {}
+    for phase in PHASES + ("total",):
+        values = [s[phase] * 1000 for s in samples] if phase != "total" else \
+                 [sum(s.values()) * 1000 for s in samples]
+        out[phase] = {
+            "min": min(values),
+            "median": statistics.median(values),
+            "mean": statistics.fmean(values),
+            "stdev": statistics.stdev(values) if len(values) > 1 else 0.0,
+        }
+    return out
+
+
+def _profiled(fn: Callable[[], Any]) -> Any:
+    import cProfile
+    import pstats
+
+    prof = cProfile.Profile()
+    try:
+        return prof.runcall(fn)
+    finally:
+        stream = io.StringIO()
+        pstats.Stats(prof, stream=stream).sort_stats("cumulative").print_stats(25)
+        sys.stderr.write(stream.getvalue())
+
+
+def cmd_run(args: argparse.Namespace) -> int:
+    try:
+        code = read_source(args.script)
+    except OSError as ex:
+        print(f"Erreur : {ex}", file=sys.stderr)
+        return 2
+    filename = "<stdin>" if args.script == "-" else args.script
+    script_dir = [] if args.script == "-" else [os.path.dirname(os.path.abspath(args.script))]
+    modules.SEARCH_PATH[:0] = script_dir + (args.path or [])
+    if args.data_root:
+        files.DATA_ROOT = args.data_root
+    limits = {"max_steps": args.max_steps, "timeout": args.timeout, "max_depth": args.max_depth}
+
+    def once(quiet: bool):
+        if not quiet:
+            return run_once(code, args.engine, filename, limits, args.optimise, args.coverage)
+        with redirect_stdout(io.StringIO()):
+            return run_once(code, args.engine, filename, limits, args.optimise, args.coverage)
+
+    samples: List[Dict[str, float]] = []
+    ev = None
+    cov = None
+
+    def record(result):
+        nonlocal ev, cov
+        timings, ev = result
+        samples.append(timings)
+        if args.coverage:
+            cov = ev.rt.coverage if cov is None else cov.merge(ev.rt.coverage)
+
+    try:
+        if args.bench:
+            for _ in range(args.warmup):
+                once(quiet=True)
+            for i in range(args.bench):
+                if args.profile and i == args.bench - 1:
+                    record(_profiled(lambda: once(quiet=True)))
+                else:
+                    record(once(quiet=True))
+        elif args.profile:
+            record(_profiled(lambda: once(quiet=False)))
+        else:
+            record(once(quiet=False))
+    except Exception as ex:
+        print(f"Erreur : {format_error(ex)}", file=sys.stderr)
+        return 1
+
+    report: Dict[str, Any] = {
+        "script": filename,
+        "engine": args.engine,
+        "runs": len(samples),
+        "phases_ms": summarize(samples),
+    }
+    if args.profile and ev is not None:
+        report["profile"] = ev.profile_stats()
+    if cov is not None:
+        report["coverage"] = cov.report()
+        missed = ", ".join(f"{a}-{b}" if a != b else str(a) for a, b in report["coverage"]["missed"])
+        print(f"couverture : {report['coverage']['percent']} % des lignes"
+              + (f", manquées : {missed}" if missed else ""), file=sys.stderr)
+
+    if args.bench:
+        print(f"{filename} — moteur {args.engine}, {len(samples)} exécutions (ms)", file=sys.stderr)
+        for phase, s in report["phases_ms"].items():
+            print(
+                f"  {phase:<9} min {s['min']:9.3f}  méd {s['median']:9.3f}  "
+                f"moy {s['mean']:9.3f}  σ {s['stdev']:8.3f}",
+                file=sys.stderr,
+            )
+    if args.json is not None:
+        text = json.dumps(report, indent=2)
+        if args.json == "-":
+            print(text)
+        else:
+            with open(args.json, "w", encoding="utf-8") as f:
+                f.write(text + "\n")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(prog="python -m backend", description="Interpréteur MicroScript.")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="exécute un script (- pour stdin)")
+    run.add_argument("script")
+    run.add_argument("--engine", choices=sorted(ENGINES), default="tree")
+    run.add_argument("--bench", type=int, metavar="N", help="répète le script N fois et affiche les statistiques")
+    run.add_argument("--warmup", type=int, default=1, help="exécutions d'échauffement avant --bench")
+    run.add_argument("--profile", action="store_true", help="profil cProfile (stderr) et statistiques de l'évaluateur")
+    run.add_argument("--json", nargs="?", const="-", metavar="FICHIER", help="mesures en JSON (stdout par défaut)")
+    run.add_argument("--no-optimise", dest="optimise", action="store_false", help="désactive la passe d'optimisation")
+    run.add_argument("--coverage", action="store_true", help="couverture de lignes (stderr, et JSON)")
+    run.add_argument("--max-steps", type=int, help="nombre maximal d'instructions")
+    run.add_argument("--timeout", type=float, help="durée maximale (secondes)")
+    run.add_argument("--max-depth", type=int, help="profondeur d'appel maximale")
+    run.add_argument("--path", action="append", metavar="DIR", help="répertoire de modules (répétable)")
+    run.add_argument("--data-root", metavar="DIR", help="racine des fichiers lus et écrits par le script")
+    run.set_defaults(func=cmd_run)
+    return ap
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
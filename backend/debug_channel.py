@@ -0,0 +1,245 @@
+# backend/debug_channel.py
+"""
+Canal de debug persistant d'une session (endpoint /debug/channel).
+
+Le client envoie des commandes texte en rafale (« step 50 », « run to line
+12 », « continue »...) et ne reçoit que les clés de l'état qui ont changé
+depuis la dernière version qu'il connaît ; les variables sont comparées nom
+par nom. Chaque état publié qui diffère du précédent incrémente la version :
+un client en long-poll n'est réveillé que par un changement réel.
+
+Les commandes sont exécutées une à la fois par session. Celles qui arrivent
+pendant une exécution en cours attendent, puis sont reprises d'un bloc par
+un seul exécutant : les pas consécutifs sont fusionnés (« step » ×3 devient
+« step 3 », un seul état calculé).
+
+Le transport est du long-poll HTTP, faute de dépendance WebSocket ; le canal
+ne connaît pas le transport.
+"""
+import json
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+LONG_POLL_MAX = 30.0  # secondes d'attente maximales d'un GET /debug/channel
+
+_MISSING = object()
+
+# verbe -> action sur le Debugger ; les verbes de déplacement retournent l'état
+_VERBS: Dict[str, Callable[[Any, Any], Any]] = {
+    "step": lambda dbg, n: dbg.goto(dbg.view + n),
+    "back": lambda dbg, n: dbg.goto(max(0, dbg.view - n)),
+    "goto": lambda dbg, step: dbg.goto(step),
+    "continue": lambda dbg, _: dbg.continue_(),
+    "until": lambda dbg, line: dbg.continue_(line),
+    "run": lambda dbg, _: dbg.run_to_end(),
+    "watch": lambda dbg, name: dbg.watch(name),
+    "unwatch": lambda dbg, name: dbg.unwatch(name),
+    "call": lambda dbg, fn: fn(dbg),
+}
+_MOVES = {"step", "back", "goto", "continue", "until", "run"}
+
+
+def _int(text: str, what: str) -> int:
+    try:
+        return int(text)
+    except ValueError:
+        raise ValueError(f"{what} entier attendu : {text!r}") from None
+
+
+def parse_command(text: Any) -> Tuple[str, Any]:
+    """
+    Commande texte -> (verbe, argument). Syntaxe : step [n], back [n],
+    goto <étape>, continue, run, run to line <ligne> (ou until <ligne>),
+    watch <nom>, unwatch <nom>.
+    """
+    words = str(text).split()
+    if not words:
+        raise ValueError("Commande debug vide")
+    verb, args = words[0].lower(), words[1:]
+    if verb in ("step", "back") and len(args) <= 1:
+        count = _int(args[0], "Nombre de pas") if args else 1
+        if count < 1:
+            raise ValueError(f"Nombre de pas invalide : {count}")
+        return verb, count
+    if verb == "goto" and len(args) == 1:
+        return verb, _int(args[0], "Étape")
+    if verb == "continue" and not args:
+        return verb, None
+    if verb == "run" and not args:
+        return verb, None
+    if verb == "run" and len(args) == 3 and [a.lower() for a in args[:2]] == ["to", "line"]:
+        return "until", _int(args[2], "Ligne")
+    if verb == "until" and len(args) == 1:
+        return verb, _int(args[0], "Ligne")
+    if verb in ("watch", "unwatch") and len(args) == 1:
+        return verb, args[0]
+    raise ValueError(f"Commande debug inconnue : {text!r}")
+
+
+def coalesce(commands: List[Tuple[str, Any, List[dict]]]) -> List[Tuple[str, Any, List[dict]]]:
+    """
+    Fusionne les commandes consécutives équivalentes à une seule : pas de même
+    sens additionnés, seul le dernier goto d'une suite compte. Chaque
+    commande garde la liste des boîtes de ses émetteurs.
+    """
+    out: List[Tuple[str, Any, List[dict]]] = []
+    for verb, arg, boxes in commands:
+        if out and out[-1][0] == verb and verb in ("step", "back", "goto"):
+            prev_arg, prev_boxes = out[-1][1], out[-1][2]
+            out[-1] = (verb, prev_arg + arg if verb != "goto" else arg, prev_boxes + boxes)
+        else:
+            out.append((verb, arg, list(boxes)))
+    return out
+
+
+def _same(a: Any, b: Any) -> bool:
+    """Égalité stricte de valeurs JSON (1, 1.0 et true sont distincts)."""
+    return a is b or (a == b and json.dumps(a) == json.dumps(b))
+
+
+class StateVersions:
+    """
+    Dernier état publié et version à laquelle chaque clé (et chaque variable)
+    a changé pour la dernière fois : le delta depuis n'importe quelle version
+    antérieure est exact, sans conserver les états intermédiaires.
+    """
+    def __init__(self):
+        self.version = 0
+        self.state: Dict[str, Any] = {}
+        self._changed: Dict[str, int] = {}
+        self._vars_changed: Dict[str, int] = {}  # suppressions comprises
+
+    def publish(self, state: Dict[str, Any]) -> bool:
+        """Enregistre `state` ; retourne False (version inchangée) s'il est identique."""
+        old = self.state
+        keys = [k for k, v in state.items()
+                if k != "variables" and not _same(old.get(k, _MISSING), v)]
+        variables = state.get("variables", {})
+        old_vars = old.get("variables", {})
+        names = [n for n, v in variables.items() if not _same(old_vars.get(n, _MISSING), v)]
+        names += [n for n in old_vars if n not in variables]
+        if not keys and not names and old:
+            return False
+        self.version += 1
+        for k in keys:
+            self._changed[k] = self.version
+        for n in names:
+            self._vars_changed[n] = self.version
+        self.state = state
+        return True
+
+    def delta(self, since: int) -> Dict[str, Any]:
+        """
+        Clés modifiées après la version `since`. Les variables arrivent sous
+        la forme {"set": {nom: valeur}, "unset": [noms supprimés]}.
+        """
+        if since > self.version:
+            since = 0  # version d'un autre processus : tout renvoyer
+        out = {k: self.state[k] for k, v in self._changed.items() if v > since and k in self.state}
+        names = [n for n, v in self._vars_changed.items() if v > since]
+        if names:
+            variables = self.state.get("variables", {})
+            out["variables"] = {
+                "set": {n: variables[n] for n in names if n in variables},
+                "unset": [n for n in names if n not in variables],
+            }
+        return out
+
+
+class DebugChannel:
+    """Canal d'une session : file de commandes coalescées et états versionnés."""
+
+    def __init__(self, debugger: Any, state: Optional[Dict[str, Any]] = None):
+        self.debugger = debugger
+        self.versions = StateVersions()
+        self.versions.publish(state if state is not None else debugger.state())
+        self._cond = threading.Condition()
+        self._pending: List[Tuple[str, Any, List[dict]]] = []
+        self._busy = False
+
+    @property
+    def version(self) -> int:
+        return self.versions.version
+
+    @property
+    def state(self) -> Dict[str, Any]:
+        """Dernier état publié (à ne pas modifier)."""
+        return self.versions.state
+
+    def send(self, commands: List[Any], since: int = 0) -> Dict[str, Any]:
+        """Exécute des commandes texte, puis retourne {"version", "delta"} depuis `since`."""
+        parsed = [parse_command(c) for c in commands]  # tout ou rien : rien n'est lancé si une commande est invalide
+        if parsed:
+            self._submit([(verb, arg) for verb, arg in parsed])
+        return self.reply(since)
+
+    def call(self, fn: Callable[[Any], Any]) -> Any:
+        """Exécute fn(debugger) dans la file de la session ; l'état est republié ensuite."""
+        return self._submit([("call", fn)])
+
+    def reply(self, since: int) -> Dict[str, Any]:
+        with self._cond:
+            return {"version": self.versions.version, "delta": self.versions.delta(since)}
+
+    def wait(self, since: int, timeout: float) -> Dict[str, Any]:
+        """Long-poll : attend une version postérieure à `since` (au plus `timeout` s)."""
+        timeout = min(max(0.0, float(timeout)), LONG_POLL_MAX)
+        with self._cond:
+            self._cond.wait_for(lambda: self.versions.version != since, timeout)
+            return {"version": self.versions.version, "delta": self.versions.delta(since)}
+
+    # Exécution
+
+    def _submit(self, commands: List[Tuple[str, Any]]) -> Any:
+        """
+        Met les commandes en file et attend leur exécution. Si aucune
+        exécution n'est en cours, l'appelant devient l'exécutant et vide toute
+        la file, y compris les commandes arrivées entre-temps.
+        """
+        box: Dict[str, Any] = {}
+        with self._cond:
+            self._pending.extend((verb, arg, [box]) for verb, arg in commands)
+            while "done" not in box:
+                if self._busy:
+                    self._cond.wait()
+                    continue
+                self._busy = True
+                batch, self._pending = self._pending, []
+                self._cond.release()
+                try:
+                    state = self._execute(batch)
+                finally:
+                    self._cond.acquire()
+                    self._busy = False
+                    for _, _, boxes in batch:
+                        for b in boxes:
+                            b["done"] = True
+                    self._cond.notify_all()
+                if state is not None:
+                    self.versions.publish(state)
+        if "error" in box:
+            raise box["error"]
+        return box.get("value")
+
+    def _execute(self, batch: List[Tuple[str, Any, List[dict]]]) -> Optional[Dict[str, Any]]:
+        """Exécute un lot coalescé ; retourne l'état final (calculé une seule fois)."""
+        dbg = self.debugger
+        state = None
+        for verb, arg, boxes in coalesce(batch):
+            try:
+                value = _VERBS[verb](dbg, arg)
+            except Exception as ex:
+                for b in boxes:
+                    b.setdefault("error", ex)
+                state = None
+                continue
+            state = value if verb in _MOVES else None
+            for b in boxes:
+                b["value"] = value
+        try:
+            return state if state is not None else dbg.state()
+        except Exception as ex:
+            for _, _, boxes in batch:
+                for b in boxes:
+                    b.setdefault("error", ex)
+            return None
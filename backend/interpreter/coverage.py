@@ -0,0 +1,110 @@
+# backend/interpreter/coverage.py
+"""
+Couverture de lignes des programmes MicroScript.
+
+Chaque statement d'un programme (corps de fonctions et de blocs compris)
+reçoit un identifiant `sid` ; l'exécution marque l'octet correspondant d'un
+bitmap préalloué. Les bitmaps de plusieurs exécutions d'un même programme
+se fusionnent par un OU entier, et le rapport donne les lignes exécutées et
+manquées sous forme de plages [début, fin].
+"""
+from typing import Any, Iterable, List, Optional, Union
+
+from backend.ast_nodes import Program, IfStmt, WhileStmt, ForStmt, FunctionDef
+
+
+def _blocks(stmts: List[Any]) -> Iterable[List[Any]]:
+    """Blocs de statements imbriqués dans `stmts` (ordre du source)."""
+    for s in stmts:
+        t = type(s)
+        if t is IfStmt:
+            yield s.body
+            for _cond, body in getattr(s, "elifs", []):
+                yield body
+            yield getattr(s, "orelse", [])
+        elif t is WhileStmt or t is ForStmt or t is FunctionDef:
+            yield s.body
+
+
+def number_statements(program: Program) -> List[Optional[int]]:
+    """
+    Numérote les statements de `program` (attribut `sid`) et retourne leurs
+    lignes, indexées par sid. Le résultat est mis en cache sur le programme,
+    avec les statements eux-mêmes (`stmt_nodes`, même indexation).
+    """
+    lines = getattr(program, "stmt_lines", None)
+    if lines is not None:
+        return lines
+    lines = []
+    nodes = []
+    pending = [program.statements]
+    while pending:
+        stmts = pending.pop()
+        for s in stmts:
+            s.sid = len(lines)
+            lines.append(getattr(s, "line", None))
+            nodes.append(s)
+        pending.extend(reversed(list(_blocks(stmts))))
+    program.stmt_nodes = nodes
+    program.stmt_lines = lines
+    return lines
+
+
+def line_ranges(lines: Iterable[int], universe: List[int]) -> List[List[int]]:
+    """
+    Plages compactes de `lines` : deux lignes sont regroupées si aucune ligne
+    de `universe` (toutes les lignes de statements, triées) ne les sépare.
+    """
+    wanted = set(lines)
+    out: List[List[int]] = []
+    prev_in = False
+    for ln in universe:
+        if ln in wanted:
+            if prev_in:
+                out[-1][1] = ln
+            else:
+                out.append([ln, ln])
+            prev_in = True
+        else:
+            prev_in = False
+    return out
+
+
+class Coverage:
+    """Bitmap des statements exécutés d'un programme (un octet par statement)."""
+
+    def __init__(self, program: Program):
+        self.lines = number_statements(program)
+        self.bits = bytearray(len(self.lines))
+
+    def __len__(self) -> int:
+        return len(self.bits)
+
+    def merge(self, other: Union["Coverage", bytes, bytearray]) -> "Coverage":
+        """Ajoute les statements exécutés de `other` (même programme)."""
+        bits = other.bits if isinstance(other, Coverage) else other
+        if len(bits) != len(self.bits):
+            raise ValueError("Couvertures de programmes différents")
+        n = len(bits)
+        merged = int.from_bytes(self.bits, "little") | int.from_bytes(bits, "little")
+        self.bits[:] = merged.to_bytes(n, "little")  # en place : les hooks gardent la référence
+        return self
+
+    def executed_lines(self) -> List[int]:
+        return sorted({ln for ln, hit in zip(self.lines, self.bits) if hit and ln is not None})
+
+    def missed_lines(self) -> List[int]:
+        hit = set(self.executed_lines())
+        return sorted({ln for ln in self.lines if ln is not None and ln not in hit})
+
+    def report(self) -> dict:
+        """Résumé JSON : plages de lignes exécutées / manquées et compte de statements."""
+        universe = sorted({ln for ln in self.lines if ln is not None})
+        executed = self.executed_lines()
+        return {
+            "executed": line_ranges(executed, universe),
+            "missed": line_ranges(self.missed_lines(), universe),
+            "statements": len(self.bits),
+            "covered": len(self.bits) - self.bits.count(0),
+            "percent": round(100.0 * len(executed) / len(universe), 1) if universe else 100.0,
+        }
@@ -1,12 +1,53 @@
-from typing import Any, Callable, Dict, List, Optional, Tuple
+"""
+Débogueur pas à pas avec retour arrière (time-travel).
+
+Le programme s'exécute sur une variante de l'évaluateur générateur de
+l'ordonnanceur, qui rend la main avant chaque statement : l'exécution se
+met réellement en pause au lieu d'être relancée depuis le début.
+
+Chaque pause (« étape ») est enregistrée dans un historique borné :
+  - un checkpoint complet (global + frames de la pile) toutes les
+    `interval` étapes ;
+  - entre deux checkpoints, le journal des écritures de chaque étape
+    (affectations, entrées/sorties de fonction, conteneurs modifiés).
+Revenir à une étape coûte donc au plus `interval` étapes de journal à
+rejouer. Au-delà de `budget` checkpoints, les plus anciens sont oubliés ;
+revenir avant le début de l'historique ré-exécute le programme depuis le
+début, de façon déterministe car les résultats de random/time/now... sont
+enregistrés et resservis à l'identique.
+
+Limites : les variables d'une closure parente n'apparaissent pas dans la
+vue, et une fonction appelée depuis un builtin (map, filter...) s'exécute
+d'un bloc, sans étape intermédiaire. `sleep` ne bloque pas en debug.
+"""
 import io
+import operator
 import sys
+from bisect import bisect_right
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from backend.ast_nodes import Assign, Index, IfStmt, WhileStmt, ForStmt
+from backend.errors import format_error
+from backend.interpreter.runtime import (
+    Env, Frame, Runtime, RuntimeErrorMS, BreakpointManager, Breakpoint
+)
+from backend.interpreter.evaluator import Evaluator, UserFunction
+from backend.interpreter.memo import MemoFunction, impurity
+from backend.interpreter.scheduler import TaskEvaluator, _has_call
+from backend.interpreter.stdlib import (
+    BUILTINS, EFFECTS, ms_random, ms_randint, ms_time, ms_now, _random
+)
+from backend.interpreter.values import StringBuilder, MUTABLE_TYPES, cow_copy, flatten
+
+DEFAULT_INTERVAL = 64   # étapes entre deux checkpoints
+DEFAULT_BUDGET = 256    # checkpoints conservés
+LOG_LIMIT = 1000        # messages de log points conservés
 
-from backend.interpreter.runtime import Runtime, make_runtime, ReturnSignal, RuntimeErrorMS
 
 class StdoutCapture:
-    def __init__(self):
-        self._buf = io.StringIO()
+    def __init__(self, buf: Optional[io.StringIO] = None):
+        self._buf = buf if buf is not None else io.StringIO()
         self._old = None
 
     def __enter__(self):
@@ -22,111 +63,721 @@ class StdoutCapture:
         return self._buf.getvalue()
 
 
+class Tape:
+    """
+    Résultats des builtins non déterministes, dans l'ordre des appels.
+    Après rewind(), les mêmes appels reçoivent les mêmes résultats.
+    """
+    def __init__(self):
+        self.values: List[Any] = []
+        self.pos = 0
+
+    def rewind(self) -> None:
+        self.pos = 0
+
+    def take(self, produce: Callable[[], Any]) -> Any:
+        if self.pos < len(self.values):
+            value = self.values[self.pos]
+        else:
+            value = produce()
+            self.values.append(value)
+        self.pos += 1
+        return value
+
+    def builtins(self) -> Dict[str, Any]:
+        """Builtins enregistrés, qui masquent ceux de la stdlib dans le runtime de debug."""
+        def random():
+            return self.take(ms_random)
+
+        def randint(a, b):
+            return self.take(lambda: ms_randint(a, b))
+
+        def choice(xs):
+            if not xs:
+                return _random().choice(xs)  # même erreur que hors debug
+            return xs[self.take(lambda: _random().randrange(len(xs)))]
+
+        def shuffle(xs):
+            order = self.take(lambda: _random().sample(range(len(xs)), len(xs)))
+            items = list(xs)
+            xs[:] = [items[i] for i in order]
+            return xs
+
+        def time():
+            return self.take(ms_time)
+
+        def now():
+            return self.take(ms_now)
+
+        return {"random": random, "randint": randint, "choice": choice,
+                "shuffle": shuffle, "time": time, "now": now}
+
+
+def _snap(value: Any) -> Any:
+    """Fige une valeur pour l'historique (listes, dicts et builders sont copiés)."""
+    return cow_copy(value)
+
+
+def _render(value: Any, path: Optional[set] = None) -> Any:
+    """Valeur affichable et sérialisable en JSON."""
+    t = type(value)
+    if value is None or t in (bool, int, float, str):
+        return value
+    if t is StringBuilder:
+        return str(value)
+    if t in (list, tuple, dict):
+        path = path or set()
+        if id(value) in path:
+            return "[...]"
+        path.add(id(value))
+        if t is dict:
+            out = {k if type(k) is str else str(k): _render(v, path) for k, v in value.items()}
+        else:
+            out = [_render(v, path) for v in value]
+        path.discard(id(value))
+        return out
+    return repr(value)
+
+
+def _visible(bindings: Dict[str, Any]) -> Dict[str, Any]:
+    """Bindings affichables."""
+    return {k: _render(v) for k, v in bindings.items()}
+
+
+class _Segment:
+    """Un checkpoint complet, suivi du journal des étapes jusqu'au suivant."""
+    __slots__ = ("start", "frames", "scopes", "marks", "writes")
+
+    def __init__(self, start: int, frames: Tuple, scopes: Dict[int, Dict[str, Any]]):
+        self.start = start
+        self.frames = frames  # ((n° de scope, nom de fonction, appels terminaux élidés), ...)
+        self.scopes = scopes  # n° de scope -> bindings figés
+        self.marks: List[Tuple[Any, int]] = []       # (statement, taille de la sortie) par étape
+        self.writes: List[List[Tuple]] = [[]]        # écritures menant à chaque étape
+
+
+class History:
+    """
+    Historique borné d'une exécution. Le runtime tracé y signale les
+    écritures au fil de l'eau ; mark() clôt une étape.
+
+    Les scopes suivis sont le global (n° 0) et les frames de la pile,
+    numérotées à leur création (les Env et Frame sont recyclés, leur
+    identité ne suffit pas).
+    """
+    def __init__(self, interval: int = DEFAULT_INTERVAL, budget: int = DEFAULT_BUDGET):
+        self.interval = max(1, int(interval))
+        self.budget = max(1, int(budget))
+        self.segments: Deque[_Segment] = deque()
+        self.steps = 0
+        self._starts: List[int] = []
+        self._pending: List[Tuple] = []
+        self._live: List[Tuple[int, Optional[str], Env]] = []
+        self._elided: Dict[int, int] = {}  # n° de frame -> appels terminaux repliés
+        self._by_env: Dict[int, int] = {}
+        self._serial = 0
+        self.watched: Set[str] = set()
+        self.hit = False  # la dernière étape enregistrée a écrit un nom surveillé
+
+    # --- suivi en direct ---------------------------------------------------
+
+    def attach(self, global_env: Env) -> None:
+        self._live = [(0, None, global_env)]
+        self._by_env = {id(global_env): 0}
+
+    def written(self, env: Optional[Env], name: str) -> None:
+        serial = self._by_env.get(id(env)) if env is not None else None
+        if serial is not None:
+            self._pending.append(("set", serial, name, _snap(env.bindings[name])))
+        elif name in self.watched and env is not None:
+            # env hors de la pile (closure parente) : journalisé pour la seule surveillance
+            self._pending.append(("set", None, name, _snap(env.bindings[name])))
+
+    def removed(self, env: Env, name: str) -> None:
+        serial = self._by_env.get(id(env))
+        if serial is not None:
+            self._pending.append(("del", serial, name))
+
+    def pushed(self, func_name: str, env: Env) -> None:
+        self._serial += 1
+        self._live.append((self._serial, func_name, env))
+        self._by_env[id(env)] = self._serial
+        self._pending.append(("push", self._serial, func_name, self._freeze(env)))
+
+    def reset(self, env: Env, elided: int) -> None:
+        serial, func_name, old = self._live[-1]
+        del self._by_env[id(old)]
+        self._live[-1] = (serial, func_name, env)
+        self._by_env[id(env)] = serial
+        self._elided[serial] = elided
+        self._pending.append(("reset", serial, self._freeze(env), elided))
+
+    def popped(self) -> None:
+        serial, _, env = self._live.pop()
+        del self._by_env[id(env)]
+        self._elided.pop(serial, None)
+        self._pending.append(("pop",))
+
+    def mutated(self, obj: Any, replay: Optional[Callable] = None, args: Tuple = ()) -> None:
+        """
+        Un conteneur vient d'être modifié en place : on journalise les bindings
+        qui le référencent. Avec `replay`, c'est l'opération qui est
+        journalisée (push d'un élément...) plutôt qu'une copie du conteneur.
+        Un conteneur introuvable au premier niveau (liste imbriquée...) fait
+        journaliser tous les bindings mutables.
+        """
+        found = False
+        if replay is not None:
+            args = tuple(_snap(a) for a in args)
+        for serial, _, env in self._live:
+            for name, value in env.bindings.items():
+                if value is obj:
+                    found = True
+                    if replay is None:
+                        self._pending.append(("set", serial, name, _snap(value)))
+                    else:
+                        self._pending.append(("apply", serial, name, replay, args))
+        if not found:
+            self.mutated_all()
+
+    def mutated_all(self) -> None:
+        """Modifications inconnues (callback utilisateur...) : tous les conteneurs sont recopiés."""
+        for serial, _, env in self._live:
+            for name, value in env.bindings.items():
+                if type(value) in MUTABLE_TYPES:
+                    self._pending.append(("set", serial, name, _snap(value)))
+
+    def _freeze(self, env: Env, memo: Optional[Dict[int, Any]] = None) -> Dict[str, Any]:
+        if memo is None:
+            memo = {}
+        return {k: cow_copy(v, memo) for k, v in env.bindings.items()}
+
+    def mark(self, stmt: Any, out_len: int) -> int:
+        """Enregistre l'étape suivante (pause avant `stmt`, None en fin de programme)."""
+        step = self.steps
+        self.steps += 1
+        if step % self.interval == 0:
+            memo: Dict[int, Any] = {}
+            seg = _Segment(
+                step,
+                tuple((serial, name, self._elided.get(serial, 0)) for serial, name, _ in self._live[1:]),
+                {serial: self._freeze(env, memo) for serial, _, env in self._live},
+            )
+            seg.writes[0] = self._pending  # gardé pour la surveillance, pas rejoué
+            self.segments.append(seg)
+            self._starts.append(step)
+            if len(self.segments) > self.budget:
+                self.segments.popleft()
+                self._starts.pop(0)
+        else:
+            seg = self.segments[-1]
+            seg.writes.append(self._pending)
+        self.hit = bool(self.watched) and any(
+            e[0] in ("set", "apply") and e[2] in self.watched for e in self._pending
+        )
+        self._pending = []
+        seg.marks.append((stmt, out_len))
+        return step
+
+    # --- consultation ------------------------------------------------------
+
+    @property
+    def first(self) -> int:
+        return self.segments[0].start if self.segments else 0
+
+    @property
+    def last(self) -> int:
+        return self.steps - 1
+
+    def mark_at(self, step: int) -> Tuple[Any, int]:
+        seg = self._segment(step)
+        return seg.marks[step - seg.start]
+
+    def watch_hits(self, step: int) -> List[Tuple]:
+        """Écritures de noms surveillés ayant mené à cette étape."""
+        if not self.watched:
+            return []
+        seg = self._segment(step)
+        return [
+            e for e in seg.writes[step - seg.start]
+            if e[0] in ("set", "apply") and e[2] in self.watched
+        ]
+
+    def state_at(self, step: int) -> Tuple[List[Tuple[int, str, int]], Dict[int, Dict[str, Any]]]:
+        """Reconstruit (frames, scopes) à une étape : checkpoint + au plus interval-1 journaux."""
+        seg = self._segment(step)
+        frames = list(seg.frames)
+        scopes = {serial: dict(b) for serial, b in seg.scopes.items()}
+        fresh = set()  # conteneurs déjà recopiés : les valeurs de l'historique restent intactes
+        for entries in seg.writes[1:step - seg.start + 1]:
+            for entry in entries:
+                kind = entry[0]
+                if kind == "set":
+                    scope = scopes.get(entry[1])
+                    if scope is not None:
+                        scope[entry[2]] = entry[3]
+                        fresh.discard(entry[1:3])
+                elif kind == "apply":
+                    scope = scopes.get(entry[1])
+                    if scope is not None:
+                        if entry[1:3] not in fresh:
+                            scope[entry[2]] = cow_copy(scope[entry[2]])
+                            fresh.add(entry[1:3])
+                        entry[3](scope[entry[2]], *entry[4])
+                elif kind == "push":
+                    frames.append((entry[1], entry[2], 0))
+                    scopes[entry[1]] = dict(entry[3])
+                elif kind == "pop":
+                    scopes.pop(frames.pop()[0], None)
+                elif kind == "del":
+                    scope = scopes.get(entry[1])
+                    if scope is not None:
+                        scope.pop(entry[2], None)
+                        fresh.discard(entry[1:3])
+                else:  # reset : la frame du sommet est réutilisée
+                    frames[-1] = (entry[1], frames[-1][1], entry[3])
+                    scopes[entry[1]] = dict(entry[2])
+                    fresh = {key for key in fresh if key[0] != entry[1]}
+        return frames, scopes
+
+    def _segment(self, step: int) -> _Segment:
+        if not self.first <= step <= self.last:
+            raise IndexError(f"Étape {step} hors de l'historique")
+        return self.segments[bisect_right(self._starts, step) - 1]
+
+
+def _traced_env_class(history: History) -> type:
+    class TracedEnv(Env):
+        """Env dont chaque écriture est signalée à l'historique."""
+        __slots__ = ()
+
+        def define(self, name: str, value: Any) -> None:
+            Env.define(self, name, value)
+            history.written(self, name)
+
+        def set(self, name: str, value: Any) -> None:
+            Env.set(self, name, value)
+            history.written(self.resolve(name), name)
+
+        def undefine(self, name: str) -> None:
+            Env.undefine(self, name)
+            history.removed(self, name)
+
+    return TracedEnv
+
+
+class TracedRuntime(Runtime):
+    """Runtime dont les écritures et les appels alimentent un History."""
+    def __init__(self, history: History, **kwargs: Any):
+        self.env_class = _traced_env_class(history)
+        super().__init__(**kwargs)
+        self.history = history
+        history.attach(self.global_env)
+
+    def enter_function(self, func_name, params, args, caller_env, call_line=None, call_col=None) -> Env:
+        env = super().enter_function(func_name, params, args, caller_env, call_line, call_col)
+        self.history.pushed(func_name, env)
+        return env
+
+    def reenter_function(self, params, args, caller_env) -> Env:
+        env = super().reenter_function(params, args, caller_env)
+        self.history.reset(env, self.stack.top().elided)
+        return env
+
+    def leave_function(self) -> None:
+        super().leave_function()
+        self.history.popped()
+
+
+class DebugEvaluator(TaskEvaluator):
+    """
+    Évaluateur générateur qui rend la main avant chaque statement
+    (("stmt", node)) et signale à l'historique les conteneurs modifiés en
+    place. `effects` associe aux builtins mutants ou à callback leur effet
+    et, s'il est rejouable, la fonction qui refait l'opération sur une copie.
+    """
+    def __init__(self, runtime: TracedRuntime, effects: Dict[Any, Tuple[str, Optional[Callable]]]):
+        super().__init__(runtime, quantum=1)
+        self.history = runtime.history
+        self.effects = effects
+
+    def _block(self, stmts: List[Any]):
+        for s in stmts:
+            self._before_stmt(s)
+            self.statements += 1
+            yield ("stmt", s)
+            t = type(s)
+            if _has_call(s) or t in (IfStmt, WhileStmt, ForStmt) or (t is Assign and type(s.target) is Index):
+                yield from self._stmt(s)
+            else:
+                self.eval(s)
+
+    def _stmt(self, node: Any):
+        if type(node) is Assign and type(node.target) is Index:
+            value = yield from self._expr(node.value)
+            obj = yield from self._expr(node.target.target)
+            idx = yield from self._expr(node.target.index)
+            try:
+                obj[idx] = value
+            except Exception as ex:
+                raise RuntimeErrorMS(f"Affectation index invalide: {ex}", filename=self.rt.filename)
+            self.history.mutated(obj, operator.setitem, (idx, value))
+            return
+        yield from super()._stmt(node)
+
+    def call(self, callee: Any, args: List[Any]) -> Any:
+        value = super().call(callee, args)
+        effect = self.effects.get(callee) if callable(callee) else None
+        if effect is not None:
+            if effect[0] == "calls":
+                # une fonction utilisateur passée en callback écrit via TracedEnv et
+                # cet évaluateur ; seul un builtin mutant appelé par le builtin échappe au journal
+                if any(callable(a) and a in self.effects for a in args):
+                    self.history.mutated_all()
+            elif args:
+                self.history.mutated(args[0], effect[1], args[1:])
+        return value
+
+
 class Debugger:
     """
-    Orchestrateur de debug : runtime + interpréteur + programme.
-    Fournit : set_breakpoints, continue, step, variables, callstack,
-    run_until_pause, run_to_end, capture stdout, etc.
+    Orchestrateur de debug : runtime tracé + évaluateur pas à pas + historique.
+    Fournit : set_breakpoints, watch/unwatch, continue, step, back, goto,
+    variables, callstack, run_to_end. La « vue » est l'étape affichée ; elle peut être
+    dans le passé, l'exécution réelle restant à la dernière étape.
+
+    Les breakpoints conditionnels sont testés côté serveur pendant
+    `continue` : un breakpoint qui ne se déclenche pas ne coûte que
+    l'évaluation de sa condition, déjà compilée. Passages et log points ne
+    sont comptés qu'en exécution réelle ; en rejouant l'historique, on
+    s'arrête là où un breakpoint s'est déclenché, ou sur une ligne dont la
+    condition est vraie dans l'état reconstruit.
     """
     def __init__(
         self,
-        interpreter_factory: Callable[[Runtime], Any],
-        filename: str = "<stdin>"
+        filename: str = "<stdin>",
+        interval: int = DEFAULT_INTERVAL,
+        budget: int = DEFAULT_BUDGET,
     ):
         self.filename = filename
-        self.runtime: Runtime = make_runtime(filename=filename)
-        self._make_interpreter = interpreter_factory
-        self.interpreter = self._make_interpreter(self.runtime)
+        self.interval = interval
+        self.budget = budget
+        self.tape = Tape()
         self._program = None
-        self._paused = False
-        self._last_output = ""
+        self.breakpoints = BreakpointManager()
+        self._watches: Set[str] = set()
+        self.logs: Deque[Dict[str, Any]] = deque(maxlen=LOG_LIMIT)
+        self._logged_upto = -1  # une ré-exécution ne relogue pas les étapes déjà vues
+        self._start()
+
+    def _start(self) -> None:
+        """(Ré)initialise l'exécution ; la bande d'aléas est rejouée depuis le début."""
+        self.tape.rewind()
+        self.history = History(self.interval, self.budget)
+        self.history.watched = self._watches
+        self.runtime = TracedRuntime(self.history, filename=self.filename, builtins=self.tape.builtins())
+        self.runtime.breakpoints = self.breakpoints
+        self.breakpoints.reset_hits()
+        self._fired: Set[int] = set()  # étapes où un breakpoint s'est déclenché
+        self._bp_error: Optional[Tuple[int, str]] = None
+        # une opération de la stdlib se rejoue telle quelle ; shuffle est aléatoire
+        effects = {
+            fn: (EFFECTS[name], fn if fn is BUILTINS[name] and name != "shuffle" else None)
+            for bindings in (BUILTINS, self.runtime.global_env.bindings)
+            for name, fn in bindings.items()
+            if EFFECTS.get(name) in ("mutates", "calls")
+        }
+        self.interpreter = DebugEvaluator(self.runtime, effects)
+        self._hidden = dict(self.runtime.global_env.bindings)  # memo, builtins enregistrés
+        self._out = io.StringIO()
+        self._gen = self.interpreter.run(self._program) if self._program is not None else None
+        self._send: Any = None
+        self.done = False
+        self.error: Optional[str] = None
+        self.error_type: Optional[str] = None  # classe de l'erreur (métriques)
+        self.view = -1
 
     # Chargement programme/AST
     def load_program(self, program_ast: Any) -> None:
         self._program = program_ast
+        self.logs.clear()
+        self._logged_upto = -1
+        self._start()
 
     def reset(self) -> None:
-        self.runtime = make_runtime(filename=self.filename)
-        self.interpreter = self._make_interpreter(self.runtime)
         self._program = None
-        self._paused = False
-        self._last_output = ""
+        self.tape = Tape()
+        self._start()
 
     # Breakpoints / contrôle
-    def set_breakpoints(self, lines: List[int]) -> None:
+    def set_breakpoints(self, lines: List[Any]) -> None:
+        """Numéros de ligne, ou dicts {"line", "condition", "hit_condition", "log_message"}."""
         self.runtime.set_breakpoints(self.filename, lines)
+        self._fired.clear()
 
     def clear_breakpoints(self) -> None:
-        self.runtime.breakpoints.clear()
+        self.breakpoints.clear()
+        self._fired.clear()
+
+    def watch(self, name: str) -> List[str]:
+        """
+        Watchpoint : `continue` s'arrête après toute écriture du nom (affectation,
+        boucle for, def) ou modification en place du conteneur qu'il désigne
+        (push, update..., affectation indexée), dans n'importe quel scope.
+        """
+        self._watches.add(str(name))
+        return sorted(self._watches)
+
+    def unwatch(self, name: str) -> List[str]:
+        self._watches.discard(str(name))
+        return sorted(self._watches)
+
+    def continue_(self, line: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Avance jusqu'au prochain breakpoint ou watchpoint (historique d'abord,
+        puis exécution réelle). Avec `line`, s'arrête aussi au prochain
+        passage sur cette ligne (« run to line », breakpoint temporaire).
+        """
+        def at_line(stmt: Any) -> bool:
+            return line is not None and getattr(stmt, "line", None) == line
 
-    def continue_(self) -> Dict[str, Any]:
-        self.runtime.continue_()
-        return self._run_until_pause()
+        for step in range(self.view + 1, self.history.last + 1):
+            if (step in self._fired or self.history.watch_hits(step)
+                    or at_line(self.history.mark_at(step)[0]) or self._recorded_hit(step)):
+                return self.goto(step)
+        self._advance(lambda stmt: self._live_hit(stmt) or self.history.hit or at_line(stmt))
+        return self._state()
 
     def step(self) -> Dict[str, Any]:
-        self.runtime.step()
-        return self._run_until_pause()
+        return self.goto(self.view + 1)
+
+    def back(self) -> Dict[str, Any]:
+        """Pas arrière : revient à l'étape précédente."""
+        return self.goto(max(0, self.view - 1))
 
     def run_to_end(self) -> Dict[str, Any]:
-        self.runtime.continue_()
-        return self._run(full=True)
+        self._advance(lambda stmt: False)
+        return self._state()
+
+    def goto(self, step: int) -> Dict[str, Any]:
+        """
+        Affiche l'étape demandée : reconstruite depuis l'historique si elle y
+        est encore, sinon atteinte en exécutant (depuis le début au besoin).
+        """
+        step = max(0, int(step))
+        if step < self.history.first:
+            self._start()
+        if step > self.history.last:
+            self._advance(lambda stmt: self.history.last >= step)
+        else:
+            self.view = step
+        return self._state()
+
+    def state(self) -> Dict[str, Any]:
+        return self._state()
 
     def variables(self) -> Dict[str, Any]:
-        return self.runtime.variables_snapshot()
+        return self._state()["variables"]
 
     def callstack(self) -> List[Dict[str, Any]]:
-        return self.runtime.callstack_snapshot()
+        return self._state()["callstack"]
 
     def is_paused(self) -> bool:
-        return self.runtime.paused
+        return self._state()["paused"]
 
     def last_output(self) -> str:
-        return self._last_output
+        return self._state()["output"]
+
+    # Breakpoints
+    def _breakpoint_at(self, stmt: Any) -> Optional[Breakpoint]:
+        if stmt is None or not self.breakpoints:
+            return None
+        return self.breakpoints.get(self.filename, getattr(stmt, "line", None))
+
+    def _guard(self, bp: Breakpoint, ev: Evaluator) -> None:
+        """Fonctions du programme appelées par le breakpoint : seules les pures (cf. memo.impurity) sont admises."""
+        env = ev.rt.current_env()
+        for name in bp.calls:
+            fn = env.get(name)
+            if isinstance(fn, MemoFunction):
+                fn = fn.fn
+            reason = impurity(fn) if isinstance(fn, UserFunction) else "pas une fonction"
+            if reason:
+                raise RuntimeErrorMS(f"Appel non autorisé dans un breakpoint : {name} ({reason})", filename=self.filename)
+
+    def _test(self, bp: Breakpoint, ev: Evaluator, step: int) -> bool:
+        """Condition du breakpoint ; une condition en erreur arrête l'exécution."""
+        try:
+            self._guard(bp, ev)
+            return bool(ev.eval(bp.cond))
+        except Exception as ex:
+            self._bp_error = (step, format_error(ex))
+            return True
+
+    def _live_hit(self, stmt: Any) -> bool:
+        """Exécution réelle, en pause avant `stmt` : condition, passages puis log point."""
+        bp = self._breakpoint_at(stmt)
+        if bp is None:
+            return False
+        ev = self._evaluator_live() if bp.calls else self.interpreter
+        if bp.cond is not None and not self._test(bp, ev, self.view):
+            return False
+        bp.hits += 1
+        if bp.hit_ok is not None and not bp.hit_ok(bp.hits):
+            return False
+        if bp.log_parts is not None:
+            self._log(bp, ev)
+            return False
+        self._fired.add(self.view)
+        return True
+
+    def _log(self, bp: Breakpoint, ev: Evaluator) -> None:
+        if self.view <= self._logged_upto:
+            return
+        self._logged_upto = self.view
+        try:
+            self._guard(bp, ev)
+        except Exception as ex:
+            self.logs.append({"step": self.view, "line": bp.line, "message": f"<{format_error(ex)}>"})
+            return
+        out = []
+        for i, part in enumerate(bp.log_parts):
+            if i % 2 == 0:
+                out.append(part)
+                continue
+            try:
+                out.append(str(flatten(ev.eval(part))))
+            except Exception as ex:
+                out.append(f"<{format_error(ex)}>")
+        self.logs.append({"step": self.view, "line": bp.line, "message": "".join(out)})
+
+    def _recorded_hit(self, step: int) -> bool:
+        """Historique : ligne d'un breakpoint simple, ou dont la condition vaut vrai à cette étape."""
+        bp = self._breakpoint_at(self.history.mark_at(step)[0])
+        if bp is None or bp.hit_ok is not None or bp.log_parts is not None:
+            return False  # passages et log points : seuls comptent les déclenchements réels
+        return bp.cond is None or self._test(bp, self._evaluator_at(step), step)
+
+    def _evaluator_at(self, step: int) -> Evaluator:
+        """Évaluateur jetable sur l'état reconstruit d'une étape (global + frame courante)."""
+        frames, scopes = self.history.state_at(step)
+        rt = Runtime(filename=self.filename)
+        rt.global_env = Env(bindings=scopes[0], parent=self.runtime.global_env.parent, sites=rt.sites)  # builtins et modules
+        if frames:
+            serial, name, _ = frames[-1]
+            rt.stack.push(Frame(name, Env(bindings=scopes[serial], parent=rt.global_env), self.filename))
+        return Evaluator(rt)
+
+    def _evaluator_live(self) -> Evaluator:
+        """
+        Évaluateur jetable sur l'état réel courant, pour un breakpoint qui
+        appelle des fonctions du programme : leurs frames ne passent ni par
+        la pile tracée ni par l'historique.
+        """
+        rt = Runtime(filename=self.filename)
+        live = self.runtime
+        rt.global_env = Env(bindings=live.global_env.bindings, parent=live.global_env.parent, sites=rt.sites)
+        top = live.stack.top()
+        if top is not None:
+            rt.stack.push(Frame(top.func_name, top.env, self.filename))
+        return Evaluator(rt)
 
     # Exécution
-    def _run_until_pause(self) -> Dict[str, Any]:
-        return self._run(full=False)
 
-    def _run(self, full: bool) -> Dict[str, Any]:
+    def _advance(self, stop: Callable[[Any], bool]) -> None:
+        """Exécute jusqu'à une étape où stop(statement) est vrai, ou jusqu'à la fin."""
         if self._program is None:
             raise RuntimeErrorMS("Aucun programme chargé", filename=self.filename)
+        with StdoutCapture(self._out):
+            while not self.done:
+                try:
+                    req = self._gen.send(self._send)
+                except StopIteration:
+                    self._finish(None)
+                    break
+                except Exception as ex:
+                    self._finish(ex)
+                    break
+                self._send = None
+                kind = req[0]
+                if kind == "input":
+                    self._send = self.tape.take(lambda: "")
+                    continue
+                if kind != "stmt":
+                    continue  # sleep : pas d'attente en debug
+                self.view = self.history.mark(req[1], self._out.tell())
+                if stop(req[1]):
+                    break
+        if self.done:
+            self.view = self.history.last
 
-        out = ""
-        err = None
-        paused = False
+    def _finish(self, error: Optional[BaseException]) -> None:
+        self.done = True
+        if error is not None:
+            self.error = format_error(error)
+            self.error_type = type(error).__name__
+        self.history.mark(None, self._out.tell())
 
-        try:
-            with StdoutCapture() as cap:
-                # L’interpréteur doit consulter runtime.before_stmt(...) avant chaque statement
-                # pour que les breakpoints/step prennent effet. Ici on lance l’évaluation :
-                self.interpreter.eval(self._program)
-                out = cap.text
-        except ReturnSignal as rs:
-            out = out + ""
-            paused = False
-        except RuntimeErrorMS as ex:
-            err = str(ex)
-            paused = False
-        except Exception as ex:
-            err = f"RuntimeError: {ex}"
-            paused = False
-        finally:
-            # Si le hook before_stmt a mis paused=True en cours de route, on le reflète ici
-            paused = paused or self.runtime.paused
-            self._paused = paused
-            self._last_output = out
-
-        result = {
-            "paused": paused,
-            "output": out,
-            "error": err,
-            "breakpoints": self.runtime.breakpoints.snapshot(),
-            "variables": self.variables(),
-            "callstack": self.callstack(),
+    def _state(self) -> Dict[str, Any]:
+        if self.view < 0:
+            frames, scopes, stmt, out_len = [], {0: {}}, None, 0
+        else:
+            frames, scopes = self.history.state_at(self.view)
+            stmt, out_len = self.history.mark_at(self.view)
+        hidden = self._hidden
+        variables = {k: v for k, v in scopes[0].items() if not (k in hidden and v is hidden[k])}
+        if frames:
+            variables.update(scopes[frames[-1][0]])
+        at_end = self.done and self.view == self.history.last
+        bp = self._breakpoint_at(stmt)
+        breakpoint = None
+        if bp is not None:
+            breakpoint = bp.info()
+            if self._bp_error is not None and self._bp_error[0] == self.view:
+                breakpoint["error"] = self._bp_error[1]
+        return {
+            "paused": stmt is not None,
+            "step": self.view,
+            "line": getattr(stmt, "line", None),
+            "output": self._out.getvalue()[:out_len],
+            "error": self.error if at_end else None,
+            "breakpoints": self.breakpoints.snapshot(),
+            "breakpoint": breakpoint,
+            "logs": list(self.logs),
+            "variables": _visible(variables),
+            "callstack": [
+                {"function": name, "filename": self.filename, "locals": _visible(scopes[serial]), "elided": elided}
+                for serial, name, elided in reversed(frames)
+            ],
+            "watches": sorted(self._watches),
+            "watch_hits": self._watch_hits(frames, scopes),
+            "history": {"first": self.history.first, "last": self.history.last, "done": self.done},
         }
-        return result
 
-def default_interpreter_factory(InterpreterClass):
-    def factory(rt: Runtime):
-        return InterpreterClass() if rt is None else InterpreterClass()
-    return factory
+    def _watch_hits(self, frames: List[Tuple[int, str, int]], scopes: Dict[int, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Noms surveillés écrits par l'étape menant à la vue, avec ancienne et nouvelle valeur."""
+        hits = self.history.watch_hits(self.view) if self.view >= 0 else []
+        if not hits:
+            return []
+        previous: Dict[int, Dict[str, Any]] = {}
+        if self.view > self.history.first:
+            _, previous = self.history.state_at(self.view - 1)
+        functions = {serial: name for serial, name, _ in frames}
+        functions[0] = "<global>"
+        out, seen = [], set()
+        for entry in hits:
+            kind, serial, name = entry[:3]
+            if (serial, name) in seen:
+                continue
+            seen.add((serial, name))
+            if serial in scopes:
+                new = scopes[serial].get(name)
+            else:  # frame déjà quittée, ou closure parente
+                new = entry[3] if kind == "set" else None
+            out.append({
+                "name": name,
+                "function": functions.get(serial),
+                "old": _render(previous.get(serial, {}).get(name)),
+                "new": _render(new),
+            })
+        return out
@@ -1,21 +1,57 @@
-from typing import Any, List
+import operator
+from typing import Any, List, Optional
 from backend.ast_nodes import (
-    Program, Number, String, Bool, Array, Dict,
+    Program, Number, String, Bool, Array, Dict, ListComp, DictComp,
     Variable, Assign, BinaryOp, PrintStmt,
     IfStmt, WhileStmt, ForStmt,
-    FunctionDef, FunctionCall, Return, Index
+    FunctionDef, FunctionCall, Return, Index, LoopInvariant, ResetInvariants, ImportStmt, walk
 )
 from backend.interpreter.runtime import (
-    Runtime, Env, ReturnSignal, RuntimeErrorMS
+    Runtime, Env, BUILTINS_ENV, ModuleBindings, ReturnSignal, TailCallSignal, RuntimeErrorMS
 )
+from backend.interpreter.values import StringBuilder
+from backend.interpreter.memo import MemoFunction, memo_key
+from backend.interpreter.stdlib import MUTATING_FUNCTIONS
+
+_MISS = object()
+
+QUICKEN_MAX_DEOPTS = 4  # au-delà, le site reste générique (types trop variables)
+
+_NUMERIC_OPS = {
+    '+': operator.add, '-': operator.sub, '*': operator.mul, '/': operator.truediv,
+    '//': operator.floordiv, '%': operator.mod, '**': operator.pow,
+    '>': operator.gt, '<': operator.lt, '==': operator.eq, '!=': operator.ne,
+    '>=': operator.ge, '<=': operator.le,
+}
+_STR_OPS = {k: v for k, v in _NUMERIC_OPS.items() if k in ('+', '>', '<', '==', '!=', '>=', '<=')}
+
+# (op, type gauche, type droit) -> fonction équivalente à _binary pour ces types
+SPECIALISED_OPS = {(op, lt, rt): fn for op, fn in _NUMERIC_OPS.items()
+                for lt in (int, float) for rt in (int, float)}
+SPECIALISED_OPS.update({(op, str, str): fn for op, fn in _STR_OPS.items()})
+SPECIALISED_OPS[('*', str, int)] = operator.mul
 
 
 class UserFunction:
-    def __init__(self, name: str, params: List[str], body: List[Any], closure_env: Env):
+    def __init__(
+        self,
+        name: str,
+        params: List[str],
+        body: List[Any],
+        closure_env: Env,
+        evaluator: Optional["Evaluator"] = None,
+    ):
         self.name = name
         self.params = params
         self.body = body
         self.closure_env = closure_env
+        self.evaluator = evaluator
+
+    def __call__(self, *args):
+        # appel depuis un builtin Python (map, filter, pmap...)
+        if self.evaluator is None:
+            raise RuntimeErrorMS(f"Fonction {self.name} non liée à un évaluateur")
+        return self.evaluator.call(self, list(args))
 
     def __repr__(self):
         return f"<Function {self.name}({', '.join(self.params)})>"
@@ -24,13 +60,22 @@ class UserFunction:
 class Evaluator:
     def __init__(self, runtime: Runtime):
         self.rt = runtime
+        self._active_fn = None  # fonction utilisateur dont le corps s'exécute
+        self.ic_hits = 0
+        self.ic_misses = 0
+        self.q_deopts = 0
+        self._quickened: set = set()  # sites BinaryOp spécialisés par cet évaluateur
+        for fn in runtime.pending_functions:
+            fn.evaluator = self
+        runtime.pending_functions.clear()
 
     def eval(self, node: Any) -> Any:
         t = type(node)
 
         if t is Program:
+            self._watch_call_sites(node)
             for stmt in node.statements:
-                self._before_stmt()
+                self._before_stmt(stmt)
                 self.eval(stmt)
             return None
 
@@ -57,9 +102,15 @@ class Evaluator:
                 out[k] = v
             return out
 
+        if t is ListComp or t is DictComp:
+            return self._comprehension(node)
+
         if t is Variable:
             env = self.rt.current_env()
-            return env.get(node.name)
+            v = env.get(node.name)
+            if type(v) is StringBuilder and v.implicit:
+                return str(v)
+            return v
 
         if t is Index:
             target = self.eval(node.target)
@@ -72,45 +123,23 @@ class Evaluator:
         if t is BinaryOp:
             left = self.eval(node.left)
             right = self.eval(node.right)
-            op = node.op
-            if op == '+':
-                if isinstance(left, str) or isinstance(right, str):
-                    return str(left) + str(right)
-                return left + right
-            if op == '-':
-                return left - right
-            if op == '*':
-                return left * right
-            if op == '/':
-                return left / right
-            if op == '//':
-                return left // right
-            if op == '%':
-                return left % right
-            if op == '**':
-                return left ** right
-            if op == '>':
-                return left > right
-            if op == '<':
-                return left < right
-            if op == '==':
-                return left == right
-            if op == '!=':
-                return left != right
-            if op == '>=':
-                return left >= right
-            if op == '<=':
-                return left <= right
-            raise RuntimeErrorMS(f"Opérateur inconnu: {op}", filename=self.rt.filename)
+            fn = node.q_fn
+            if fn is not None and type(left) is node.q_left and type(right) is node.q_right:
+                return fn(left, right)
+            return self._quicken(node, left, right)
 
         if t is Assign:
             env = self.rt.current_env()
+            if isinstance(node.target, Variable) and self._accumulate(env, node.target.name, node.value):
+                return None
             value = self.eval(node.value)
             if isinstance(node.target, Variable):
                 env.set(node.target.name, value)
                 return None
             if isinstance(node.target, Index):
-                target = self.eval(node.target.target)
+                held = [value]
+                target = self.rt.writable(self.eval(node.target.target), held)
+                value = held[0]
                 idx = self.eval(node.target.index)
                 try:
                     target[idx] = value
@@ -127,20 +156,20 @@ class Evaluator:
         if t is IfStmt:
             if self._truthy(self.eval(node.condition)):
                 for s in node.body:
-                    self._before_stmt()
+                    self._before_stmt(s)
                     self.eval(s)
             else:
                 done = False
                 for cond, body in getattr(node, "elifs", []):
                     if self._truthy(self.eval(cond)):
                         for s in body:
-                            self._before_stmt()
+                            self._before_stmt(s)
                             self.eval(s)
                         done = True
                         break
                 if not done:
                     for s in getattr(node, "orelse", []):
-                        self._before_stmt()
+                        self._before_stmt(s)
                         self.eval(s)
             return None
 
@@ -148,7 +177,7 @@ class Evaluator:
             guard = 0
             while self._truthy(self.eval(node.condition)):
                 for s in node.body:
-                    self._before_stmt()
+                    self._before_stmt(s)
                     self.eval(s)
                 guard += 1
                 if guard > 1_000_000:
@@ -165,55 +194,286 @@ class Evaluator:
             for v in iterator:
                 env.set(node.var_name, v)
                 for s in node.body:
-                    self._before_stmt()
+                    self._before_stmt(s)
                     self.eval(s)
             return None
 
         if t is FunctionDef:
             closure = self.rt.current_env()
-            fn = UserFunction(node.name, node.params, node.body, closure)
+            closure.escaped = True  # l'env survit à l'appel : pas de recyclage
+            fn = UserFunction(node.name, node.params, node.body, closure, self)
             closure.set(node.name, fn)
             return None
 
         if t is FunctionCall:
-            env = self.rt.current_env()
-            callee = env.get(node.name)
+            callee = self._callee(node)
             args = [self.eval(a) for a in node.args]
+            return self.call(callee, args)
+
+        if t is Return:
+            if node.value is None:
+                raise ReturnSignal(None)
+            value = node.value
+            if type(value) is FunctionCall and self._active_fn is not None:
+                # `return f(...)` sur la fonction courante : on reboucle dans la même frame
+                if self.rt.current_env().get(value.name) is self._active_fn:
+                    raise TailCallSignal([self.eval(a) for a in value.args])
+            val = self.eval(value)
+            raise ReturnSignal(val)
+
+        if t is LoopInvariant:
+            cache = self.rt.invariants()
+            v = cache.get(node.key, _MISS)
+            if v is _MISS:
+                v = cache[node.key] = self.eval(node.expr)
+            return v
+
+        if t is ResetInvariants:
+            cache = self.rt.invariants()
+            for key in node.keys:
+                cache.pop(key, None)
+            return None
+
+        if t is ImportStmt:
+            from backend.interpreter.modules import import_module
+            import_module(self, node.name)
+            return None
+
+        raise RuntimeErrorMS(f"Nœud AST non géré: {t.__name__}", filename=self.rt.filename)
 
-            if isinstance(callee, UserFunction):
-                local_env = self.rt.enter_function(
-                    func_name=callee.name,
-                    params=callee.params,
-                    args=args,
-                    caller_env=callee.closure_env,
-                    call_line=None,
-                    call_col=None,
-                )
+    def _comprehension(self, node: Any) -> Any:
+        """
+        Compréhension : boucle directe qui remplit le conteneur, sans appel de
+        builtin ni hook de statement par itération. La variable n'est liée
+        que le temps de la compréhension, dans l'env courant.
+        """
+        iterator = self._comp_iter(self.eval(node.iterable))
+        env = self.rt.current_env()
+        name = node.var_name
+        saved = env.bindings.get(name, _MISS)
+        define = env.define
+        ev = self.eval
+        cond = node.condition
+        try:
+            if type(node) is DictComp:
+                key, value = node.key, node.value
+                out = {}
+                for v in iterator:
+                    define(name, v)
+                    if cond is None or self._truthy(ev(cond)):
+                        k = ev(key)
+                        out[k] = ev(value)
+                return out
+            expr = node.expr
+            out = []
+            append = out.append
+            for v in iterator:
+                define(name, v)
+                if cond is None or self._truthy(ev(cond)):
+                    append(ev(expr))
+            return out
+        finally:
+            self._comp_restore(env, name, saved)
+
+    def _comp_iter(self, iterable: Any) -> Any:
+        try:
+            return iter(iterable)
+        except Exception:
+            raise RuntimeErrorMS("Objet non itérable dans une compréhension", filename=self.rt.filename)
+
+    def _comp_restore(self, env: Env, name: str, saved: Any) -> None:
+        if saved is not _MISS:
+            env.define(name, saved)
+        elif name in env.bindings:
+            env.undefine(name)
+
+    def _binary(self, op: str, left: Any, right: Any) -> Any:
+        if op == '+':
+            if isinstance(left, (str, StringBuilder)) or isinstance(right, (str, StringBuilder)):
+                return str(left) + str(right)
+            return left + right
+        if op == '-':
+            return left - right
+        if op == '*':
+            return left * right
+        if op == '/':
+            return left / right
+        if op == '//':
+            return left // right
+        if op == '%':
+            return left % right
+        if op == '**':
+            return left ** right
+        if op == '>':
+            return left > right
+        if op == '<':
+            return left < right
+        if op == '==':
+            return left == right
+        if op == '!=':
+            return left != right
+        if op == '>=':
+            return left >= right
+        if op == '<=':
+            return left <= right
+        raise RuntimeErrorMS(f"Opérateur inconnu: {op}", filename=self.rt.filename)
+
+    def _quicken(self, node: BinaryOp, left: Any, right: Any) -> Any:
+        """
+        Chemin lent d'un BinaryOp : dé-spécialise le site si les types ont
+        changé, sinon le spécialise quand la même paire de types est observée
+        deux fois de suite. Le calcul passe toujours par _binary.
+        """
+        lt, rt = type(left), type(right)
+        if node.q_fn is not None:
+            node.q_fn = None
+            node.q_deopts += 1
+            self.q_deopts += 1
+            self._quickened.discard(node)
+        elif node.q_deopts < QUICKEN_MAX_DEOPTS and lt is node.q_left and rt is node.q_right:
+            fn = SPECIALISED_OPS.get((node.op, lt, rt))
+            if fn is not None:
+                node.q_fn = fn
+                self._quickened.add(node)
+        node.q_left, node.q_right = lt, rt
+        return self._binary(node.op, left, right)
+
+    def _watch_call_sites(self, program: Program) -> None:
+        """
+        Enregistre les noms appelés par le programme avant de l'exécuter :
+        toute liaison ultérieure de ces noms invalidera les caches en ligne.
+        """
+        names = getattr(program, "call_names", None)
+        if names is None:
+            names = frozenset(n.name for n in walk(program) if type(n) is FunctionCall)
+            program.call_names = names
+        sites = self.rt.sites
+        if not sites.watched.issuperset(names):
+            sites.watch(names)
+
+    def _callee(self, node: FunctionCall) -> Any:
+        root = self.rt.global_env
+        if node.ic_version == self.rt.sites.version and node.ic_root is root:
+            self.ic_hits += 1
+            return node.ic_value
+        self.ic_misses += 1
+        return self._resolve_call(node, root)
+
+    def _resolve_call(self, node: FunctionCall, root: Env) -> Any:
+        scope = self.rt.current_env().resolve(node.name)
+        if scope is None:
+            raise NameError(f"Variable non définie : {node.name}")
+        callee = scope.bindings[node.name]
+        # seules les résolutions dans le global (fonctions de tête), les modules ou
+        # les builtins sont stables d'un appel à l'autre ; les envs locaux sont recréés à chaque appel
+        if (scope is root or scope is BUILTINS_ENV or type(scope.bindings) is ModuleBindings) and node.name in self.rt.sites.watched:
+            node.ic_version = self.rt.sites.version
+            node.ic_root = root
+            node.ic_value = callee
+        return callee
+
+    def profile_stats(self) -> dict:
+        total = self.ic_hits + self.ic_misses
+        return {
+            "inline_cache": {
+                "hits": self.ic_hits,
+                "misses": self.ic_misses,
+                "hit_rate": (self.ic_hits / total) if total else 0.0,
+            },
+            "quickening": {
+                "specialised_sites": len(self._quickened),
+                "deopts": self.q_deopts,
+            },
+        }
+
+    def call(self, callee: Any, args: List[Any]) -> Any:
+        """Appelle une fonction utilisateur, mémoïsée ou un builtin."""
+        if isinstance(callee, UserFunction):
+            return self._call_user(callee, args)
+
+        if isinstance(callee, MemoFunction):
+            return self._call_memo(callee, args)
+
+        if callable(callee):
+            if args and self.rt.cow is not None and callee in MUTATING_FUNCTIONS:
+                args[0] = self.rt.writable(args[0], args)
+            return callee(*args)
+
+        raise RuntimeErrorMS(f"Objet appelable inconnu: {callee}", filename=self.rt.filename)
+
+    def _call_user(self, fn: UserFunction, args: List[Any]) -> Any:
+        rt = self.rt
+        rt.enter_function(
+            func_name=fn.name,
+            params=fn.params,
+            args=args,
+            caller_env=fn.closure_env,
+            call_line=None,
+            call_col=None,
+        )
+        outer = self._active_fn
+        self._active_fn = fn
+        try:
+            while True:
                 try:
-                    for s in callee.body:
-                        self._before_stmt()
+                    for s in fn.body:
+                        self._before_stmt(s)
                         self.eval(s)
+                    return None
+                except TailCallSignal as tc:
+                    rt.reenter_function(fn.params, tc.args_values, fn.closure_env)
                 except ReturnSignal as rs:
-                    self.rt.leave_function()
                     return rs.value
-                self.rt.leave_function()
-                return None
+        finally:
+            self._active_fn = outer
+            rt.leave_function()
 
-            if callable(callee):
-                return callee(*args)
+    def _call_memo(self, mf: MemoFunction, args: List[Any]) -> Any:
+        cache = self.rt.memo
+        key = memo_key(mf.fn, args)
+        try:
+            value = cache.get(key, _MISS)
+        except TypeError:
+            # arguments non hachables : pas de cache
+            return self._call_user(mf.fn, args)
+        if value is _MISS:
+            value = self._call_user(mf.fn, args)
+            cache.put(key, value)
+        return value
 
-            raise RuntimeErrorMS(f"Objet appelable inconnu: {callee}", filename=self.rt.filename)
+    def _accumulate(self, env: Env, name: str, expr: Any) -> bool:
+        """
+        Chemin rapide pour `s = s + x` quand s est une chaîne : on ajoute x
+        à un StringBuilder implicite au lieu de recopier toute la chaîne.
+        Retourne False si le motif ne s'applique pas (évaluation normale).
+        """
+        if type(expr) is not BinaryOp or expr.op != '+':
+            return False
+        left = expr.left
+        if type(left) is not Variable or left.name != name:
+            return False
+        scope = env.resolve(name)
+        if scope is None:
+            return False
+        cur = scope.bindings[name]
+        if type(cur) is str:
+            builder = StringBuilder(cur, implicit=True)
+        elif type(cur) is StringBuilder and cur.implicit:
+            builder = self.rt.writable(cur)
+        else:
+            return False
 
-        if t is Return:
-            if node.value is None:
-                raise ReturnSignal(None)
-            val = self.eval(node.value)
-            raise ReturnSignal(val)
-
-        raise RuntimeErrorMS(f"Nœud AST non géré: {t.__name__}", filename=self.rt.filename)
+        size = len(builder)
+        right = self.eval(expr.right)
+        if len(builder) != size:
+            # la partie droite a elle-même modifié s : on repart de l'ancienne valeur
+            builder = StringBuilder(str(builder)[:size], implicit=True)
+        builder.append(right)
+        env.set(name, builder)
+        return True
 
     def _truthy(self, v: Any) -> bool:
         return bool(v)
 
-    def _before_stmt(self):
-        self.rt.before_stmt(line=None, col=None)
+    def _before_stmt(self, stmt: Any):
+        self.rt.before_stmt(None, None, stmt)
@@ -0,0 +1,130 @@
+# backend/interpreter/files.py
+"""
+Fichiers pour les scripts : lecture en flux (lignes, CSV, JSON-lines) et
+écriture bufferisée, confinées à un répertoire racine.
+
+Les lecteurs sont des itérables paresseux : `for row in read_csv("x.csv")`
+lit le fichier par blocs de BUFFER_SIZE octets, un enregistrement à la
+fois, sans jamais le charger en entier ; chaque boucle le relit depuis le
+début. Le writer accumule ses lignes dans un tampon de même taille.
+
+Tout chemin est relatif à DATA_ROOT (MICROSCRIPT_DATA, ou --data-root en
+ligne de commande) et résolu liens symboliques compris : un chemin qui en
+sort est refusé. Sans racine configurée, l'accès aux fichiers est refusé.
+"""
+import csv
+import json
+import os
+from typing import Any, Iterator, Optional, TextIO
+
+BUFFER_SIZE = 1 << 16
+DATA_ROOT: Optional[str] = os.environ.get("MICROSCRIPT_DATA") or None
+
+
+def resolve(path: Any) -> str:
+    """Chemin absolu de `path` sous DATA_ROOT ; PermissionError s'il en sort."""
+    if not DATA_ROOT:
+        raise PermissionError("Accès aux fichiers désactivé (aucune racine de données)")
+    root = os.path.realpath(DATA_ROOT)
+    full = os.path.realpath(os.path.join(root, str(path)))
+    if os.path.commonpath([root, full]) != root:
+        raise PermissionError(f"Chemin hors de la racine de données : {path}")
+    return full
+
+
+class Reader:
+    """Itérable paresseux sur un fichier texte ; chaque itération le rouvre."""
+    kind = "lines"
+    newline: Optional[str] = None
+
+    def __init__(self, path: Any):
+        self.name = str(path)
+        self.path = resolve(path)
+        if not os.path.isfile(self.path):
+            raise FileNotFoundError(f"Fichier introuvable : {path}")
+
+    def __iter__(self) -> Iterator[Any]:
+        with open(self.path, encoding="utf-8", newline=self.newline, buffering=BUFFER_SIZE) as f:
+            yield from self._records(f)
+
+    def _records(self, f: TextIO) -> Iterator[Any]:
+        for line in f:
+            yield line[:-1] if line.endswith("\n") else line
+
+    def __repr__(self):
+        return f"<{self.kind} {self.name}>"
+
+
+class CsvReader(Reader):
+    """Lignes CSV : listes de chaînes, ou dicts indexés par l'en-tête."""
+    kind = "csv"
+    newline = ""  # requis par le module csv (champs multi-lignes)
+
+    def __init__(self, path: Any, header: bool = False, sep: str = ","):
+        super().__init__(path)
+        self.header = bool(header)
+        self.sep = str(sep)
+
+    def _records(self, f: TextIO) -> Iterator[Any]:
+        rows = csv.reader(f, delimiter=self.sep)
+        if not self.header:
+            yield from rows
+            return
+        keys = next(rows, None)
+        for row in rows:
+            yield dict(zip(keys, row))
+
+
+class JsonLinesReader(Reader):
+    """Une valeur JSON par ligne ; les lignes vides sont ignorées."""
+    kind = "jsonl"
+
+    def _records(self, f: TextIO) -> Iterator[Any]:
+        loads = json.loads
+        for n, line in enumerate(f, 1):
+            if line.isspace():
+                continue
+            try:
+                yield loads(line)
+            except ValueError as ex:
+                raise ValueError(f"JSON invalide ({self.name}, ligne {n}) : {ex}") from None
+
+
+class Writer:
+    """Écriture de résultats, bufferisée ; close() (ou la fin du processus) vide le tampon."""
+
+    def __init__(self, path: Any, append: bool = False):
+        self.name = str(path)
+        self._f: Optional[TextIO] = open(
+            resolve(path), "a" if append else "w", encoding="utf-8", newline="", buffering=BUFFER_SIZE
+        )
+        self._csv: Any = None
+
+    def _file(self) -> TextIO:
+        if self._f is None:
+            raise ValueError(f"Writer fermé : {self.name}")
+        return self._f
+
+    def line(self, text: Any) -> None:
+        f = self._file()
+        f.write(str(text))
+        f.write("\n")
+
+    def row(self, values: Any) -> None:
+        if self._csv is None:
+            self._csv = csv.writer(self._file(), lineterminator="\n")
+        self._file()
+        self._csv.writerow(values)
+
+    def json(self, value: Any) -> None:
+        f = self._file()
+        f.write(json.dumps(value, ensure_ascii=False, default=str))
+        f.write("\n")
+
+    def close(self) -> None:
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+    def __repr__(self):
+        return f"<writer {self.name}{'' if self._f is not None else ' (fermé)'}>"
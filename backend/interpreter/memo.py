@@ -0,0 +1,198 @@
+# backend/interpreter/memo.py
+
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from backend.ast_nodes import (
+    Assign, PrintStmt, IfStmt, WhileStmt, ForStmt, FunctionDef, FunctionCall,
+    Return, BinaryOp, Index, Array, Dict as DictNode, Variable, ListComp, DictComp
+)
+from backend.interpreter.stdlib import IMPURE_BUILTINS
+
+_MISS = object()
+
+
+class MemoFunction:
+    """Fonction utilisateur enveloppée par `memo(f)` : ses résultats sont mis en cache."""
+    def __init__(self, fn: Any):
+        self.fn = fn
+        self.name = fn.name
+        self.params = fn.params
+
+    def __call__(self, *args):
+        return self.fn.evaluator.call(self, list(args))
+
+    def __repr__(self):
+        return f"<Memo {self.name}({', '.join(self.params)})>"
+
+
+def memo_key(fn: Any, args: List[Any]) -> Tuple[Any, ...]:
+    """
+    Clé de cache d'un appel : chaque argument est accompagné de son type,
+    `1`, `1.0` et `true` (égaux pour Python) donnent trois entrées distinctes.
+    """
+    return (fn,) + tuple((type(a), a) for a in args)
+
+
+class MemoCache:
+    """
+    Cache LRU borné, partagé par toutes les fonctions mémoïsées d'un Runtime.
+    Les clés sont (fonction, arguments) ; un appel avec des arguments non
+    hachables (listes, dicts) contourne simplement le cache.
+    """
+    def __init__(self, limit: int = 4096):
+        self.limit = int(limit)
+        self._entries: "OrderedDict[Tuple[Any, Tuple[Any, ...]], Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Any, default: Any = _MISS) -> Any:
+        entries = self._entries
+        value = entries.get(key, _MISS)
+        if value is _MISS:
+            self.misses += 1
+            return default
+        entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Any, value: Any) -> None:
+        entries = self._entries
+        entries[key] = value
+        entries.move_to_end(key)
+        while len(entries) > self.limit:
+            entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    # --- builtins liés au runtime ---
+    def wrap(self, fn: Any, strict: bool = True) -> MemoFunction:
+        """Builtin `memo(f, strict=true)` : refuse les fonctions impures si strict."""
+        if isinstance(fn, MemoFunction):
+            return fn
+        if not hasattr(fn, "body"):
+            raise TypeError("memo attend une fonction utilisateur")
+        if strict:
+            culprit = impurity(fn)
+            if culprit is not None:
+                raise ValueError(f"memo: {fn.name} n'est pas pure ({culprit})")
+        return MemoFunction(fn)
+
+    def stats(self) -> Dict[str, Any]:
+        """Builtin `memo_stats()`."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total) if total else 0.0,
+            "size": len(self._entries),
+            "limit": self.limit,
+            "evictions": self.evictions,
+        }
+
+
+def impurity(fn: Any, _seen: Optional[Set[int]] = None) -> Optional[str]:
+    """
+    Analyse statique conservatrice du corps d'une fonction utilisateur.
+    Retourne la raison de l'impureté, ou None si la fonction semble pure :
+    pas de print, pas de builtin à effet (IMPURE_BUILTINS), pas d'écriture
+    dans une portée englobante ni dans un index, et des appels uniquement
+    vers des fonctions elles-mêmes pures.
+    """
+    seen = _seen if _seen is not None else set()
+    if id(fn) in seen:
+        return None
+    seen.add(id(fn))
+    local: Set[str] = set(fn.params)
+
+    def visit_expr(e: Any) -> Optional[str]:
+        t = type(e)
+        if t is BinaryOp:
+            return visit_expr(e.left) or visit_expr(e.right)
+        if t is Index:
+            return visit_expr(e.target) or visit_expr(e.index)
+        if t is Array:
+            return visit_all(e.elements, visit_expr)
+        if t is DictNode:
+            for k, v in e.pairs:
+                r = visit_expr(k) or visit_expr(v)
+                if r:
+                    return r
+            return None
+        if t is ListComp or t is DictComp:
+            r = visit_expr(e.iterable)
+            if r:
+                return r
+            # la variable n'existe que le temps de la compréhension
+            fresh = e.var_name not in local
+            local.add(e.var_name)
+            try:
+                parts = [e.expr] if t is ListComp else [e.key, e.value]
+                if e.condition is not None:
+                    parts.append(e.condition)
+                return visit_all(parts, visit_expr)
+            finally:
+                if fresh:
+                    local.discard(e.var_name)
+        if t is FunctionCall:
+            r = visit_all(e.args, visit_expr)
+            if r:
+                return r
+            if e.name in local:
+                return f"appel indirect {e.name}"
+            if e.name in IMPURE_BUILTINS:
+                return f"appelle {e.name}"
+            target = fn.closure_env.resolve(e.name)
+            if target is None:
+                return f"appelle {e.name} (inconnue)"
+            callee = target.bindings[e.name]
+            if isinstance(callee, MemoFunction):
+                callee = callee.fn
+            if hasattr(callee, "body"):
+                return impurity(callee, seen)
+            return None
+        return None
+
+    def write(name: str) -> Optional[str]:
+        if name not in local and fn.closure_env.resolve(name) is not None:
+            return f"modifie {name}"
+        local.add(name)
+        return None
+
+    def visit_stmt(s: Any) -> Optional[str]:
+        t = type(s)
+        if t is PrintStmt:
+            return "appelle print"
+        if t is Assign:
+            r = visit_expr(s.value)
+            if r:
+                return r
+            if isinstance(s.target, Variable):
+                return write(s.target.name)
+            return "affectation indexée"
+        if t is Return:
+            return visit_expr(s.value) if s.value is not None else None
+        if t is IfStmt:
+            r = visit_expr(s.condition) or visit_all(s.body, visit_stmt)
+            for c, b in s.elifs:
+                r = r or visit_expr(c) or visit_all(b, visit_stmt)
+            return r or visit_all(s.orelse, visit_stmt)
+        if t is WhileStmt:
+            return visit_expr(s.condition) or visit_all(s.body, visit_stmt)
+        if t is ForStmt:
+            return visit_expr(s.iterable) or write(s.var_name) or visit_all(s.body, visit_stmt)
+        if t is FunctionDef:
+            return "définit une fonction"
+        return visit_expr(s)
+
+    def visit_all(nodes: List[Any], visit) -> Optional[str]:
+        for n in nodes:
+            r = visit(n)
+            if r:
+                return r
+        return None
+
+    return visit_all(fn.body, visit_stmt)
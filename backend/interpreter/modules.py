@@ -0,0 +1,154 @@
+# backend/interpreter/modules.py
+"""
+Modules MicroScript : `import nom` charge nom.ms depuis SEARCH_PATH.
+
+Un module est lexé, parsé, optimisé et exécuté une seule fois par processus,
+puis mis en cache par chemin et date de modification (un fichier modifié est
+rechargé au prochain import). Ses définitions de tête forment un espace de
+noms partagé : un programme qui l'importe ne les recopie pas dans son
+global. La couche d'imports de son runtime (ModuleBindings, en lecture
+seule) se réfère aux valeurs du module et n'instancie qu'au premier accès
+les fonctions, rattachées à l'évaluateur du programme, et les conteneurs,
+copiés pour qu'aucun programme ne modifie le module des autres.
+
+Les noms importés sont visibles de tout le programme et masquent les
+builtins ; un module ne voit que ses propres définitions et ses propres
+imports. Ce qu'un module affiche à son chargement n'apparaît qu'une fois.
+"""
+import copy
+import os
+import threading
+from typing import Any, Dict, List
+
+from backend.lexer import lexer
+from backend.parser import Parser
+from backend.optimiser import optimise
+from backend.ast_nodes import ImportStmt, walk
+from backend.errors import format_error
+from backend.interpreter.runtime import Env, Runtime, BUILTINS_ENV, ModuleBindings, RuntimeErrorMS
+from backend.interpreter.evaluator import Evaluator, UserFunction
+from backend.interpreter.memo import MemoFunction
+from backend.interpreter.values import StringBuilder, MUTABLE_TYPES, cow_copy
+
+# répertoires où chercher nom.ms, dans l'ordre (MICROSCRIPT_PATH, séparé par os.pathsep)
+SEARCH_PATH: List[str] = [p for p in os.environ.get("MICROSCRIPT_PATH", ".").split(os.pathsep) if p]
+
+_CACHE: Dict[str, "Module"] = {}  # chemin -> dernier module chargé
+_LOCK = threading.RLock()
+_LOADING: List[str] = []  # chemins en cours de chargement (imports circulaires)
+
+
+class Module:
+    """Module chargé : définitions de tête (partagées, jamais modifiées) et modules qu'il importe."""
+    __slots__ = ("name", "path", "mtime", "values", "lazy", "imports", "_root")
+
+    def __init__(self, name: str, path: str, mtime: int, runtime: Runtime, imports: List["Module"]):
+        self.name = name
+        self.path = path
+        self.mtime = mtime
+        self.imports = imports
+        self._root = runtime.global_env
+        self.values: Dict[str, Any] = {}
+        for k, v in self._root.bindings.items():
+            if getattr(v, "__self__", None) is runtime.memo:
+                continue  # memo/memo_stats du runtime de chargement
+            if type(v) is StringBuilder and v.implicit:
+                v = str(v)
+            self.values[k] = v
+        # valeurs à instancier dans chaque runtime importateur
+        self.lazy = frozenset(
+            k for k, v in self.values.items()
+            if type(v) in MUTABLE_TYPES or isinstance(v, (UserFunction, MemoFunction))
+        )
+
+    def bind(self, value: Any, env: Env, evaluator: Any) -> Any:
+        """Valeur du module pour un runtime : fonction rattachée à `env` et `evaluator`, ou conteneur copié."""
+        if isinstance(value, MemoFunction):
+            inner = self.bind(value.fn, env, evaluator)
+            return value if inner is value.fn else MemoFunction(inner)
+        if isinstance(value, UserFunction):
+            if value.closure_env is not self._root:
+                return value  # closure créée par un appel au chargement
+            clone = copy.copy(value)
+            clone.closure_env = env
+            clone.evaluator = evaluator
+            return clone
+        return cow_copy(value)
+
+    def __repr__(self):
+        return f"<Module {self.name} {self.path}>"
+
+
+def find(name: str) -> str:
+    for directory in SEARCH_PATH:
+        path = os.path.abspath(os.path.join(directory, name + ".ms"))
+        if os.path.isfile(path):
+            return path
+    raise RuntimeErrorMS(f"Module introuvable : {name}")
+
+
+def load(name: str) -> Module:
+    """Module `name`, depuis le cache si le fichier n'a pas changé."""
+    path = find(name)
+    mtime = os.stat(path).st_mtime_ns
+    module = _CACHE.get(path)
+    if module is not None and module.mtime == mtime:
+        return module
+    with _LOCK:
+        module = _CACHE.get(path)
+        if module is not None and module.mtime == mtime:
+            return module
+        if path in _LOADING:
+            raise RuntimeErrorMS(f"Import circulaire : {name}", filename=path)
+        _LOADING.append(path)
+        try:
+            module = _compile(name, path, mtime)
+        finally:
+            _LOADING.remove(path)
+        _CACHE[path] = module
+        return module
+
+
+def _compile(name: str, path: str, mtime: int) -> Module:
+    with open(path, encoding="utf-8") as f:
+        source = f.read()
+    rt = Runtime(filename=path)
+    try:
+        program = Parser(lexer(source)).parse()
+        optimise(program, module=True)
+        Evaluator(rt).eval(program)
+    except Exception as ex:
+        raise RuntimeErrorMS(f"Erreur dans le module {name} : {format_error(ex)}", filename=path) from ex
+    names = {n.name for n in walk(program) if type(n) is ImportStmt}
+    return Module(name, path, mtime, rt, [m for m in rt.modules if m.name in names])
+
+
+def instantiate(rt: Runtime, module: Module, evaluator: Any) -> Env:
+    """Env du module dans le runtime `rt` (créé au premier import, réutilisé ensuite)."""
+    env = rt.modules.get(module)
+    if env is not None:
+        return env
+    parent = BUILTINS_ENV
+    if module.imports:
+        parent = Env(parent=BUILTINS_ENV, sites=rt.sites)
+        parent.bindings = ModuleBindings()
+        parent.escaped = True
+        for dep in module.imports:
+            dep_env = instantiate(rt, dep, evaluator)
+            parent.bindings.expose(dep.values, dep.lazy, dep_env.bindings.__getitem__)
+    env = Env(parent=parent, sites=rt.sites)
+    env.bindings = ModuleBindings()
+    env.escaped = True
+    rt.modules[module] = env
+    env.bindings.expose(module.values, module.lazy, lambda name: module.bind(module.values[name], env, evaluator))
+    return env
+
+
+def import_module(evaluator: Any, name: str) -> Module:
+    """`import name` exécuté par `evaluator` : expose le module dans la couche d'imports de son runtime."""
+    module = load(name)
+    rt = evaluator.rt
+    env = instantiate(rt, module, evaluator)
+    rt.imports_env().bindings.expose(module.values, module.lazy, env.bindings.__getitem__)
+    rt.sites.bind(module.values)  # les noms importés masquent les builtins
+    return module
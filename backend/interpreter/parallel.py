@@ -0,0 +1,217 @@
+# backend/interpreter/parallel.py
+"""
+Exécution parallèle des builtins pmap / preduce.
+
+La fonction utilisateur est expédiée aux workers sous forme d'AST (avec les
+fonctions qu'elle appelle), accompagnée des données qu'elle capture. Chaque
+worker garde le code reçu en cache par empreinte : il n'est sérialisé
+qu'une fois par fonction, seules les données capturées sont renvoyées à
+chaque appel.
+
+Chaque lot est évalué dans un Runtime neuf (portée globale, cache memo) :
+rien ne survit d'un appel à l'autre. Une fonction impure (print, écriture
+d'une globale, ...) reste évaluée en série dans le script appelant, sans
+quoi ses effets seraient perdus dans les workers ; preduce suppose en plus
+fn associative.
+"""
+import hashlib
+import math
+import os
+import pickle
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import reduce
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.ast_nodes import Variable, FunctionCall, walk
+from backend.interpreter.runtime import make_runtime, BUILTINS_ENV
+from backend.interpreter.evaluator import Evaluator, UserFunction
+from backend.interpreter.memo import MemoFunction, impurity
+from backend.interpreter.values import flatten
+
+SAMPLE = 8              # éléments évalués en série pour estimer le coût unitaire
+SERIAL_BUDGET = 0.05    # en dessous (secondes estimées), on reste en série
+CHUNK_TARGET = 0.02     # durée visée par lot envoyé à un worker
+
+_IN_WORKER = False
+_POOL: Optional[ProcessPoolExecutor] = None
+_CODE_CACHE: Dict[Tuple[int, ...], Tuple[str, bytes, List[Any]]] = {}
+_CODE_CACHE_MAX = 64
+_WORKER_CODE: "OrderedDict[str, Tuple[Any, ...]]" = OrderedDict()
+_WORKER_CODE_MAX = 32
+
+
+def mark_worker() -> None:
+    """Initialiseur des processus workers : pas de pool imbriqué."""
+    global _IN_WORKER
+    _IN_WORKER = True
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _POOL
+    if _POOL is None:
+        _POOL = ProcessPoolExecutor(max_workers=os.cpu_count() or 1, initializer=mark_worker)
+    return _POOL
+
+
+# --- expédition -----------------------------------------------------------
+
+def _free_names(fn: UserFunction) -> List[str]:
+    params = set(fn.params)
+    names = {n.name for n in walk(fn.body) if type(n) in (Variable, FunctionCall)}
+    return sorted(names - params)
+
+
+def _capture(fn: UserFunction) -> Tuple[Dict[str, Tuple[UserFunction, bool]], Dict[str, Any]]:
+    """Fonctions utilisateur (nom -> (fn, mémoïsée)) et données capturées par fn."""
+    funcs: Dict[str, Tuple[UserFunction, bool]] = {}
+    data: Dict[str, Any] = {}
+    todo, seen = [fn], set()
+    while todo:
+        f = todo.pop()
+        if id(f) in seen:
+            continue
+        seen.add(id(f))
+        for name in _free_names(f):
+            scope = f.closure_env.resolve(name)
+            if scope is None:
+                continue
+            value = scope.bindings[name]
+            if isinstance(value, MemoFunction):
+                funcs[name] = (value.fn, True)
+                todo.append(value.fn)
+            elif isinstance(value, UserFunction):
+                funcs[name] = (value, False)
+                todo.append(value)
+            elif scope is BUILTINS_ENV or callable(value):
+                continue  # builtins : déjà présents côté worker
+            else:
+                data[name] = flatten(value)
+    return funcs, data
+
+
+def _ship(fn: UserFunction) -> Tuple[str, bytes, bytes]:
+    """(empreinte, code sérialisé, données sérialisées) ; le code est mis en cache."""
+    funcs, data = _capture(fn)
+    ident = (id(fn.body),) + tuple(id(f.body) for _, (f, _m) in sorted(funcs.items()))
+    cached = _CODE_CACHE.get(ident)
+    if cached is None:
+        code = pickle.dumps((
+            fn.name, fn.params, fn.body,
+            [(name, f.params, f.body, memo) for name, (f, memo) in sorted(funcs.items())],
+        ))
+        key = hashlib.sha1(code).hexdigest()
+        if len(_CODE_CACHE) >= _CODE_CACHE_MAX:
+            _CODE_CACHE.clear()
+        # on garde les corps vivants pour que leurs id() restent valides
+        cached = (key, code, [fn.body] + [f.body for f, _m in funcs.values()])
+        _CODE_CACHE[ident] = cached
+    try:
+        payload = pickle.dumps(data)
+    except Exception as ex:
+        raise TypeError(f"pmap: données capturées non sérialisables ({ex})")
+    return cached[0], cached[1], payload
+
+
+# --- côté worker ----------------------------------------------------------
+
+def _worker_fn(key: str, code: bytes, data: bytes) -> Tuple[Evaluator, UserFunction]:
+    """Runtime neuf pour ce lot ; seul le code désérialisé est gardé en cache."""
+    entry = _WORKER_CODE.get(key)
+    if entry is None:
+        entry = pickle.loads(code)
+        _WORKER_CODE[key] = entry
+        while len(_WORKER_CODE) > _WORKER_CODE_MAX:
+            _WORKER_CODE.popitem(last=False)
+    else:
+        _WORKER_CODE.move_to_end(key)
+    name, params, body, helpers = entry
+    rt = make_runtime()
+    ev = Evaluator(rt)
+    glb = rt.global_env
+    for hname, hparams, hbody, memo in helpers:
+        helper = UserFunction(hname, hparams, hbody, glb, ev)
+        glb.define(hname, rt.memo.wrap(helper, strict=False) if memo else helper)
+    for dname, value in pickle.loads(data).items():
+        glb.define(dname, value)
+    return ev, UserFunction(name, params, body, glb, ev)
+
+
+def _worker_map(key: str, code: bytes, data: bytes, chunk: List[Any]) -> List[Any]:
+    ev, fn = _worker_fn(key, code, data)
+    return [ev.call(fn, [x]) for x in chunk]
+
+
+def _worker_reduce(key: str, code: bytes, data: bytes, chunk: List[Any]) -> Any:
+    ev, fn = _worker_fn(key, code, data)
+    acc = chunk[0]
+    for x in chunk[1:]:
+        acc = ev.call(fn, [acc, x])
+    return acc
+
+
+# --- côté appelant --------------------------------------------------------
+
+def _plan(fn: Any, xs: List[Any], run_sample) -> Tuple[bool, Any, int]:
+    """
+    Évalue un échantillon en série et choisit la taille des lots.
+    Retourne (échantillonné, résultat de l'échantillon, taille de lot) ;
+    une taille 0 signifie qu'on reste en série.
+    """
+    if _IN_WORKER or not isinstance(fn, (UserFunction, MemoFunction)):
+        return False, None, 0
+    if impurity(fn.fn if isinstance(fn, MemoFunction) else fn) is not None:
+        return False, None, 0
+    n = min(SAMPLE, len(xs))
+    t0 = time.perf_counter()
+    head = run_sample(xs[:n])
+    per_item = max((time.perf_counter() - t0) / n, 1e-7)
+    rest = len(xs) - n
+    if rest <= 1 or per_item * rest < SERIAL_BUDGET:
+        return True, head, 0
+    workers = os.cpu_count() or 1
+    size = max(1, int(CHUNK_TARGET / per_item))
+    size = min(size, math.ceil(rest / workers))
+    return True, head, size
+
+
+def _submit(fn: Any, worker, xs: List[Any], start: int, size: int) -> List[Any]:
+    target = fn.fn if isinstance(fn, MemoFunction) else fn
+    key, code, data = _ship(target)
+    pool = _get_pool()
+    futures = [pool.submit(worker, key, code, data, xs[i:i + size]) for i in range(start, len(xs), size)]
+    return [fut.result() for fut in futures]
+
+
+def pmap(fn: Any, xs: Any) -> List[Any]:
+    xs = list(xs)
+    if not xs:
+        return []
+    sampled, head, size = _plan(fn, xs, lambda sample: [fn(x) for x in sample])
+    if not sampled:
+        return [fn(x) for x in xs]
+    done = len(head)
+    if size == 0:
+        return head + [fn(x) for x in xs[done:]]
+    for part in _submit(fn, _worker_map, xs, done, size):
+        head.extend(part)
+    return head
+
+
+def preduce(fn: Any, xs: Any, initial: Any = None) -> Any:
+    xs = list(xs)
+    if not xs:
+        return initial
+
+    def fold(items, start=None):
+        return reduce(fn, items) if start is None else reduce(fn, items, start)
+
+    sampled, head, size = _plan(fn, xs, lambda sample: fold(sample, initial))
+    if not sampled:
+        return fold(xs, initial)
+    done = min(SAMPLE, len(xs))
+    if size == 0:
+        return fold(xs[done:], head)
+    # fn associative : les lots sont réduits côté workers puis combinés ici
+    return fold(_submit(fn, _worker_reduce, xs, done, size), head)
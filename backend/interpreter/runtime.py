@@ -1,12 +1,15 @@
 # backend/interpreter/runtime.py
 
-from typing import Any, Dict, Optional, List, Tuple
+import copy
+import re
+import time
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, Optional, List, Set, Tuple
 
-try:
-    # Chargement facultatif de la stdlib pour préremplir le global
-    from backend.stdlib import BUILTINS as _BUILTINS  # type: ignore
-except Exception:
-    _BUILTINS = {}  # fallback si stdlib pas encore créée
+from backend.interpreter.values import flatten, cow_copy, MUTABLE_TYPES
+from backend.interpreter.memo import MemoCache, MemoFunction
+from backend.interpreter.coverage import Coverage, number_statements
+from backend.interpreter.stdlib import BUILTINS as _STDLIB
 
 
 class RuntimeErrorMS(Exception):
@@ -31,15 +34,66 @@ class ReturnSignal(Exception):
         self.value = value
 
 
+class TailCallSignal(Exception):
+    """Signal interne pour `return f(...)` où f est la fonction en cours."""
+    def __init__(self, args: List[Any]):
+        self.args_values = args
+
+
+class CallSites:
+    """
+    État des caches en ligne des sites d'appel d'un runtime : `watched` liste
+    les noms appelés par ses programmes, `version` change dès qu'un de ces
+    noms est lié, masqué ou re-lié dans un de ses envs. Les autres écritures
+    (compteurs de boucle...) ne coûtent qu'un test d'appartenance.
+    """
+    __slots__ = ("version", "watched")
+
+    def __init__(self):
+        self.version = 0
+        self.watched: Set[str] = set()
+
+    def watch(self, names: Iterable[str]) -> None:
+        self.watched.update(names)
+
+    def bind(self, names: Iterable[str]) -> None:
+        """Signale la liaison de plusieurs noms d'un coup."""
+        if self.watched and not self.watched.isdisjoint(names):
+            self.version += 1
+
+
+# sites des envs hors runtime (builtins, états figés) : jamais surveillés
+_UNWATCHED = CallSites()
+
+
 class Env:
     """Environnement chaîné (scope)."""
-    def __init__(self, bindings: Optional[Dict[str, Any]] = None, parent: Optional["Env"] = None):
+    __slots__ = ("bindings", "parent", "escaped", "sites")
+
+    def __init__(
+        self,
+        bindings: Optional[Dict[str, Any]] = None,
+        parent: Optional["Env"] = None,
+        sites: Optional[CallSites] = None,
+    ):
         self.bindings: Dict[str, Any] = dict(bindings or {})
         self.parent: Optional["Env"] = parent
+        self.escaped = False  # capturé par une closure : jamais recyclé
+        # caches en ligne à invalider : ceux du runtime de l'env (hérités du parent par défaut)
+        self.sites: CallSites = sites or (parent.sites if parent is not None else _UNWATCHED)
 
     def define(self, name: str, value: Any) -> None:
+        sites = self.sites
+        if name in sites.watched:
+            sites.version += 1
         self.bindings[name] = value
 
+    def undefine(self, name: str) -> None:
+        sites = self.sites
+        if name in sites.watched:
+            sites.version += 1
+        del self.bindings[name]
+
     def resolve(self, name: str) -> Optional["Env"]:
         cur: Optional["Env"] = self
         while cur is not None:
@@ -49,10 +103,21 @@ class Env:
         return None
 
     def set(self, name: str, value: Any) -> None:
+        sites = self.sites
+        if name in sites.watched:
+            sites.version += 1
         found = self.resolve(name)
         if found is None:
             # par défaut, affectation crée dans l'env courant si non trouvé
             self.bindings[name] = value
+        elif found is BUILTINS_ENV or type(found.bindings) is ModuleBindings:
+            # builtins et modules partagés en lecture seule : on les masque
+            # dans l'env modifiable le plus éloigné (le global, ou le local
+            # d'une fonction de module)
+            cur = self
+            while cur.parent is not BUILTINS_ENV and type(cur.parent.bindings) is not ModuleBindings:
+                cur = cur.parent
+            cur.bindings[name] = value
         else:
             found.bindings[name] = value
 
@@ -63,6 +128,8 @@ class Env:
         return found.bindings[name]
 
     def new_child(self, initial: Optional[Dict[str, Any]] = None) -> "Env":
+        if initial:
+            self.sites.bind(initial)
         return Env(bindings=initial, parent=self)
 
     def to_dict_flat(self) -> Dict[str, Any]:
@@ -75,11 +142,130 @@ class Env:
             cur = cur.parent
         for env in reversed(chain):
             out.update(env.bindings)
-        return out
+        return {k: flatten(v) for k, v in out.items()}
+
+
+# Couche des builtins, partagée par tous les runtimes et en lecture seule :
+# le global de chaque session s'y chaîne au lieu d'en recevoir une copie.
+BUILTINS_ENV = Env()
+BUILTINS_ENV.bindings = MappingProxyType(dict(_STDLIB))  # type: ignore[assignment]
+BUILTINS_ENV.escaped = True
+
+
+class CowBindings(dict):
+    """
+    Bindings globaux en copie-sur-écriture, issus d'un snapshot : les valeurs
+    sont partagées avec `base`, l'état figé, qui n'est jamais modifié. Lire
+    ne copie rien ; une ré-affectation rompt le partage sans copie.
+
+    Avant de modifier un conteneur en place (affectation indexée, builtin qui
+    mute son premier argument, `s = s + x` sur un builder), l'évaluateur
+    passe par Runtime.writable(). La première modification d'un conteneur
+    atteignable depuis `base` rend tout l'état figé privé d'un coup : les
+    valeurs de `base` sont copiées avec une même table (`copies`), puis
+    chaque référence vivante à un objet figé (global, frames, closures,
+    conteneurs créés depuis le fork) est redirigée vers sa copie. Les alias
+    restent ceux d'une session non dupliquée ; ensuite plus rien n'est
+    partagé.
+    """
+    __slots__ = ("base", "copies", "_frozen")
+
+    def __init__(self, base: Dict[str, Any]):
+        super().__init__(base)
+        self.base = base
+        self.copies: Dict[int, Any] = {}  # id d'un conteneur figé -> sa copie
+        self._frozen: Optional[Set[int]] = None
+
+    def frozen(self) -> Set[int]:
+        """id des conteneurs atteignables depuis `base` (calculé à la première écriture)."""
+        if self._frozen is None:
+            ids: Set[int] = set()
+            stack = list(self.base.values())
+            while stack:
+                v = stack.pop()
+                t = type(v)
+                if t not in MUTABLE_TYPES or id(v) in ids:
+                    continue
+                ids.add(id(v))
+                if t is list:
+                    stack.extend(v)
+                elif t is dict:
+                    stack.extend(v.values())
+            self._frozen = ids
+        return self._frozen
+
+    def privatize(self, roots: Iterable[Any]) -> None:
+        """Copie tout l'état figé et redirige les références atteignables depuis `roots`."""
+        copies = self.copies
+        for value in self.base.values():
+            cow_copy(value, copies)
+        # les copies ne désignent que des copies : inutile de les parcourir
+        seen = {id(c) for c in copies.values()}
+        stack = list(roots)
+        while stack:
+            v = stack.pop()
+            if id(v) in seen:
+                continue
+            seen.add(id(v))
+            t = type(v)
+            if isinstance(v, Env):
+                if type(v.bindings) is not MappingProxyType:
+                    stack.append(v.bindings)
+                if v.parent is not None:
+                    stack.append(v.parent)
+            elif t is list:
+                for i, x in enumerate(v):
+                    if id(x) in copies:
+                        v[i] = copies[id(x)]
+                    else:
+                        stack.append(x)
+            elif isinstance(v, dict):
+                stale = [(k, copies[id(x)]) for k, x in v.items() if id(x) in copies]
+                for k, x in stale:
+                    dict.__setitem__(v, k, x)
+                stack.extend(v.values())
+            elif isinstance(v, MemoFunction):
+                stack.append(v.fn)
+            elif isinstance(getattr(v, "closure_env", None), Env):
+                stack.append(v.closure_env)
+
+
+class ModuleBindings(dict):
+    """
+    Noms de modules importés, vus depuis un runtime (cf. modules.py). La
+    couche est en lecture seule : Env.set masque ses noms comme ceux des
+    builtins. Les valeurs d'un module sont partagées par tout le processus ;
+    celles qui doivent être propres au runtime (fonctions à rattacher à son
+    évaluateur, conteneurs modifiables) sont instanciées au premier accès.
+    """
+    __slots__ = ("_pending",)
+
+    def __init__(self):
+        super().__init__()
+        self._pending: Dict[str, Callable[[str], Any]] = {}  # nom -> instanciateur
+
+    def expose(self, values: Dict[str, Any], lazy: Iterable[str], make: Callable[[str], Any]) -> None:
+        """Ajoute les noms de `values` (masquant les précédents) ; ceux de `lazy` seront produits par make(nom)."""
+        self.update(values)
+        for name in values:
+            self._pending.pop(name, None)
+        for name in lazy:
+            self._pending[name] = make
+
+    def __getitem__(self, name: str) -> Any:
+        if self._pending:
+            make = self._pending.pop(name, None)
+            if make is not None:
+                value = make(name)
+                dict.__setitem__(self, name, value)
+                return value
+        return dict.__getitem__(self, name)
 
 
 class Frame:
     """Frame d'appel."""
+    __slots__ = ("func_name", "env", "filename", "call_line", "call_col", "elided", "invariants")
+
     def __init__(
         self,
         func_name: str,
@@ -93,6 +279,8 @@ class Frame:
         self.filename = filename
         self.call_line = call_line
         self.call_col = call_col
+        self.elided = 0  # appels terminaux repliés dans cette frame
+        self.invariants: Optional[Dict[str, Any]] = None  # invariants de boucle en cache (optimiseur)
 
     def info(self) -> Dict[str, Any]:
         return {
@@ -100,7 +288,8 @@ class Frame:
             "filename": self.filename,
             "line": self.call_line,
             "col": self.call_col,
-            "locals": self.env.bindings.copy(),
+            "elided": self.elided,
+            "locals": {k: flatten(v) for k, v in self.env.bindings.items()},
         }
 
 
@@ -108,6 +297,13 @@ class CallStack:
     """Pile d'appels."""
     def __init__(self):
         self._frames: List[Frame] = []
+        self.elided = 0  # total des frames élidées par les appels terminaux
+
+    def elide(self) -> None:
+        top = self.top()
+        if top is not None:
+            top.elided += 1
+        self.elided += 1
 
     def push(self, frame: Frame) -> None:
         self._frames.append(frame)
@@ -120,51 +316,245 @@ class CallStack:
     def top(self) -> Optional[Frame]:
         return self._frames[-1] if self._frames else None
 
+    def __len__(self) -> int:
+        return len(self._frames)
+
     def as_list(self) -> List[Dict[str, Any]]:
         return [f.info() for f in reversed(self._frames)]
 
 
+def _compile_expr(source: str) -> Any:
+    """
+    Analyse une fois pour toutes une expression MicroScript (condition,
+    morceau de message). Son évaluation ne doit rien modifier du programme
+    débogué : parmi les builtins, seuls les purs y sont appelables ; les
+    autres appels (fonctions du programme ou importées) sont vérifiés à
+    l'évaluation (cf. Debugger._guard).
+    """
+    from backend.lexer import lexer
+    from backend.parser import Parser
+    from backend.ast_nodes import FunctionCall, walk
+    from backend.interpreter.stdlib import EFFECTS
+
+    parser = Parser(lexer(str(source)))
+    expr = parser.parse_expression()
+    if parser.current()[0] not in ('EOF', 'NEWLINE'):
+        raise SyntaxError(f"Expression invalide : {source}")
+    for node in walk(expr):
+        if type(node) is FunctionCall and EFFECTS.get(node.name, "pure") != "pure":
+            raise ValueError(f"Appel non autorisé dans un breakpoint : {node.name}")
+    return expr
+
+
+def _program_calls(exprs: List[Any]) -> Tuple[str, ...]:
+    """Noms appelés par ces expressions qui ne sont pas des builtins."""
+    from backend.ast_nodes import FunctionCall, walk
+    from backend.interpreter.stdlib import EFFECTS
+
+    names = {
+        node.name for e in exprs if e is not None
+        for node in walk(e) if type(node) is FunctionCall and node.name not in EFFECTS
+    }
+    return tuple(sorted(names))
+
+
+def _hit_test(spec: Any):
+    """Condition sur le nombre de passages : "N" ou "==N", ">=N", "%N"."""
+    text = str(spec).replace(" ", "")
+    for prefix, test in ((">=", lambda n, k: n >= k), ("==", lambda n, k: n == k), ("%", lambda n, k: n % k == 0)):
+        if text.startswith(prefix):
+            text = text[len(prefix):]
+            break
+    else:
+        test = lambda n, k: n == k
+    if not text.isdigit() or int(text) <= 0:
+        raise ValueError(f"Nombre de passages invalide : {spec}")
+    k = int(text)
+    return lambda n: test(n, k)
+
+
+class Breakpoint:
+    """
+    Breakpoint de ligne, éventuellement conditionnel. La condition, la
+    condition de passages et les morceaux `{expr}` d'un log point sont
+    compilés à la création ; un log point écrit son message sans s'arrêter.
+    """
+    __slots__ = (
+        "line", "condition", "hit_condition", "log_message", "cond", "hit_ok", "log_parts", "calls", "hits"
+    )
+
+    def __init__(
+        self,
+        line: int,
+        condition: Optional[str] = None,
+        hit_condition: Optional[Any] = None,
+        log_message: Optional[str] = None,
+    ):
+        self.line = int(line)
+        self.condition = condition or None
+        self.hit_condition = hit_condition or None
+        self.log_message = log_message
+        self.cond = _compile_expr(condition) if self.condition else None
+        self.hit_ok = _hit_test(hit_condition) if self.hit_condition else None
+        self.log_parts: Optional[List[Any]] = None
+        if log_message is not None:
+            parts = re.split(r"\{([^{}]*)\}", str(log_message))
+            # indices pairs : texte littéral, impairs : expressions
+            self.log_parts = [p if i % 2 == 0 else _compile_expr(p) for i, p in enumerate(parts)]
+        self.calls = _program_calls([self.cond] + (self.log_parts or [])[1::2])
+        self.hits = 0
+
+    @property
+    def plain(self) -> bool:
+        return self.cond is None and self.hit_ok is None and self.log_parts is None
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "line": self.line,
+            "condition": self.condition,
+            "hit_condition": self.hit_condition,
+            "log_message": self.log_message,
+            "hits": self.hits,
+        }
+
+
 class BreakpointManager:
-    """Gestion simple des breakpoints par fichier/ligne."""
+    """Gestion des breakpoints par fichier/ligne (un Breakpoint par ligne)."""
     def __init__(self):
-        self._bp: Dict[str, set] = {}
+        self._bp: Dict[str, Dict[int, Breakpoint]] = {}
 
     def clear(self) -> None:
         self._bp.clear()
 
-    def add(self, filename: str, line: int) -> None:
-        self._bp.setdefault(filename, set()).add(int(line))
+    def add(self, filename: str, line: int, **options: Any) -> Breakpoint:
+        return self.insert(filename, Breakpoint(line, **options))
+
+    def insert(self, filename: str, bp: Breakpoint) -> Breakpoint:
+        self._bp.setdefault(filename, {})[bp.line] = bp
+        return bp
 
     def remove(self, filename: str, line: int) -> None:
         if filename in self._bp:
-            self._bp[filename].discard(int(line))
+            self._bp[filename].pop(int(line), None)
             if not self._bp[filename]:
                 del self._bp[filename]
 
-    def has(self, filename: str, line: Optional[int]) -> bool:
+    def get(self, filename: str, line: Optional[int]) -> Optional[Breakpoint]:
         if line is None:
-            return False
-        return int(line) in self._bp.get(filename, set())
+            return None
+        return self._bp.get(filename, {}).get(int(line))
+
+    def has(self, filename: str, line: Optional[int]) -> bool:
+        return self.get(filename, line) is not None
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self._bp.values())
+
+    def reset_hits(self) -> None:
+        for bps in self._bp.values():
+            for bp in bps.values():
+                bp.hits = 0
 
     def snapshot(self) -> Dict[str, List[int]]:
         return {k: sorted(v) for k, v in self._bp.items()}
 
+    def details(self) -> Dict[str, List[Dict[str, Any]]]:
+        return {k: [v[ln].info() for ln in sorted(v)] for k, v in self._bp.items()}
+
+
+_POOL_MAX = 256  # taille max des freelists Env/Frame
+
+
+def _bind_params(bindings: Dict[str, Any], params: List[str], args: List[Any], sites: CallSites) -> None:
+    """Lie les paramètres dans un dict vide, avec chemins directs pour 0 à 3 paramètres."""
+    n = len(params)
+    if n == len(args):
+        if n == 1:
+            bindings[params[0]] = args[0]
+        elif n == 2:
+            bindings[params[0]] = args[0]
+            bindings[params[1]] = args[1]
+        elif n == 3:
+            bindings[params[0]] = args[0]
+            bindings[params[1]] = args[1]
+            bindings[params[2]] = args[2]
+        elif n:
+            bindings.update(zip(params, args))
+    else:
+        bindings.update(zip(params, args))
+    if n and sites.watched and not sites.watched.isdisjoint(params):
+        sites.version += 1
+
 
 class Runtime:
     """
     Regroupe global_env, call stack, breakpoints, et expose des hooks utiles
     pour l'interpréteur (before/after execution).
     """
-    def __init__(self, builtins: Optional[Dict[str, Any]] = None, filename: str = "<stdin>"):
-        base = dict(_BUILTINS)
+    env_class = Env  # le débogueur y substitue un Env qui journalise les écritures
+
+    def __init__(
+        self,
+        builtins: Optional[Dict[str, Any]] = None,
+        filename: str = "<stdin>",
+        memo_limit: int = 4096,
+    ):
+        self.memo = MemoCache(limit=memo_limit)
+        base = {"memo": self.memo.wrap, "memo_stats": self.memo.stats}
         if builtins:
-            base.update(builtins)
-        self.global_env = Env(bindings=base, parent=None)
+            base.update(builtins)  # builtins propres à ce runtime, masquant la stdlib
+        self.sites = CallSites()  # caches en ligne des sites d'appel de ce runtime
+        self.global_env = self.env_class(bindings=base, parent=BUILTINS_ENV, sites=self.sites)
         self.filename = filename
         self.stack = CallStack()
+        self._env_pool: List[Env] = []
+        self._frame_pool: List[Frame] = []
         self.breakpoints = BreakpointManager()
         self.paused = False
         self.step_mode = False  # si tu veux un step-by-step
+        self.steps = 0  # statements exécutés (métriques)
+        self.coverage: Optional[Coverage] = None  # voir cover()
+        # fonctions recopiées par fork(), en attente de leur Evaluator
+        self.pending_functions: List[Any] = []
+        self.modules: Dict[Any, Env] = {}  # module importé -> son env dans ce runtime
+        self.cow: Optional[CowBindings] = None  # global en copie-sur-écriture (snapshot)
+        self._invariants: Dict[str, Any] = {}  # invariants de boucle du niveau global
+
+    def imports_env(self) -> Env:
+        """Couche des modules importés, entre le global et les builtins (créée au premier import)."""
+        layer = self.global_env.parent
+        if layer is BUILTINS_ENV:
+            layer = Env(parent=BUILTINS_ENV, sites=self.sites)
+            layer.bindings = ModuleBindings()
+            layer.escaped = True
+            self.global_env.parent = layer
+        return layer
+
+    def writable(self, obj: Any, held: Optional[List[Any]] = None) -> Any:
+        """
+        Conteneur à modifier à la place de `obj` : sa copie s'il est partagé
+        avec un snapshot. `held` : valeurs en cours d'évaluation (arguments...),
+        redirigées elles aussi.
+        """
+        cow = self.cow
+        if cow is None or id(obj) not in cow.frozen():
+            return obj
+        roots: List[Any] = [self.global_env, self.memo._entries]
+        roots.extend(frame.env for frame in self.stack._frames)
+        if held is not None:
+            roots.append(held)
+        cow.privatize(roots)
+        self.cow = None  # plus rien de partagé : plus de copie-sur-écriture
+        return cow.copies[id(obj)]
+
+    def invariants(self) -> Dict[str, Any]:
+        """Invariants de boucle en cache (cf. optimiseur) de la frame courante, hors des bindings."""
+        top = self.stack.top()
+        if top is None:
+            return self._invariants
+        if top.invariants is None:
+            top.invariants = {}
+        return top.invariants
 
     def new_child_env(self, initial: Optional[Dict[str, Any]] = None) -> Env:
         return self.global_env.new_child(initial)
@@ -178,29 +568,92 @@ class Runtime:
         call_line: Optional[int] = None,
         call_col: Optional[int] = None,
     ) -> Env:
-        local_bindings = dict(zip(params, args))
-        local_env = Env(bindings=local_bindings, parent=caller_env)
-        frame = Frame(func_name=func_name, env=local_env, filename=self.filename, call_line=call_line, call_col=call_col)
+        # Env et Frame proviennent des freelists quand c'est possible
+        env_pool = self._env_pool
+        if env_pool:
+            local_env = env_pool.pop()
+            local_env.parent = caller_env
+        else:
+            local_env = self.env_class(parent=caller_env, sites=self.sites)
+        _bind_params(local_env.bindings, params, args, self.sites)
+
+        frame_pool = self._frame_pool
+        if frame_pool:
+            frame = frame_pool.pop()
+            frame.func_name = func_name
+            frame.env = local_env
+            frame.filename = self.filename
+            frame.call_line = call_line
+            frame.call_col = call_col
+            frame.elided = 0
+        else:
+            frame = Frame(func_name=func_name, env=local_env, filename=self.filename, call_line=call_line, call_col=call_col)
         self.stack.push(frame)
         return local_env
 
+    def reenter_function(
+        self,
+        params: List[str],
+        args: List[Any],
+        caller_env: Env,
+    ) -> Env:
+        """
+        Appel terminal récursif : réutilise la frame courante au lieu d'en
+        empiler une nouvelle. Si une closure a capturé l'env local, on lui
+        substitue un env neuf plutôt que de réécrire ses bindings.
+        """
+        frame = self.stack.top()
+        if frame is None:
+            raise RuntimeErrorMS("Appel terminal hors fonction", filename=self.filename)
+        env = frame.env
+        if env.escaped:
+            env = self._env_pool.pop() if self._env_pool else self.env_class(sites=self.sites)
+            env.parent = caller_env
+            frame.env = env
+        else:
+            env.bindings.clear()
+        frame.invariants = None
+        _bind_params(env.bindings, params, args, self.sites)
+        self.stack.elide()
+        return env
+
     def leave_function(self) -> None:
-        self.stack.pop()
+        frame = self.stack.pop()
+        env = frame.env
+        frame.env = None
+        frame.invariants = None
+        if len(self._frame_pool) < _POOL_MAX:
+            self._frame_pool.append(frame)
+        if not env.escaped and len(self._env_pool) < _POOL_MAX:
+            env.bindings.clear()
+            env.parent = None
+            self._env_pool.append(env)
 
     def current_env(self) -> Env:
         top = self.stack.top()
         return top.env if top is not None else self.global_env
 
-    def set_breakpoints(self, filename: str, lines: List[int]) -> None:
+    def set_breakpoints(self, filename: str, lines: List[Any]) -> None:
+        """
+        `lines` : numéros de ligne, ou dicts {"line", "condition",
+        "hit_condition", "log_message"} pour les breakpoints conditionnels.
+        Tout est compilé avant de remplacer les breakpoints existants.
+        """
+        compiled = [
+            Breakpoint(ln["line"], **{k: ln.get(k) for k in ("condition", "hit_condition", "log_message")})
+            if isinstance(ln, dict) else Breakpoint(ln)
+            for ln in lines
+        ]
         self.breakpoints.clear()
-        for ln in lines:
-            self.breakpoints.add(filename, ln)
+        for bp in compiled:
+            self.breakpoints.insert(filename, bp)
 
-    def before_stmt(self, line: Optional[int] = None, col: Optional[int] = None) -> bool:
+    def before_stmt(self, line: Optional[int] = None, col: Optional[int] = None, stmt: Any = None) -> bool:
         """
-        Hook à appeler par l'interpréteur avant chaque statement.
+        Hook à appeler par l'interpréteur avant chaque statement (`stmt`).
         Retourne True si l'exécution doit se mettre en pause (breakpoint ou step).
         """
+        self.steps += 1
         if self.step_mode:
             self.paused = True
             return True
@@ -209,6 +662,65 @@ class Runtime:
             return True
         return False
 
+    def limit(
+        self,
+        max_steps: Optional[int] = None,
+        timeout: Optional[float] = None,
+        max_depth: Optional[int] = None,
+    ) -> None:
+        """
+        Installe des limites d'exécution, vérifiées avant chaque statement.
+        Sans limite, before_stmt n'est pas enveloppé : aucun surcoût.
+        """
+        if not (max_steps or timeout or max_depth):
+            return
+        hook = self.before_stmt
+        stack = self.stack
+        deadline = time.monotonic() + timeout if timeout else None
+        steps = 0
+
+        def before_stmt(line: Optional[int] = None, col: Optional[int] = None, stmt: Any = None) -> bool:
+            nonlocal steps
+            steps += 1
+            if max_steps and steps > max_steps:
+                raise RuntimeErrorMS(f"Budget dépassé : plus de {max_steps} instructions", filename=self.filename)
+            if max_depth and len(stack) > max_depth:
+                raise RuntimeErrorMS(f"Budget dépassé : profondeur d'appel > {max_depth}", filename=self.filename)
+            # l'horloge n'est lue que toutes les 1024 instructions
+            if deadline is not None and not steps & 1023 and time.monotonic() > deadline:
+                raise RuntimeErrorMS(f"Budget dépassé : plus de {timeout:g} s", filename=self.filename)
+            return hook(line, col, stmt)
+
+        self.before_stmt = before_stmt  # type: ignore[method-assign]
+
+    def cover(self, program: Any, coverage: Optional[Coverage] = None) -> Coverage:
+        """
+        Active la couverture de lignes de `program` : chaque statement exécuté
+        marque son octet dans le bitmap. `coverage` (même programme) permet
+        d'accumuler plusieurs exécutions sans fusion. Comme pour limit(),
+        before_stmt n'est enveloppé que sur demande. Les statements d'autres
+        programmes (corps des fonctions d'un module importé) ne sont pas comptés.
+        """
+        size = len(number_statements(program))
+        if coverage is None:
+            coverage = Coverage(program)
+        elif size != len(coverage):
+            raise ValueError("Couverture d'un autre programme")
+        cov = coverage
+        bits = cov.bits
+        nodes = program.stmt_nodes
+        hook = self.before_stmt
+
+        def before_stmt(line: Optional[int] = None, col: Optional[int] = None, stmt: Any = None) -> bool:
+            sid = getattr(stmt, "sid", None)
+            if sid is not None and sid < size and nodes[sid] is stmt:
+                bits[sid] = 1
+            return hook(line, col, stmt)
+
+        self.before_stmt = before_stmt  # type: ignore[method-assign]
+        self.coverage = cov
+        return cov
+
     def continue_(self) -> None:
         self.paused = False
         self.step_mode = False
@@ -224,6 +736,126 @@ class Runtime:
     def callstack_snapshot(self) -> List[Dict[str, Any]]:
         return self.stack.as_list()
 
+    def snapshot(self) -> "RuntimeSnapshot":
+        """
+        Fige l'état global courant (les locaux d'un appel en cours ne sont
+        pas capturés). Le runtime passe ensuite lui aussi en copie-sur-écriture :
+        ni lui ni ses forks ne peuvent modifier l'état figé.
+        """
+        root = self.global_env
+        base = dict(root.bindings)  # copie superficielle : les valeurs restent partagées
+        snap = RuntimeSnapshot(self, base)
+        root.bindings = self.cow = CowBindings(base)
+        return snap
+
+    def fork(self) -> "Runtime":
+        return self.snapshot().fork()
+
 
-def make_runtime(filename: str = "<stdin>", builtins: Optional[Dict[str, Any]] = None) -> Runtime:
-    return Runtime(builtins=builtins, filename=filename)
+class _Rebinder:
+    """
+    Recopie des fonctions et de leurs closures : chaque env de la chaîne qui
+    mène à un env de `anchors` est copié une fois (conteneurs compris, par
+    une table commune qui conserve les alias), l'env ancre étant remplacé
+    par son correspondant. Les fonctions recopiées attendent leur évaluateur
+    dans `pending`, les envs recopiés invalident les caches en ligne de `sites`.
+    """
+    def __init__(self, anchors: Dict[int, Env], pending: List[Any], sites: CallSites = _UNWATCHED):
+        self.envs: Dict[int, Optional[Env]] = dict(anchors)  # id env source -> copie (None : hors chaîne)
+        self.memo: Dict[int, Any] = {}
+        self.pending = pending
+        self.sites = sites
+
+    def value(self, v: Any) -> Any:
+        done = self.memo.get(id(v))
+        if done is not None:
+            return done
+        if isinstance(v, MemoFunction):
+            inner = self.value(v.fn)
+            out = v if inner is v.fn else MemoFunction(inner)
+        elif isinstance(getattr(v, "closure_env", None), Env):
+            env = self.env(v.closure_env)
+            if env is None:
+                return v
+            out = copy.copy(v)
+            out.closure_env = env
+            out.evaluator = None
+            self.pending.append(out)
+        else:
+            return cow_copy(v, self.memo)
+        self.memo[id(v)] = out
+        return out
+
+    def env(self, env: Optional[Env]) -> Optional[Env]:
+        if env is None:
+            return None
+        if id(env) in self.envs:
+            return self.envs[id(env)]
+        parent = self.env(env.parent)
+        if parent is None:
+            self.envs[id(env)] = None
+            return None
+        new = Env(parent=parent, sites=self.sites)
+        new.escaped = True
+        self.envs[id(env)] = new
+        if type(env.bindings) is ModuleBindings:
+            # couche de modules : valeurs instanciées (lecture par []), copie encore en lecture seule
+            new.bindings = ModuleBindings()
+            for k in list(env.bindings):
+                dict.__setitem__(new.bindings, k, self.value(env.bindings[k]))
+        else:
+            new.bindings = {k: self.value(v) for k, v in env.bindings.items()}
+        return new
+
+
+def _is_function(v: Any) -> bool:
+    return isinstance(v, MemoFunction) or isinstance(getattr(v, "closure_env", None), Env)
+
+
+class RuntimeSnapshot:
+    """
+    État global figé d'un runtime. Chaque fork() en dérive un runtime
+    indépendant pour un coût proportionnel au nombre de noms globaux, pas à
+    la taille des données : un conteneur global n'est copié qu'à sa première
+    modification (cf. CowBindings).
+
+    Les fonctions globales sont rattachées au global du fork ; les closures
+    (fonction renvoyée par une autre...) emportent une copie de leur chaîne
+    d'envs, faite au snapshot puis à chaque fork. Il en va de même des
+    modules importés : chaque fork a sa couche d'imports et ses envs de
+    modules, dont les fonctions sont rattachées à son évaluateur.
+    """
+    def __init__(self, runtime: Runtime, bindings: Dict[str, Any]):
+        self.bindings = bindings
+        self.filename = runtime.filename
+        self.memo_limit = runtime.memo.limit
+        self._memo = runtime.memo
+        self._root = Env()  # tient lieu du global des forks dans les closures figées
+        # toute chaîne d'envs finit aux builtins : closures et modules sont figés
+        freeze = _Rebinder({id(runtime.global_env): self._root, id(BUILTINS_ENV): BUILTINS_ENV}, [])
+        self._functions = {name: freeze.value(v) for name, v in bindings.items() if _is_function(v)}
+        self._imports = freeze.env(runtime.global_env.parent)
+        self._modules = {module: freeze.env(env) for module, env in runtime.modules.items()}
+
+    def fork(self) -> Runtime:
+        rt = Runtime(filename=self.filename, memo_limit=self.memo_limit)
+        root = rt.global_env
+        bindings = CowBindings(self.bindings)
+        for name in ("memo", "memo_stats"):
+            if getattr(bindings.get(name), "__self__", None) is self._memo:
+                bindings[name] = root.bindings[name]
+        thaw = _Rebinder({id(self._root): root, id(BUILTINS_ENV): BUILTINS_ENV}, rt.pending_functions, rt.sites)
+        for name, fn in self._functions.items():
+            bindings[name] = thaw.value(fn)
+        root.bindings = rt.cow = bindings
+        root.parent = thaw.env(self._imports)
+        rt.modules = {module: thaw.env(env) for module, env in self._modules.items()}
+        return rt
+
+
+def make_runtime(
+    filename: str = "<stdin>",
+    builtins: Optional[Dict[str, Any]] = None,
+    memo_limit: int = 4096,
+) -> Runtime:
+    return Runtime(builtins=builtins, filename=filename, memo_limit=memo_limit)
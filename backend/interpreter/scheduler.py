@@ -0,0 +1,367 @@
+# backend/interpreter/scheduler.py
+"""
+Ordonnanceur coopératif : de nombreux scripts sur un seul thread.
+
+Chaque script devient une tâche dont l'évaluation est un générateur. Une
+tâche rend la main tous les `quantum` statements (tranche de temps), et
+sur les builtins bloquants `sleep` / `input`, qui ne bloquent alors plus le
+thread : la tâche est simplement mise en attente.
+
+Limite : une fonction utilisateur appelée depuis un builtin Python (map,
+filter, pmap...) s'exécute d'un bloc, un `sleep` y reste donc bloquant.
+"""
+import asyncio
+import heapq
+import io
+import sys
+import time
+from collections import deque
+from itertools import count
+from typing import Any, Deque, Dict, Generator, List, Optional, Tuple
+
+from backend.ast_nodes import (
+    Program, Array, Dict as DictNode, ListComp, DictComp, Variable, Assign, BinaryOp, PrintStmt,
+    IfStmt, WhileStmt, ForStmt, FunctionCall, Return, Index, walk
+)
+from backend.lexer import lexer
+from backend.parser import Parser
+from backend.interpreter.runtime import Runtime, make_runtime, ReturnSignal, TailCallSignal, RuntimeErrorMS
+from backend.interpreter.evaluator import Evaluator, UserFunction, _MISS
+from backend.interpreter.memo import MemoFunction, memo_key
+from backend.interpreter.stdlib import ms_sleep, ms_input
+from backend.errors import format_error
+
+SLICE = ("slice",)  # fin de tranche : la tâche repasse en queue de file
+
+
+def _has_call(node: Any) -> bool:
+    """Vrai si le sous-arbre contient un appel (seul point où une tâche peut bloquer)."""
+    flag = node.__dict__.get("has_call")
+    if flag is None:
+        flag = any(type(n) is FunctionCall for n in walk(node))
+        node.has_call = flag
+    return flag
+
+
+class TaskEvaluator(Evaluator):
+    """
+    Variante générateur de l'Evaluator. Les sous-arbres sans appel sont
+    délégués à Evaluator.eval ; seuls les chemins contenant un appel passent
+    par les générateurs, qui peuvent suspendre la tâche.
+    """
+    def __init__(self, runtime: Runtime, quantum: int = 100):
+        super().__init__(runtime)
+        self.quantum = quantum
+        self._budget = quantum
+        self.statements = 0
+
+    def run(self, program: Program) -> Generator:
+        self._watch_call_sites(program)
+        yield from self._block(program.statements)
+
+    def _block(self, stmts: List[Any]) -> Generator:
+        for s in stmts:
+            self._before_stmt(s)
+            self.statements += 1
+            self._budget -= 1
+            if self._budget <= 0:
+                self._budget = self.quantum
+                yield SLICE
+            if _has_call(s) or type(s) in (IfStmt, WhileStmt, ForStmt):
+                yield from self._stmt(s)
+            else:
+                self.eval(s)
+
+    def _stmt(self, node: Any) -> Generator:
+        t = type(node)
+
+        if t is IfStmt:
+            if self._truthy((yield from self._expr(node.condition))):
+                yield from self._block(node.body)
+                return
+            for cond, body in node.elifs:
+                if self._truthy((yield from self._expr(cond))):
+                    yield from self._block(body)
+                    return
+            yield from self._block(node.orelse)
+            return
+
+        if t is WhileStmt:
+            guard = 0
+            while self._truthy((yield from self._expr(node.condition))):
+                yield from self._block(node.body)
+                guard += 1
+                if guard > 1_000_000:
+                    raise RuntimeErrorMS("Boucle infinie détectée (>1e6 itérations)", filename=self.rt.filename)
+            return
+
+        if t is ForStmt:
+            env = self.rt.current_env()
+            iterable = yield from self._expr(node.iterable)
+            try:
+                iterator = iter(iterable)
+            except Exception:
+                raise RuntimeErrorMS("Objet non itérable dans 'for'", filename=self.rt.filename)
+            for v in iterator:
+                env.set(node.var_name, v)
+                yield from self._block(node.body)
+            return
+
+        if t is Assign:
+            env = self.rt.current_env()
+            value = yield from self._expr(node.value)
+            target = node.target
+            if isinstance(target, Variable):
+                env.set(target.name, value)
+                return
+            if isinstance(target, Index):
+                held = [value]
+                obj = self.rt.writable((yield from self._expr(target.target)), held)
+                value = held[0]
+                idx = yield from self._expr(target.index)
+                try:
+                    obj[idx] = value
+                except Exception as ex:
+                    raise RuntimeErrorMS(f"Affectation index invalide: {ex}", filename=self.rt.filename)
+                return
+            raise RuntimeErrorMS("Cible d'affectation invalide", filename=self.rt.filename)
+
+        if t is PrintStmt:
+            print((yield from self._expr(node.expression)))
+            return
+
+        if t is Return:
+            value = node.value
+            if type(value) is FunctionCall and self._active_fn is not None:
+                if self.rt.current_env().get(value.name) is self._active_fn:
+                    args = []
+                    for a in value.args:
+                        args.append((yield from self._expr(a)))
+                    raise TailCallSignal(args)
+            raise ReturnSignal((yield from self._expr(value)))
+
+        yield from self._expr(node)
+
+    def _expr(self, node: Any) -> Generator:
+        if node is None or not _has_call(node):
+            return self.eval(node) if node is not None else None
+        t = type(node)
+
+        if t is FunctionCall:
+            callee = self._callee(node)
+            args = []
+            for a in node.args:
+                args.append((yield from self._expr(a)))
+            return (yield from self._call_gen(callee, args))
+
+        if t is BinaryOp:
+            left = yield from self._expr(node.left)
+            right = yield from self._expr(node.right)
+            return self._binary(node.op, left, right)
+
+        if t is Index:
+            target = yield from self._expr(node.target)
+            idx = yield from self._expr(node.index)
+            try:
+                return target[idx]
+            except Exception as ex:
+                raise RuntimeErrorMS(f"Indexation invalide: {ex}", filename=self.rt.filename)
+
+        if t is Array:
+            out = []
+            for e in node.elements:
+                out.append((yield from self._expr(e)))
+            return out
+
+        if t is DictNode:
+            out = {}
+            for k_expr, v_expr in node.pairs:
+                k = yield from self._expr(k_expr)
+                out[k] = yield from self._expr(v_expr)
+            return out
+
+        if t is ListComp or t is DictComp:
+            return (yield from self._comprehension_gen(node))
+
+        return self.eval(node)
+
+    def _comprehension_gen(self, node: Any) -> Generator:
+        """Evaluator._comprehension, pour une compréhension dont le corps appelle des fonctions."""
+        iterator = self._comp_iter((yield from self._expr(node.iterable)))
+        env = self.rt.current_env()
+        name = node.var_name
+        saved = env.bindings.get(name, _MISS)
+        dict_comp = type(node) is DictComp
+        out: Any = {} if dict_comp else []
+        try:
+            for v in iterator:
+                env.define(name, v)
+                if node.condition is not None and not self._truthy((yield from self._expr(node.condition))):
+                    continue
+                if dict_comp:
+                    k = yield from self._expr(node.key)
+                    out[k] = yield from self._expr(node.value)
+                else:
+                    out.append((yield from self._expr(node.expr)))
+            return out
+        finally:
+            self._comp_restore(env, name, saved)
+
+    def _call_gen(self, callee: Any, args: List[Any]) -> Generator:
+        if isinstance(callee, UserFunction):
+            return (yield from self._call_user_gen(callee, args))
+        if isinstance(callee, MemoFunction):
+            cache = self.rt.memo
+            key = memo_key(callee.fn, args)
+            try:
+                value = cache.get(key, _MISS)
+            except TypeError:
+                return (yield from self._call_user_gen(callee.fn, args))
+            if value is _MISS:
+                value = yield from self._call_user_gen(callee.fn, args)
+                cache.put(key, value)
+            return value
+        if callee is ms_sleep:
+            yield ("sleep", float(args[0]) if args else 0.0)
+            return None
+        if callee is ms_input:
+            return (yield ("input", args[0] if args else ""))
+        return self.call(callee, args)
+
+    def _call_user_gen(self, fn: UserFunction, args: List[Any]) -> Generator:
+        rt = self.rt
+        rt.enter_function(func_name=fn.name, params=fn.params, args=args, caller_env=fn.closure_env)
+        outer = self._active_fn
+        self._active_fn = fn
+        try:
+            while True:
+                try:
+                    yield from self._block(fn.body)
+                    return None
+                except TailCallSignal as tc:
+                    rt.reenter_function(fn.params, tc.args_values, fn.closure_env)
+                except ReturnSignal as rs:
+                    return rs.value
+        finally:
+            self._active_fn = outer
+            rt.leave_function()
+
+
+class Task:
+    """Un script ordonnancé : son générateur, sa sortie et ses entrées."""
+    __slots__ = ("id", "evaluator", "gen", "out", "inputs", "done", "error", "waiting_input", "_send")
+
+    def __init__(self, task_id: int, evaluator: TaskEvaluator, gen: Generator, inputs: Optional[List[Any]] = None):
+        self.id = task_id
+        self.evaluator = evaluator
+        self.gen = gen
+        self.out = io.StringIO()
+        self.inputs: Deque[Any] = deque(inputs or [])
+        self.done = False
+        self.error: Optional[str] = None
+        self.waiting_input = False
+        self._send: Any = None
+
+    @property
+    def output(self) -> str:
+        return self.out.getvalue()
+
+
+class Scheduler:
+    """
+    Boucle tourniquet : file des tâches prêtes, tas des tâches endormies
+    (réveil, n°, tâche) et ensemble des tâches en attente d'une entrée.
+    """
+    def __init__(self, quantum: int = 100):
+        self.quantum = quantum
+        self.tasks: Dict[int, Task] = {}
+        self._ready: Deque[Task] = deque()
+        self._sleeping: List[Tuple[float, int, Task]] = []
+        self._seq = count()
+        self.slices = 0
+
+    def spawn(self, code_or_ast: Any, inputs: Optional[List[Any]] = None, filename: str = "<stdin>") -> Task:
+        ast = code_or_ast
+        if isinstance(code_or_ast, str):
+            ast = Parser(lexer(code_or_ast)).parse()
+        ev = TaskEvaluator(make_runtime(filename=filename), quantum=self.quantum)
+        task = Task(next(self._seq), ev, ev.run(ast), inputs)
+        self.tasks[task.id] = task
+        self._ready.append(task)
+        return task
+
+    def feed(self, task: Task, value: Any) -> None:
+        """Fournit une ligne d'entrée ; réveille la tâche si elle l'attendait."""
+        if task.waiting_input:
+            task.waiting_input = False
+            task._send = value
+            self._ready.append(task)
+        else:
+            task.inputs.append(value)
+
+    def pending(self) -> bool:
+        return bool(self._ready or self._sleeping)
+
+    def _wake(self, now: float) -> None:
+        sleeping = self._sleeping
+        while sleeping and sleeping[0][0] <= now:
+            self._ready.append(heapq.heappop(sleeping)[2])
+
+    def step(self) -> Optional[float]:
+        """
+        Exécute une tranche de la prochaine tâche prête.
+        Retourne 0 si du travail reste prêt, sinon le délai avant le prochain
+        réveil, ou None si plus rien n'est ordonnançable.
+        """
+        self._wake(time.monotonic())
+        if not self._ready:
+            if not self._sleeping:
+                return None
+            return max(0.0, self._sleeping[0][0] - time.monotonic())
+
+        task = self._ready.popleft()
+        value, task._send = task._send, None
+        old_stdout = sys.stdout
+        sys.stdout = task.out
+        try:
+            req = task.gen.send(value)
+        except StopIteration:
+            task.done = True
+            return 0.0
+        except Exception as ex:
+            task.done = True
+            task.error = format_error(ex)
+            return 0.0
+        finally:
+            sys.stdout = old_stdout
+            self.slices += 1
+
+        kind = req[0]
+        if kind == "sleep":
+            heapq.heappush(self._sleeping, (time.monotonic() + req[1], next(self._seq), task))
+        elif kind == "input":
+            if task.inputs:
+                task._send = task.inputs.popleft()
+                self._ready.append(task)
+            else:
+                task.waiting_input = True
+        else:
+            self._ready.append(task)
+        return 0.0
+
+    def run(self) -> None:
+        """Exécute jusqu'à ce que toutes les tâches soient finies ou en attente d'entrée."""
+        while True:
+            delay = self.step()
+            if delay is None:
+                return
+            if delay > 0:
+                time.sleep(delay)
+
+    async def run_async(self) -> None:
+        """Comme run(), mais cède la main à la boucle asyncio pendant les attentes."""
+        while True:
+            delay = self.step()
+            if delay is None:
+                return
+            await asyncio.sleep(delay)
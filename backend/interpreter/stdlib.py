@@ -1,9 +1,9 @@
 import math
-import random
 import time
-import datetime
 from functools import reduce
 
+from backend.interpreter.values import StringBuilder
+
 def ms_print(*args):
     print(*args)
 
@@ -23,6 +23,8 @@ def ms_type(x):
         return "number"
     if isinstance(x, str):
         return "string"
+    if isinstance(x, StringBuilder):
+        return "builder"
     if isinstance(x, list):
         return "list"
     if isinstance(x, dict):
@@ -64,6 +66,14 @@ def ms_filter(fn, xs):
 def ms_reduce(fn, xs, initial=None):
     return reduce(fn, xs, initial) if initial is not None else reduce(fn, xs)
 
+def ms_pmap(fn, xs):
+    from backend.interpreter.parallel import pmap
+    return pmap(fn, xs)
+
+def ms_preduce(fn, xs, initial=None):
+    from backend.interpreter.parallel import preduce
+    return preduce(fn, xs, initial)
+
 def ms_sorted(xs, reverse=False):
     return sorted(xs, reverse=reverse)
 
@@ -76,6 +86,16 @@ def ms_join(sep, xs):
 def ms_split(s, sep=None):
     return str(s).split(sep)
 
+def ms_builder(initial=""):
+    return StringBuilder(initial)
+
+def ms_append(sb, *parts):
+    if not isinstance(sb, StringBuilder):
+        raise TypeError("append attend un builder")
+    for p in parts:
+        sb.append(p)
+    return sb
+
 def ms_upper(s): return str(s).upper()
 def ms_lower(s): return str(s).lower()
 def ms_startswith(s, prefix): return str(s).startswith(prefix)
@@ -83,13 +103,19 @@ def ms_endswith(s, suffix):   return str(s).endswith(suffix)
 def ms_strip(s, chars=None):  return str(s).strip(chars) if chars is not None else str(s).strip()
 
 def ms_time():      return time.time()
-def ms_now():       return datetime.datetime.now().isoformat(timespec="seconds")
+def ms_now():
+    import datetime  # import paresseux : rarement utilisé, coûteux au démarrage
+    return datetime.datetime.now().isoformat(timespec="seconds")
 def ms_sleep(sec):  time.sleep(float(sec)); return None
 
-def ms_random():    return random.random()
-def ms_randint(a, b): return random.randint(int(a), int(b))
-def ms_choice(xs):  return random.choice(xs)
-def ms_shuffle(xs): random.shuffle(xs); return xs
+def _random():
+    import random  # import paresseux, comme datetime
+    return random
+
+def ms_random():    return _random().random()
+def ms_randint(a, b): return _random().randint(int(a), int(b))
+def ms_choice(xs):  return _random().choice(xs)
+def ms_shuffle(xs): _random().shuffle(xs); return xs
 
 def ms_push(xs, v):
     xs.append(v); return xs
@@ -106,6 +132,24 @@ def ms_insert(xs, i, v):
 def ms_remove(xs, v):
     xs.remove(v); return xs
 
+def _files():
+    from backend.interpreter import files  # import paresseux (csv, json)
+    return files
+
+def _writer(w, name):
+    if not isinstance(w, _files().Writer):
+        raise TypeError(f"{name} attend un writer")
+    return w
+
+def ms_read_lines(path): return _files().Reader(path)
+def ms_read_csv(path, header=False, sep=","): return _files().CsvReader(path, header, sep)
+def ms_read_jsonl(path): return _files().JsonLinesReader(path)
+def ms_writer(path, append=False): return _files().Writer(path, append)
+def ms_write_line(w, text):  _writer(w, "write_line").line(text); return w
+def ms_write_row(w, values): _writer(w, "write_row").row(values); return w
+def ms_write_json(w, value): _writer(w, "write_json").json(value); return w
+def ms_close(w): _writer(w, "close").close(); return None
+
 def ms_keys(d):    return list(d.keys())
 def ms_values(d):  return list(d.values())
 def ms_items(d):   return list(d.items())
@@ -144,6 +188,8 @@ BUILTINS = {
     "map": ms_map,
     "filter": ms_filter,
     "reduce": ms_reduce,
+    "pmap": ms_pmap,
+    "preduce": ms_preduce,
     "sorted": ms_sorted,
     "reversed": ms_reversed,
     "join": ms_join,
@@ -153,6 +199,8 @@ BUILTINS = {
     "startswith": ms_startswith,
     "endswith": ms_endswith,
     "strip": ms_strip,
+    "builder": ms_builder,
+    "append": ms_append,
 
     # temps & aléatoire
     "time": ms_time,
@@ -163,6 +211,16 @@ BUILTINS = {
     "choice": ms_choice,
     "shuffle": ms_shuffle,
 
+    # fichiers (sous la racine de données, cf. files.py)
+    "read_lines": ms_read_lines,
+    "read_csv": ms_read_csv,
+    "read_jsonl": ms_read_jsonl,
+    "writer": ms_writer,
+    "write_line": ms_write_line,
+    "write_row": ms_write_row,
+    "write_json": ms_write_json,
+    "close": ms_close,
+
     # listes
     "push": ms_push,
     "pop": ms_pop,
@@ -179,3 +237,32 @@ BUILTINS = {
     "update": ms_update,
     "has": ms_has,
 }
+
+# Effet de chaque builtin (memo, optimiseur) :
+#   pure    : sans effet, résultat fonction des seuls arguments
+#   io      : E/S, horloge ou aléatoire, sans modifier les valeurs du script
+#   mutates : modifie son premier argument (et le renvoie)
+#   calls   : appelle une fonction reçue en argument, effet inconnu
+EFFECTS = {name: "pure" for name in BUILTINS}
+EFFECTS.update({name: "io" for name in (
+    "print", "input", "time", "now", "sleep", "random", "randint", "choice",
+    "read_lines", "read_csv", "read_jsonl", "writer", "write_line", "write_row", "write_json", "close",
+)})
+EFFECTS.update({name: "mutates" for name in (
+    "shuffle", "push", "pop", "extend", "insert", "remove", "append", "setdefault", "update",
+)})
+EFFECTS.update({name: "calls" for name in ("map", "filter", "reduce", "pmap", "preduce")})
+
+# Builtins à effet de bord : E/S, horloge, aléatoire et mutation d'arguments.
+# Ne jamais les mémoïser ni les déplacer lors d'une optimisation.
+IMPURE_BUILTINS = frozenset(name for name, effect in EFFECTS.items() if effect in ("io", "mutates"))
+
+# Fonctions qui modifient leur premier argument (copie-sur-écriture des snapshots)
+MUTATING_FUNCTIONS = frozenset(BUILTINS[name] for name, effect in EFFECTS.items() if effect == "mutates")
+
+# Builtins dont le résultat est toujours immuable (nombre, chaîne, booléen)
+SCALAR_BUILTINS = frozenset({
+    "len", "type", "str", "int", "float", "bool", "abs", "sum", "pow", "sqrt",
+    "floor", "ceil", "round", "join", "upper", "lower", "startswith", "endswith",
+    "strip", "has",
+})
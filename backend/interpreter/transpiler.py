@@ -0,0 +1,652 @@
+# backend/interpreter/transpiler.py
+"""
+Moteur « compiled » : traduit un Program en source Python, compilé une fois
+par compile() puis exécuté par le bytecode de CPython.
+
+Sémantique MicroScript conservée :
+  - `+` convertit en chaîne dès qu'un opérande est une chaîne ou un builder ;
+  - portée : le global du programme est un dict dont `__builtins__` est la
+    stdlib MicroScript (même ordre de résolution que global -> BUILTINS_ENV) ;
+    dans une fonction, une affectation écrit dans la portée englobante qui
+    lie déjà le nom, sinon crée une locale (déclarations global / nonlocal) ;
+  - garde des boucles while (1e6 itérations), erreurs de `for` et
+    d'indexation, appels terminaux récursifs sans croissance de pile ;
+  - compréhensions : compréhensions Python, dont la variable ne fuit pas.
+
+Quand cette portée ne se décide pas statiquement (nom lié par la portée
+englobante seulement après la définition de la fonction...), ou que le
+programme utilise memo / pmap / preduce, qui attendent des fonctions
+utilisateur de l'Evaluator, transpile() lève Unsupported : le programme
+s'exécute alors avec l'Evaluator. De même quand le runtime a des hooks par
+statement (limites, couverture, breakpoints) ou un global en
+copie-sur-écriture (fork).
+"""
+import dis
+import keyword
+import math
+import re
+import warnings
+from types import FunctionType
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from backend.ast_nodes import (
+    Program, Number, String, Bool, Array, Dict as DictNode,
+    Variable, Assign, BinaryOp, PrintStmt,
+    IfStmt, WhileStmt, ForStmt,
+    FunctionDef, FunctionCall, Return, Index, ListComp, DictComp,
+    LoopInvariant, ResetInvariants, ImportStmt, walk
+)
+from backend.interpreter.runtime import Runtime, BUILTINS_ENV, RuntimeErrorMS
+from backend.interpreter.evaluator import Evaluator
+from backend.interpreter.stdlib import EFFECTS
+from backend.interpreter.values import StringBuilder
+
+FILENAME = "<microscript>"  # nom des code objects générés
+WHILE_GUARD = 1_000_000     # comme Evaluator
+
+# builtins qui manipulent des UserFunction de l'Evaluator
+EVALUATOR_ONLY = frozenset({"memo", "memo_stats", "pmap", "preduce"})
+
+_CODE_CACHE: Dict[str, Any] = {}  # source Python -> code object
+_CODE_CACHE_MAX = 256
+_MISS = object()
+
+
+class Unsupported(Exception):
+    """Programme hors du sous-ensemble compilable (repli sur l'Evaluator)."""
+
+
+# --- aides appelées par le code généré -------------------------------------
+
+def _add(a: Any, b: Any) -> Any:
+    if isinstance(a, (str, StringBuilder)) or isinstance(b, (str, StringBuilder)):
+        return str(a) + str(b)
+    return a + b
+
+
+def _iter(v: Any) -> Any:
+    try:
+        return iter(v)
+    except Exception:
+        raise RuntimeErrorMS("Objet non itérable dans 'for'") from None
+
+
+def _comp_iter(v: Any) -> Any:
+    try:
+        return iter(v)
+    except Exception:
+        raise RuntimeErrorMS("Objet non itérable dans une compréhension") from None
+
+
+def _setitem(value: Any, target: Any, idx: Any) -> None:
+    try:
+        target[idx] = value
+    except Exception as ex:
+        raise RuntimeErrorMS(f"Affectation index invalide: {ex}") from None
+
+
+def _loop_error() -> None:
+    raise RuntimeErrorMS("Boucle infinie détectée (>1e6 itérations)")
+
+
+class _Shown:
+    """Fonction compilée telle que l'affiche l'Evaluator (cf. UserFunction.__repr__)."""
+    __slots__ = ("text",)
+
+    def __init__(self, fn: FunctionType):
+        code = fn.__code__
+        params = ", ".join(msname(p) for p in code.co_varnames[:code.co_argcount])
+        self.text = f"<Function {msname(fn.__name__)}({params})>"
+
+    def __repr__(self) -> str:
+        return self.text
+
+
+def _shown(v: Any, memo: Dict[int, Any]) -> Any:
+    """`v` où les fonctions du code généré sont remplacées par leur affichage MicroScript."""
+    t = type(v)
+    if t is FunctionType:
+        return _Shown(v) if v.__code__.co_filename == FILENAME else v
+    if t is not list and t is not dict:
+        return v
+    done = memo.get(id(v))
+    if done is not None:
+        return done
+    if t is list:
+        out: Any = []
+        memo[id(v)] = out
+        out.extend(_shown(x, memo) for x in v)
+    else:
+        out = {}
+        memo[id(v)] = out
+        for k, x in v.items():
+            out[_shown(k, memo)] = _shown(x, memo)
+    return out
+
+
+def _print(v: Any) -> None:
+    t = type(v)
+    print(_shown(v, {}) if t is list or t is dict or t is FunctionType else v)
+
+
+HELPERS = {
+    "_ms_add": _add, "_ms_iter": _iter, "_ms_comp_iter": _comp_iter, "_ms_setitem": _setitem, "_ms_loop_error": _loop_error,
+    "_ms_type": type, "_ms_str": str, "_ms_SB": StringBuilder, "_ms_print": _print,
+    "_ms_float": float, "_ms_MISS": _MISS,
+}
+_BUILTINS = dict(BUILTINS_ENV.bindings)
+
+
+def pyname(name: str) -> str:
+    """Nom Python d'un identifiant MicroScript (mots-clés Python et dunders préfixés)."""
+    if keyword.iskeyword(name) or name.startswith("__"):
+        return "_ms_kw_" + name
+    return name
+
+
+def msname(name: str) -> str:
+    return name[len("_ms_kw_"):] if name.startswith("_ms_kw_") else name
+
+
+# --- analyse des portées ---------------------------------------------------
+
+class _Scope:
+    """Portée : programme (parent None) ou corps de fonction."""
+    def __init__(self, parent: Optional["_Scope"], params: List[str], def_sure: frozenset):
+        self.parent = parent
+        self.params = set(params)
+        self.assigned: Set[str] = set()  # noms liés dans la portée (hors fonctions imbriquées)
+        self.sure: Set[str] = set()      # liés à coup sûr au point courant du parcours
+        self.def_sure = def_sure         # noms sûrs du parent quand la fonction est définie
+        self.locals: Set[str] = set()
+        self.globals: Set[str] = set()
+        self.nonlocals: Set[str] = set()
+
+    def binds(self, name: str) -> bool:
+        return name in self.params or name in self.locals
+
+
+class _Analysis:
+    def __init__(self, program: Program, predefined: Set[str]):
+        self.module = _Scope(None, [], frozenset())
+        self.module.sure.update(predefined)
+        self.scopes: Dict[int, _Scope] = {}  # id(FunctionDef) -> portée
+        self.arity: Dict[str, Set[int]] = {}
+        self.calls: List[Tuple[str, int]] = []
+        # noms vus par les fonctions : une fonction appelée depuis une compréhension
+        # verrait sa variable avec l'Evaluator, pas avec Python
+        self.fn_names: Set[str] = {
+            n.name for d in walk(program) if type(d) is FunctionDef
+            for n in walk(d.body) if type(n) is Variable
+        }
+        self._block(self.module, program.statements, direct=True)
+        for name, n in self.calls:
+            if name in self.arity and self.arity[name] != {n}:
+                raise Unsupported(f"appel de {name} avec {n} argument(s)")
+        self._classify()
+
+    def _name(self, name: str) -> None:
+        if name.startswith("_ms_"):
+            raise Unsupported(f"identifiant réservé {name}")
+        if name in EVALUATOR_ONLY:
+            raise Unsupported(f"{name} requiert l'Evaluator")
+
+    def _expr(self, e: Any) -> None:
+        for n in walk(e):
+            t = type(n)
+            if t is Variable:
+                self._name(n.name)
+            elif t is FunctionCall:
+                self._name(n.name)
+                self.calls.append((n.name, len(n.args)))
+            elif t is ListComp or t is DictComp:
+                self._name(n.var_name)
+
+    def _bind(self, scope: _Scope, name: str, direct: bool) -> None:
+        self._name(name)
+        scope.assigned.add(name)
+        if direct:
+            scope.sure.add(name)
+
+    def _block(self, scope: _Scope, stmts: List[Any], direct: bool) -> None:
+        for s in stmts:
+            t = type(s)
+            if t is Assign:
+                self._expr(s.value)
+                if type(s.target) is Variable:
+                    self._bind(scope, s.target.name, direct)
+                elif type(s.target) is Index:
+                    self._expr(s.target)
+                else:
+                    raise Unsupported("cible d'affectation")
+            elif t is IfStmt:
+                self._expr(s.condition)
+                self._block(scope, s.body, False)
+                for cond, body in s.elifs:
+                    self._expr(cond)
+                    self._block(scope, body, False)
+                self._block(scope, s.orelse, False)
+            elif t is WhileStmt:
+                self._expr(s.condition)
+                self._block(scope, s.body, False)
+            elif t is ForStmt:
+                self._expr(s.iterable)
+                self._bind(scope, s.var_name, False)
+                self._block(scope, s.body, False)
+            elif t is FunctionDef:
+                if len(set(s.params)) != len(s.params):
+                    raise Unsupported(f"paramètres répétés dans {s.name}")
+                for p in s.params:
+                    self._name(p)
+                self.arity.setdefault(s.name, set()).add(len(s.params))
+                child = _Scope(scope, s.params, frozenset(scope.sure))
+                self.scopes[id(s)] = child
+                self._block(child, s.body, True)
+                self._bind(scope, s.name, direct)
+            elif t is Return:
+                if scope is self.module:
+                    raise Unsupported("return hors fonction")
+                if s.value is not None:
+                    self._expr(s.value)
+            elif t is ResetInvariants:
+                pass
+            elif t is ImportStmt:
+                raise Unsupported(f"import de {s.name}")  # noms connus seulement à l'exécution
+            else:
+                self._expr(s)
+
+    def _classify(self) -> None:
+        """
+        Déclaration de chaque nom affecté dans une fonction. Le nom est
+        écrit là où Env.set l'écrirait : dans la plus proche portée qui le
+        lie, à condition qu'elle le lie déjà quand la fonction est définie.
+        """
+        builtins = set(_BUILTINS)
+        self.module.locals = set(self.module.assigned)
+        for scope in self.scopes.values():  # ordre de définition : parents d'abord
+            for name in sorted(scope.assigned - scope.params):
+                owner, sure = scope.parent, scope.def_sure
+                while owner is not self.module and not owner.binds(name):
+                    owner, sure = owner.parent, owner.def_sure
+                if owner is not self.module:
+                    if name not in sure:
+                        raise Unsupported(f"portée de {name} décidée à l'exécution")
+                    scope.nonlocals.add(name)
+                elif name in builtins or name in sure:
+                    scope.globals.add(name)
+                elif name in self.module.assigned:
+                    raise Unsupported(f"portée de {name} décidée à l'exécution")
+                else:
+                    scope.locals.add(name)
+
+
+# --- génération ------------------------------------------------------------
+
+_NOT_STR_OPS = ('-', '/', '//', '**', '>', '<', '==', '!=', '>=', '<=')
+
+
+class _Emitter:
+    def __init__(self, analysis: _Analysis, predefined: Set[str]):
+        self.a = analysis
+        self.lines: List[str] = []
+        self.counter = 0
+        # builtins jamais re-liés et sans callback : leurs appels ne ré-affectent aucune variable
+        bound = set(predefined)
+        for scope in [analysis.module, *analysis.scopes.values()]:
+            bound |= scope.assigned | scope.params
+        self.safe_calls = frozenset(n for n in _BUILTINS if n not in bound and EFFECTS.get(n) != "calls")
+
+    def tmp(self, kind: str) -> str:
+        self.counter += 1
+        return f"_ms_{kind}{self.counter}"
+
+    def emit(self, depth: int, line: str) -> None:
+        self.lines.append("    " * depth + line)
+
+    # expressions : (code, ne peut pas être une chaîne)
+    def expr(self, e: Any) -> Tuple[str, bool]:
+        t = type(e)
+        if t is Number:
+            v = e.value
+            if isinstance(v, float) and not math.isfinite(v):
+                return f"_ms_float({str(v)!r})", True
+            return f"({v!r})", True
+        if t is String:
+            v = e.value
+            if isinstance(v, str) and len(v) >= 2 and v[0] == '"' and v[-1] == '"':
+                v = v[1:-1]
+            return repr(v), False
+        if t is Bool:
+            return repr(bool(e.value)), True
+        if t is Variable:
+            return pyname(e.name), False
+        if t is Array:
+            return "[" + ", ".join(self.expr(x)[0] for x in e.elements) + "]", True
+        if t is DictNode:
+            return "{" + ", ".join(f"{self.expr(k)[0]}: {self.expr(v)[0]}" for k, v in e.pairs) + "}", True
+        if t is Index:
+            return f"{self.expr(e.target)[0]}[{self.expr(e.index)[0]}]", False
+        if t is FunctionCall:
+            return f"{pyname(e.name)}({', '.join(self.expr(x)[0] for x in e.args)})", False
+        if t is BinaryOp:
+            return self.binary(e)
+        if t is ListComp or t is DictComp:
+            return self.comprehension(e), True
+        if t is LoopInvariant:
+            key = self.invariant(e.key)
+            return f"({key} if {key} is not _ms_MISS else ({key} := {self.expr(e.expr)[0]}))", False
+        raise Unsupported(f"nœud {t.__name__}")
+
+    def binary(self, e: BinaryOp) -> Tuple[str, bool]:
+        (left, lnum), (right, rnum) = self.expr(e.left), self.expr(e.right)
+        if e.op != '+':
+            return f"({left} {e.op} {right})", e.op in _NOT_STR_OPS
+        if lnum and rnum:
+            return f"({left} + {right})", True
+        if type(e.left) is String or type(e.right) is String:
+            if type(e.left) is not String:
+                left = f"_ms_str({left})"
+            if type(e.right) is not String:
+                right = f"_ms_str({right})"
+            return f"({left} + {right})", False
+        a, b = self.tmp("a"), self.tmp("b")
+        # même type, hors builder : `+` de Python ; sinon conversion éventuelle en chaîne
+        return (f"({a} + {b} if _ms_type({a} := {left}) is _ms_type({b} := {right}) is not _ms_SB "
+                f"else _ms_add({a}, {b}))"), False
+
+    def comprehension(self, e: Any) -> str:
+        body = [e.expr] if type(e) is ListComp else [e.key, e.value]
+        if e.condition is not None:
+            body.append(e.condition)
+        if e.var_name in self.a.fn_names and self.rebinds(body):
+            raise Unsupported(f"variable de compréhension {e.var_name} visible d'une fonction")
+        it = f"_ms_comp_iter({self.expr(e.iterable)[0]})"
+        prefix = ""
+        if ":=" in it:  # interdit dans l'itérable d'une compréhension : évalué juste avant
+            tmp = self.tmp("it")
+            prefix, it = f"{tmp} := {it}, ", tmp
+        loop = f" for {pyname(e.var_name)} in {it}"
+        if e.condition is not None:
+            loop += f" if {self.expr(e.condition)[0]}"
+        if type(e) is ListComp:
+            out = f"[{self.expr(e.expr)[0]}{loop}]"
+        else:
+            out = f"{{{self.expr(e.key)[0]}: {self.expr(e.value)[0]}{loop}}}"
+        return f"({prefix}{out})[1]" if prefix else out
+
+    def invariant(self, key: str) -> str:
+        return "_ms_inv_" + "".join(c if c.isalnum() else "_" for c in key)
+
+    def rebinds(self, e: Any) -> bool:
+        """Vrai si évaluer e peut ré-affecter une variable (appel non garanti builtin)."""
+        return any(type(n) is FunctionCall and n.name not in self.safe_calls for n in walk(e))
+
+    # statements
+    def block(self, stmts: List[Any], depth: int, fn: Optional[FunctionDef] = None, in_loop: bool = False) -> None:
+        start = len(self.lines)
+        for s in stmts:
+            self.stmt(s, depth, fn, in_loop)
+        if len(self.lines) == start:
+            self.emit(depth, "pass")
+
+    def stmt(self, s: Any, depth: int, fn: Optional[FunctionDef], in_loop: bool) -> None:
+        t = type(s)
+        if t is Assign:
+            self.assign(s, depth)
+        elif t is PrintStmt:
+            self.emit(depth, f"_ms_print({self.expr(s.expression)[0]})")
+        elif t is IfStmt:
+            self.emit(depth, f"if {self.expr(s.condition)[0]}:")
+            self.block(s.body, depth + 1, fn, in_loop)
+            for cond, body in s.elifs:
+                self.emit(depth, f"elif {self.expr(cond)[0]}:")
+                self.block(body, depth + 1, fn, in_loop)
+            if s.orelse:
+                self.emit(depth, "else:")
+                self.block(s.orelse, depth + 1, fn, in_loop)
+        elif t is WhileStmt:
+            guard = self.tmp("w")
+            self.emit(depth, f"{guard} = 0")
+            self.emit(depth, f"while {self.expr(s.condition)[0]}:")
+            self.block(s.body, depth + 1, fn, True)
+            self.emit(depth + 1, f"{guard} += 1")
+            self.emit(depth + 1, f"if {guard} > {WHILE_GUARD}: _ms_loop_error()")
+        elif t is ForStmt:
+            self.emit(depth, f"for {pyname(s.var_name)} in _ms_iter({self.expr(s.iterable)[0]}):")
+            self.block(s.body, depth + 1, fn, True)
+        elif t is FunctionDef:
+            self.function(s, depth)
+        elif t is Return:
+            self.ret(s, depth, fn, in_loop)
+        elif t is ResetInvariants:
+            if s.keys:
+                self.emit(depth, " = ".join(self.invariant(k) for k in s.keys) + " = _ms_MISS")
+        else:
+            self.emit(depth, self.expr(s)[0])
+
+    def assign(self, s: Assign, depth: int) -> None:
+        value = s.value
+        if type(s.target) is Index:
+            self.emit(depth, f"_ms_setitem({self.expr(value)[0]}, {self.expr(s.target.target)[0]}, "
+                             f"{self.expr(s.target.index)[0]})")
+            return
+        name = pyname(s.target.name)
+        if (type(value) is BinaryOp and value.op == '+' and type(value.left) is Variable
+                and value.left.name == s.target.name and not self.rebinds(value.right)):
+            # `s = s + x` : forme que CPython sait concaténer en place pour les chaînes
+            right, rnum = self.expr(value.right)
+            r = self.tmp("r")
+            self.emit(depth, f"{r} = {right}")
+            if not rnum:
+                self.emit(depth, f"if _ms_type({name}) is _ms_str: "
+                                 f"{name} = {name} + ({r} if _ms_type({r}) is _ms_str else _ms_str({r}))")
+                self.emit(depth, f"elif _ms_type({name}) is _ms_type({r}) is not _ms_SB: {name} = {name} + {r}")
+            else:
+                self.emit(depth, f"if _ms_type({name}) is _ms_type({r}) is not _ms_SB: {name} = {name} + {r}")
+            self.emit(depth, f"else: {name} = _ms_add({name}, {r})")
+            return
+        self.emit(depth, f"{name} = {self.expr(value)[0]}")
+
+    def function(self, s: FunctionDef, depth: int) -> None:
+        scope = self.a.scopes[id(s)]
+        name = pyname(s.name)
+        params = [pyname(p) for p in s.params]
+        tail = self.tail_calls(s)
+        sig = ", ".join(params + (["*", "_ms_self=None"] if tail else []))
+        self.emit(depth, f"def {name}({sig}):")
+        if scope.globals:
+            self.emit(depth + 1, "global " + ", ".join(pyname(n) for n in sorted(scope.globals)))
+        if scope.nonlocals:
+            self.emit(depth + 1, "nonlocal " + ", ".join(pyname(n) for n in sorted(scope.nonlocals)))
+        if tail:
+            self.emit(depth + 1, "while True:")
+            self.block(s.body, depth + 2, s)
+            self.emit(depth + 2, "return None")
+            self.emit(depth, f"{name}.__kwdefaults__ = {{'_ms_self': {name}}}")
+        else:
+            self.block(s.body, depth + 1, s)
+
+    def tail_calls(self, fn: FunctionDef) -> bool:
+        """
+        Appels terminaux `return fn(...)` hors boucle, transformés en saut
+        (cf. TailCallSignal). Pas de transformation si fn définit des
+        fonctions : leurs closures verraient les paramètres ré-affectés.
+        """
+        if any(type(n) is FunctionDef for n in walk(fn.body)):
+            return False
+        pending, found = [(fn.body, False)], False
+        while pending:
+            stmts, in_loop = pending.pop()
+            for s in stmts:
+                t = type(s)
+                if t is Return and not in_loop and self.is_tail(s, fn):
+                    found = True
+                elif t is IfStmt:
+                    pending.append((s.body, in_loop))
+                    pending.extend((body, in_loop) for _cond, body in s.elifs)
+                    pending.append((s.orelse, in_loop))
+                elif t is WhileStmt or t is ForStmt:
+                    pending.append((s.body, True))
+        return found
+
+    @staticmethod
+    def is_tail(s: Return, fn: FunctionDef) -> bool:
+        v = s.value
+        return type(v) is FunctionCall and v.name == fn.name and len(v.args) == len(fn.params)
+
+    def ret(self, s: Return, depth: int, fn: Optional[FunctionDef], in_loop: bool) -> None:
+        if s.value is None:
+            self.emit(depth, "return None")
+            return
+        call = s.value
+        if fn is not None and in_loop and self.is_tail(s, fn):
+            # l'Evaluator l'élimine (TailCallSignal) ; un `continue` ne sortirait que de la boucle
+            raise Unsupported(f"appel terminal de {fn.name} dans une boucle")
+        if fn is not None and not in_loop and self.is_tail(s, fn) and self.tail_calls(fn):
+            name = pyname(call.name)
+            args = [self.expr(a)[0] for a in call.args]
+            self.emit(depth, f"if {name} is _ms_self:")
+            if args:
+                params = [pyname(p) for p in fn.params]
+                self.emit(depth + 1, f"{', '.join(params)}, = ({', '.join(args)},)")
+            self.emit(depth + 1, "continue")
+            self.emit(depth, f"return {name}({', '.join(args)})")
+            return
+        self.emit(depth, f"return {self.expr(call)[0]}")
+
+
+def transpile(program: Program, predefined: Optional[Set[str]] = None) -> str:
+    """
+    Source Python équivalent à `program`. `predefined` : noms déjà liés dans
+    le global avant l'exécution. Lève Unsupported hors du sous-ensemble compilable.
+    """
+    predefined = set(predefined or ())
+    emitter = _Emitter(_Analysis(program, predefined), predefined)
+    emitter.block(program.statements, 0)
+    return "\n".join(emitter.lines) + "\n"
+
+
+def compile_program(program: Program, predefined: Optional[Set[str]] = None) -> Any:
+    """
+    Code object de `program`, mis en cache sur le programme (refus compris)
+    et par source Python : deux parsings du même script partagent le code.
+    """
+    key = frozenset(predefined or ())
+    cached = program.__dict__.get("py_code")
+    if cached is not None and cached[0] == key:
+        if isinstance(cached[1], Unsupported):
+            raise cached[1]
+        return cached[1]
+    try:
+        source = transpile(program, set(key))
+    except Unsupported as ex:
+        program.py_code = (key, ex)
+        raise
+    code = _CODE_CACHE.get(source)
+    if code is None:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", SyntaxWarning)  # `5[0]` : l'erreur viendra à l'exécution
+            code = compile(source, FILENAME, "exec")
+        if len(_CODE_CACHE) >= _CODE_CACHE_MAX:
+            _CODE_CACHE.clear()
+        _CODE_CACHE[source] = code
+    program.py_code = (key, code)
+    return code
+
+
+def _translate(ex: BaseException, filename: str) -> Optional[BaseException]:
+    """
+    Erreur qu'aurait levée l'Evaluator pour une exception du code généré
+    lui-même (indexation, appel d'une valeur, nom non défini) ; None si elle
+    vient d'ailleurs.
+    """
+    tb = ex.__traceback__
+    while tb is not None and tb.tb_next is not None:
+        tb = tb.tb_next
+    if tb is None or tb.tb_frame.f_code.co_filename != FILENAME:
+        return None
+    op = dis.opname[tb.tb_frame.f_code.co_code[tb.tb_lasti]]
+    if op == "BINARY_SUBSCR":
+        return RuntimeErrorMS(f"Indexation invalide: {ex}", filename=filename)
+    if op.startswith("CALL") and isinstance(ex, TypeError) and "not callable" in str(ex):
+        return RuntimeErrorMS(f"Objet appelable inconnu: {_callee(tb.tb_frame, tb.tb_lasti)}", filename=filename)
+    if isinstance(ex, NameError):
+        name = getattr(ex, "name", None)
+        if name is None:  # UnboundLocalError : nom seulement dans le message
+            m = re.search(r"'([^']+)'", str(ex))
+            name = m.group(1) if m else "?"
+        return NameError(f"Variable non définie : {msname(name)}")
+    return None
+
+
+def _callee(frame: Any, lasti: int) -> Any:
+    """
+    Valeur appelée par l'instruction `lasti` de `frame` : un appel MicroScript
+    est toujours `nom(...)`, le nom est chargé par l'instruction qui commence
+    au même endroit du source généré.
+    """
+    start = None
+    for ins in dis.get_instructions(frame.f_code):
+        if ins.offset == lasti:
+            start = ins.positions[:3:2]  # (ligne, colonne)
+            break
+    for ins in dis.get_instructions(frame.f_code):
+        if ins.opname.startswith("LOAD_") and ins.positions[:3:2] == start and type(ins.argval) is str:
+            for ns in (frame.f_locals, frame.f_globals, frame.f_builtins):
+                if ins.argval in ns:
+                    return ns[ins.argval]
+    return "?"
+
+
+class CompiledEvaluator:
+    """
+    Moteur par compilation, interchangeable avec Evaluator pour eval(Program).
+    Les autres nœuds, et les programmes non compilables, passent par un
+    Evaluator interne ; `fallback` en donne la raison.
+    """
+    def __init__(self, runtime: Runtime):
+        self.rt = runtime
+        self.tree = Evaluator(runtime)
+        self.fallback: Optional[str] = None
+        self.compiled_runs = 0
+
+    def _watch_call_sites(self, program: Program) -> None:
+        self.tree._watch_call_sites(program)
+
+    def profile_stats(self) -> dict:
+        stats = self.tree.profile_stats()
+        stats["compiled"] = {"runs": self.compiled_runs, "fallback": self.fallback}
+        return stats
+
+    def eval(self, node: Any) -> Any:
+        rt = self.rt
+        if type(node) is not Program:
+            return self.tree.eval(node)
+        if "before_stmt" in vars(rt) or len(rt.breakpoints):
+            self.fallback = "hooks par statement actifs"
+            return self.tree.eval(node)
+        if rt.cow is not None:
+            self.fallback = "global en copie-sur-écriture (snapshot)"
+            return self.tree.eval(node)
+        bindings = rt.global_env.bindings
+        try:
+            code = compile_program(node, set(bindings))
+        except Unsupported as ex:
+            self.fallback = str(ex)
+            return self.tree.eval(node)
+
+        scope = {pyname(k): v for k, v in bindings.items()}
+        scope.update(HELPERS)
+        scope["__builtins__"] = _BUILTINS
+        self.compiled_runs += 1
+        try:
+            exec(code, scope)
+        except Exception as ex:
+            err = _translate(ex, rt.filename)
+            if err is None:
+                raise
+            raise err from None
+        finally:
+            bindings.update({msname(k): v for k, v in scope.items()
+                             if k != "__builtins__" and not (k.startswith("_ms_") and not k.startswith("_ms_kw_"))})
+        return None
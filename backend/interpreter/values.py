@@ -0,0 +1,99 @@
+# backend/interpreter/values.py
+
+from typing import Any, Dict, List, Optional
+
+
+class StringBuilder:
+    """
+    Chaîne construite par morceaux : les ajouts sont en O(1) amorti et la
+    concaténation réelle n'a lieu qu'à la lecture (str, len, indexation).
+
+    `implicit` marque les builders créés par l'évaluateur pour le motif
+    `s = s + x` : ils restent cachés dans le binding et sont aplatis dès
+    qu'on lit la variable, ce qui évite tout aliasing visible.
+    """
+    __slots__ = ("_chunks", "_size", "implicit")
+
+    def __init__(self, initial: Any = "", implicit: bool = False):
+        s = str(initial)
+        self._chunks: List[str] = [s] if s else []
+        self._size = len(s)
+        self.implicit = implicit
+
+    def append(self, value: Any) -> "StringBuilder":
+        s = value if type(value) is str else str(value)
+        if s:
+            self._chunks.append(s)
+            self._size += len(s)
+        return self
+
+    def __str__(self) -> str:
+        chunks = self._chunks
+        if len(chunks) > 1:
+            flat = "".join(chunks)
+            self._chunks = [flat]
+            return flat
+        return chunks[0] if chunks else ""
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, idx):
+        return str(self)[idx]
+
+    def __iter__(self):
+        return iter(str(self))
+
+    def __eq__(self, other):
+        if isinstance(other, (str, StringBuilder)):
+            return str(self) == str(other)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(str(self))
+
+    def __add__(self, other):
+        return str(self) + str(other)
+
+    def __radd__(self, other):
+        return str(other) + str(self)
+
+    def __repr__(self):
+        return repr(str(self))
+
+
+def flatten(value: Any) -> Any:
+    """Remplace un StringBuilder par sa chaîne (snapshots, sérialisation)."""
+    return str(value) if type(value) is StringBuilder else value
+
+
+MUTABLE_TYPES = frozenset((list, dict, StringBuilder))
+
+
+def cow_copy(value: Any, memo: Optional[Dict[int, Any]] = None) -> Any:
+    """
+    Copie profonde des listes, dicts et builders (cycles compris) ; les
+    autres valeurs, immuables ou fonctions, sont partagées telles quelles.
+    """
+    t = type(value)
+    if t not in MUTABLE_TYPES:
+        return value
+    if memo is None:
+        memo = {}
+    done = memo.get(id(value))
+    if done is not None:
+        return done
+    if t is StringBuilder:
+        out = StringBuilder(value, implicit=value.implicit)
+        memo[id(value)] = out
+        return out
+    if t is list:
+        out = []
+        memo[id(value)] = out
+        out.extend(cow_copy(v, memo) for v in value)
+        return out
+    out = {}
+    memo[id(value)] = out
+    for k, v in value.items():
+        out[k] = cow_copy(v, memo)
+    return out
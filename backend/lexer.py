@@ -31,18 +31,64 @@ KEYWORDS = {
     'for', 'while', 'in',
     'print', 'range',
     'def', 'return',
+    'import',
     'true', 'false'
 }
 
+class Tokens(list):
+    """Liste de tokens ; `lines[i]` est la ligne source (à partir de 1) du i-ème token."""
+    __slots__ = ("lines",)
+
+
 def lexer(code):
-    """Transforme le texte source en une liste de tokens."""
-    tokens = []
+    """Transforme le texte source en une liste de tokens.
+
+    Les sauts de ligne et l'indentation ne produisent des tokens NEWLINE /
+    INDENT / DEDENT qu'en dehors des parenthèses, crochets et accolades.
+    """
+    tokens = Tokens()
+    lines = tokens.lines = []
+    line = 1           # ligne courante
     tok_regex = '|'.join(f'(?P<{name}>{regex})' for name, regex in TOKEN_SPEC)
+    indents = [0]      # pile des niveaux d'indentation ouverts
+    depth = 0          # profondeur de parenthésage
+    line_start = True  # aucun token significatif depuis le dernier saut de ligne
+    width = 0          # indentation de la ligne courante
 
     for mo in re.finditer(tok_regex, code):
         kind = mo.lastgroup
         value = mo.group()
 
+        if kind == 'SKIP':
+            if line_start:
+                width += len(value.expandtabs(4))
+            continue
+
+        elif kind == 'COMMENT':
+            continue
+
+        elif kind == 'NEWLINE':
+            if not line_start and depth == 0:
+                tokens.append(('NEWLINE', '\n'))
+                lines.append(line)
+                line_start = True
+            line += 1
+            width = 0
+            continue
+
+        if line_start and depth == 0:
+            if width > indents[-1]:
+                indents.append(width)
+                tokens.append(('INDENT', width))
+                lines.append(line)
+            while width < indents[-1]:
+                indents.pop()
+                tokens.append(('DEDENT', width))
+                lines.append(line)
+            if width != indents[-1]:
+                raise SyntaxError("Indentation incohérente")
+        line_start = False
+
         if kind == 'NUMBER':
             tokens.append(('NUMBER', float(value) if '.' in value else int(value)))
 
@@ -60,16 +106,21 @@ def lexer(code):
             tokens.append(('OP', value))
 
         elif kind in ('LPAREN', 'RPAREN', 'LBRACKET', 'RBRACKET', 'LBRACE', 'RBRACE', 'DOT', 'COLON', 'COMMA'):
+            if kind in ('LPAREN', 'LBRACKET', 'LBRACE'):
+                depth += 1
+            elif kind in ('RPAREN', 'RBRACKET', 'RBRACE') and depth > 0:
+                depth -= 1
             tokens.append((kind, value))
 
-        elif kind == 'COMMENT':
-            continue
-
-        elif kind in ('NEWLINE', 'SKIP'):
-            continue
-
         elif kind == 'MISMATCH':
             raise SyntaxError(f"Caractère inconnu: {value}")
-    
+
+        lines.append(line)
+
+    while len(indents) > 1:
+        indents.pop()
+        tokens.append(('DEDENT', 0))
+        lines.append(line)
     tokens.append(('EOF', None))  # Fin de fichier
+    lines.append(line)
     return tokens
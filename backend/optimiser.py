@@ -0,0 +1,541 @@
+# backend/optimiser.py
+"""
+Passe d'optimisation sur l'AST (backend.ast_nodes), avant l'évaluation d'un
+programme complet :
+
+- pliage des constantes et élimination du code mort : branches `if`/`elif`
+  et `while` à condition constante, statements après un `return` ;
+- suppression des FunctionDef jamais référencées et des affectations dont
+  la variable n'est jamais lue et dont la valeur ne peut pas échouer
+  (littéral, résultat d'un pliage, nom lié avant sur tous les chemins) ;
+- mise en cache des sous-expressions pures invariantes des boucles
+  while/for : évaluées au premier passage (même ordre, mêmes erreurs que
+  sans optimisation), puis relues à chaque itération.
+
+Les noms sont analysés globalement : un nom lu n'importe où est « utilisé »,
+ce qui reste prudent face aux portées dynamiques de MicroScript. La passe
+suppose donc le programme complet (pas les lignes d'un REPL).
+
+Les effets des builtins viennent de stdlib.EFFECTS : print, push, random...
+ne sont jamais supprimés ni déplacés.
+"""
+from collections import Counter
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from backend.ast_nodes import (
+    Program, Number, String, Bool, Array, Dict as DictNode, Variable, Assign,
+    BinaryOp, PrintStmt, IfStmt, WhileStmt, ForStmt, FunctionDef, FunctionCall,
+    Return, Index, ListComp, DictComp, LoopInvariant, ResetInvariants, walk
+)
+from backend.interpreter.evaluator import SPECIALISED_OPS
+from backend.interpreter.stdlib import BUILTINS, EFFECTS, SCALAR_BUILTINS
+
+_LITERALS = (Number, String, Bool)
+_FOLD_MAX = 10_000  # taille maximale d'une chaîne ou d'un entier (en chiffres) issu du pliage
+
+
+def optimise(program: Program, module: bool = False) -> Program:
+    """
+    Optimise le programme en place et le renvoie. Un module (`module=True`)
+    exporte ses définitions : elles ne sont pas retirées, même inutilisées.
+    """
+    program.statements = _dce_block(program.statements)
+    while not module and _remove_unused(program):
+        pass
+    _hoist_block(program.statements, _Analysis(program), [0])
+    return program
+
+
+# --- constantes -------------------------------------------------------------
+
+def _literal(node: Any) -> Tuple[bool, Any]:
+    t = type(node)
+    if t is Number or t is Bool:
+        return True, node.value
+    if t is String:
+        v = node.value
+        if isinstance(v, str) and len(v) >= 2 and v[0] == '"' and v[-1] == '"':
+            v = v[1:-1]
+        return True, v
+    return False, None
+
+
+def _make_literal(value: Any) -> Optional[Any]:
+    t = type(value)
+    if t is bool:
+        return Bool(value)
+    if t is int:
+        return Number(value) if value.bit_length() < _FOLD_MAX * 3 else None
+    if t is float:
+        return Number(value)
+    if t is str and len(value) <= _FOLD_MAX:
+        return String('"' + value + '"')  # guillemets retirés par l'évaluateur
+    return None
+
+
+def _cheap(op: str, left: Any, right: Any) -> bool:
+    """Écarte les pliages dont le calcul lui-même serait coûteux (2 ** 10 ** 9...)."""
+    if op == '**':
+        return abs(right) <= 256
+    if op == '*' and type(left) is str:
+        return right * len(left) <= _FOLD_MAX
+    return True
+
+
+def _fold(e: Any) -> Any:
+    """Plie les sous-expressions constantes (mêmes opérations que l'évaluateur)."""
+    t = type(e)
+    if t is BinaryOp:
+        e.left = _fold(e.left)
+        e.right = _fold(e.right)
+        ok_l, left = _literal(e.left)
+        ok_r, right = _literal(e.right)
+        fn = SPECIALISED_OPS.get((e.op, type(left), type(right))) if ok_l and ok_r else None
+        if fn is not None and _cheap(e.op, left, right):
+            try:
+                folded = _make_literal(fn(left, right))
+            except Exception:
+                folded = None  # l'erreur se produira à l'exécution, si le code est atteint
+            if folded is not None:
+                return folded
+        return e
+    if t is FunctionCall:
+        e.args = [_fold(a) for a in e.args]
+    elif t is Index:
+        e.target = _fold(e.target)
+        e.index = _fold(e.index)
+    elif t is Array:
+        e.elements = [_fold(x) for x in e.elements]
+    elif t is DictNode:
+        e.pairs = [(_fold(k), _fold(v)) for k, v in e.pairs]
+    elif t is ListComp or t is DictComp:
+        e.iterable = _fold(e.iterable)
+        if e.condition is not None:
+            e.condition = _fold(e.condition)
+        if t is ListComp:
+            e.expr = _fold(e.expr)
+        else:
+            e.key = _fold(e.key)
+            e.value = _fold(e.value)
+    return e
+
+
+# --- code mort --------------------------------------------------------------
+
+def _dce_block(stmts: List[Any]) -> List[Any]:
+    out: List[Any] = []
+    for s in stmts:
+        for r in _dce_stmt(s):
+            out.append(r)
+            if type(r) is Return:
+                return out  # la suite du bloc est inatteignable
+    return out
+
+
+def _dce_stmt(s: Any) -> List[Any]:
+    t = type(s)
+    if t is IfStmt:
+        branches = []
+        orelse = s.orelse
+        for cond, body in [(s.condition, s.body)] + list(s.elifs):
+            cond = _fold(cond)
+            known, value = _literal(cond)
+            if not known:
+                branches.append((cond, _dce_block(body)))
+            elif value:
+                orelse = body  # toujours prise : les branches suivantes sont mortes
+                break
+        orelse = _dce_block(orelse)
+        if not branches:
+            return orelse
+        (cond, body), elifs = branches[0], branches[1:]
+        new = IfStmt(cond, body, elifs, orelse)
+        if hasattr(s, "line"):
+            new.line = s.line  # breakpoints et couverture
+        return [new]
+    if t is WhileStmt:
+        s.condition = _fold(s.condition)
+        known, value = _literal(s.condition)
+        if known and not value:
+            return []
+        s.body = _dce_block(s.body)
+        return [s]
+    if t is ForStmt:
+        s.iterable = _fold(s.iterable)
+        s.body = _dce_block(s.body)
+        return [s]
+    if t is FunctionDef:
+        s.body = _dce_block(s.body)
+        return [s]
+    if t is Assign:
+        s.value = _fold(s.value)
+        if type(s.target) is Index:
+            s.target.target = _fold(s.target.target)
+            s.target.index = _fold(s.target.index)
+        return [s]
+    if t is PrintStmt:
+        s.expression = _fold(s.expression)
+        return [s]
+    if t is Return:
+        if s.value is not None:
+            s.value = _fold(s.value)
+        return [s]
+    return [_fold(s)]
+
+
+def _refs(node: Any) -> Counter:
+    """Lectures de noms (variables et appels) dans un sous-arbre."""
+    nodes = list(walk(node))
+    targets = {id(n.target) for n in nodes if type(n) is Assign}
+    return Counter(n.name for n in nodes if type(n) in (Variable, FunctionCall) and id(n) not in targets)
+
+
+def _remove_unused(program: Program) -> bool:
+    """Retire une vague de définitions inutilisées ; True si l'AST a changé."""
+    refs = _refs(program)
+    changed = False
+
+    def keep(s: Any, bound: Set[str]) -> bool:
+        t = type(s)
+        if t is FunctionDef:
+            # les appels récursifs ne comptent pas comme une utilisation
+            return refs[s.name] - _refs(s.body)[s.name] > 0
+        if t is Assign and type(s.target) is Variable:
+            return refs[s.target.name] > 0 or not _safe(s.value, bound)
+        return True
+
+    def sweep(stmts: List[Any], bound: Set[str]) -> List[Any]:
+        """`bound` : noms liés avant le bloc quel que soit le chemin suivi."""
+        nonlocal changed
+        bound = set(bound)
+        out = []
+        for s in stmts:
+            if not keep(s, bound):
+                changed = True
+                continue
+            t = type(s)
+            if t is FunctionDef:
+                # appelée après sa définition : ce qui est lié ici l'est aussi dans son corps
+                s.body = sweep(s.body, bound | {s.name} | set(s.params))
+            elif t is IfStmt:
+                s.body = sweep(s.body, bound)
+                s.elifs = [(c, sweep(b, bound)) for c, b in s.elifs]
+                s.orelse = sweep(s.orelse, bound)
+            elif t is WhileStmt:
+                s.body = sweep(s.body, bound)
+            elif t is ForStmt:
+                s.body = sweep(s.body, bound | {s.var_name})
+            out.append(s)
+            if t is Assign and type(s.target) is Variable:
+                bound.add(s.target.name)
+            elif t is FunctionDef:
+                bound.add(s.name)
+        return out
+
+    program.statements = sweep(program.statements, set(BUILTINS))
+    return changed
+
+
+# --- effets -----------------------------------------------------------------
+
+def _defined_names(node: Any) -> Set[str]:
+    """Noms liés par le script : affectations, paramètres, boucles for, compréhensions, fonctions."""
+    names: Set[str] = set()
+    for n in walk(node):
+        t = type(n)
+        if t is Assign and type(n.target) is Variable:
+            names.add(n.target.name)
+        elif t is ForStmt or t is ListComp or t is DictComp:
+            names.add(n.var_name)
+        elif t is FunctionDef:
+            names.add(n.name)
+            names.update(n.params)
+    return names
+
+
+def _effect(name: str, defined: Set[str]) -> str:
+    if name in defined:
+        return "calls"  # fonction utilisateur (ou builtin masqué) : effet inconnu
+    return EFFECTS.get(name, "calls")
+
+
+def _safe(e: Any, bound: Set[str]) -> bool:
+    """Expression dont l'évaluation ne peut pas lever d'erreur (`bound` : noms sûrement liés)."""
+    t = type(e)
+    if t in _LITERALS:
+        return True
+    if t is Variable:
+        return e.name in bound
+    if t is Array:
+        return all(_safe(x, bound) for x in e.elements)
+    if t is DictNode:
+        # une clé non littérale pourrait ne pas être hachable
+        return all(type(k) in _LITERALS and _safe(v, bound) for k, v in e.pairs)
+    return False
+
+
+def _pure(e: Any, defined: Set[str]) -> bool:
+    t = type(e)
+    if t in _LITERALS or t is Variable:
+        return True
+    if t is BinaryOp:
+        return _pure(e.left, defined) and _pure(e.right, defined)
+    if t is Index:
+        return _pure(e.target, defined) and _pure(e.index, defined)
+    if t is Array:
+        return all(_pure(x, defined) for x in e.elements)
+    if t is DictNode:
+        return all(_pure(k, defined) and _pure(v, defined) for k, v in e.pairs)
+    if t is FunctionCall:
+        return _effect(e.name, defined) == "pure" and all(_pure(a, defined) for a in e.args)
+    if t is LoopInvariant:
+        return _pure(e.expr, defined)
+    return False
+
+
+class _Analysis:
+    """
+    Faits globaux pour les invariants de boucle :
+    - `scalar` : noms qui ne contiennent jamais qu'un nombre, une chaîne ou un booléen ;
+    - `private` : noms dont le conteneur n'est accessible que par ce nom (créé par
+      un littéral, jamais copié dans une autre variable, un conteneur, un argument
+      ou un return) : le muter ne peut rien changer d'autre.
+    """
+    def __init__(self, program: Program):
+        self.defined = _defined_names(program)
+        self.bound: Set[str] = set()
+        self.assigned: Dict[str, List[Any]] = {}
+        self.escapes: Set[str] = set()
+        for n in walk(program):
+            t = type(n)
+            if t is ForStmt or t is ListComp or t is DictComp:
+                self.bound.add(n.var_name)
+            elif t is FunctionDef:
+                self.bound.add(n.name)
+                self.bound.update(n.params)
+            elif t is Assign and type(n.target) is Variable:
+                self.assigned.setdefault(n.target.name, []).append(n.value)
+        self._scan_block(program.statements)
+
+        candidates = {name for name in self.assigned if name not in self.bound}
+        self.scalar = set(candidates)
+        changed = True
+        while changed:  # plus grand point fixe
+            changed = False
+            for name in list(self.scalar):
+                if not all(self.is_scalar(v) for v in self.assigned[name]):
+                    self.scalar.discard(name)
+                    changed = True
+        self.private = {
+            name for name in candidates - self.escapes
+            if all(type(v) in (Array, DictNode) or self.is_scalar(v) for v in self.assigned[name])
+        }
+
+    def is_scalar(self, e: Any) -> bool:
+        t = type(e)
+        if t in _LITERALS:
+            return True
+        if t is Variable:
+            return e.name in self.scalar
+        if t is BinaryOp:
+            if e.op in ('+', '*'):  # seuls opérateurs qui fabriquent aussi des listes
+                return self.is_scalar(e.left) and self.is_scalar(e.right)
+            return True  # comparaisons, arithmétique : nombre, chaîne ou erreur
+        if t is FunctionCall:
+            return e.name in SCALAR_BUILTINS and e.name not in self.defined
+        if t is LoopInvariant:
+            return self.is_scalar(e.expr)
+        return False
+
+    # un nom « s'échappe » dès que sa valeur peut devenir accessible autrement
+    def _scan_expr(self, e: Any, escaping: bool, discarded: bool = False) -> None:
+        t = type(e)
+        if t is Variable:
+            if escaping:
+                self.escapes.add(e.name)
+        elif t is BinaryOp:
+            self._scan_expr(e.left, False)
+            self._scan_expr(e.right, False)
+        elif t is Index:
+            self._scan_expr(e.target, False)
+            self._scan_expr(e.index, False)
+        elif t is Array:
+            for x in e.elements:
+                self._scan_expr(x, True)
+        elif t is DictNode:
+            for k, v in e.pairs:
+                self._scan_expr(k, True)
+                self._scan_expr(v, True)
+        elif t is ListComp or t is DictComp:
+            self._scan_expr(e.iterable, False)
+            if e.condition is not None:
+                self._scan_expr(e.condition, False)
+            for x in ([e.expr] if t is ListComp else [e.key, e.value]):
+                self._scan_expr(x, True)
+        elif t is FunctionCall:
+            effect = _effect(e.name, self.defined)
+            for i, a in enumerate(e.args):
+                if effect == "mutates":
+                    # renvoie son premier argument : alias si le résultat est utilisé
+                    self._scan_expr(a, not discarded if i == 0 else True)
+                else:
+                    self._scan_expr(a, not (effect == "io" or e.name in SCALAR_BUILTINS))
+        elif t is LoopInvariant:
+            self._scan_expr(e.expr, escaping)
+
+    def _scan_block(self, stmts: List[Any]) -> None:
+        for s in stmts:
+            t = type(s)
+            if t is Assign:
+                self._scan_expr(s.value, True)
+                if type(s.target) is Index:
+                    self._scan_expr(s.target.target, True)
+                    self._scan_expr(s.target.index, False)
+            elif t is PrintStmt:
+                self._scan_expr(s.expression, False)
+            elif t is IfStmt:
+                self._scan_expr(s.condition, False)
+                self._scan_block(s.body)
+                for cond, body in s.elifs:
+                    self._scan_expr(cond, False)
+                    self._scan_block(body)
+                self._scan_block(s.orelse)
+            elif t is WhileStmt:
+                self._scan_expr(s.condition, False)
+                self._scan_block(s.body)
+            elif t is ForStmt:
+                self._scan_expr(s.iterable, False)
+                self._scan_block(s.body)
+            elif t is FunctionDef:
+                self._scan_block(s.body)
+            elif t is Return:
+                if s.value is not None:
+                    self._scan_expr(s.value, True)
+            else:
+                self._scan_expr(s, False, discarded=True)
+
+
+# --- invariants de boucle ---------------------------------------------------
+
+def _variant_names(loop: Any, info: _Analysis) -> Optional[Set[str]]:
+    """
+    Noms modifiés pendant la boucle (affectés ou mutés), ou None si la boucle
+    contient un effet impossible à suivre (fonction utilisateur, mutation
+    d'un conteneur partagé, def imbriquée).
+    """
+    names: Set[str] = set()
+    if type(loop) is ForStmt:
+        names.add(loop.var_name)
+    for n in walk(loop.body if type(loop) is ForStmt else [loop.condition, loop.body]):
+        t = type(n)
+        if t is FunctionDef:
+            return None
+        if t is ForStmt or t is ListComp or t is DictComp:
+            names.add(n.var_name)
+        elif t is Assign:
+            if type(n.target) is not Variable:
+                return None
+            names.add(n.target.name)
+        elif t is FunctionCall:
+            effect = _effect(n.name, info.defined)
+            if effect == "calls":
+                return None
+            if effect == "mutates":
+                target = n.args[0] if n.args else None
+                if type(target) is not Variable or target.name not in info.private:
+                    return None
+                names.add(target.name)
+    return names
+
+
+def _hoist_block(stmts: List[Any], info: _Analysis, counter: List[int]) -> None:
+    for s in stmts:
+        t = type(s)
+        if t is IfStmt:
+            _hoist_block(s.body, info, counter)
+            for _, body in s.elifs:
+                _hoist_block(body, info, counter)
+            _hoist_block(s.orelse, info, counter)
+        elif t is FunctionDef:
+            _hoist_block(s.body, info, counter)
+        elif t is WhileStmt or t is ForStmt:
+            _hoist_block(s.body, info, counter)  # boucles internes d'abord
+            _hoist_loop(s, info, counter)
+    # les ResetInvariants insérés encadrent leur boucle : le cache ne lui survit pas
+    i = 0
+    while i < len(stmts):
+        keys = getattr(stmts[i], "invariant_keys", None)
+        if keys:
+            del stmts[i].invariant_keys
+            stmts.insert(i + 1, ResetInvariants(keys))
+            stmts.insert(i, ResetInvariants(keys))
+            i += 2
+        i += 1
+
+
+def _hoist_loop(loop: Any, info: _Analysis, counter: List[int]) -> None:
+    variant = _variant_names(loop, info)
+    if variant is None:
+        return
+    keys: Dict[str, str] = {}  # repr de l'expression -> clé
+
+    def invariant(e: Any) -> bool:
+        if type(e) not in (BinaryOp, FunctionCall, LoopInvariant):
+            return False  # rien à gagner sur une variable ou un littéral
+        if not (_pure(e, info.defined) and info.is_scalar(e)):
+            return False
+        return not any(type(n) is Variable and n.name in variant for n in walk(e))
+
+    def rewrite(e: Any) -> Any:
+        if invariant(e):
+            k = repr(e)
+            if k not in keys:
+                keys[k] = f"#inv{counter[0]}"
+                counter[0] += 1
+            return LoopInvariant(keys[k], e)
+        t = type(e)
+        if t is BinaryOp:
+            e.left, e.right = rewrite(e.left), rewrite(e.right)
+        elif t is Index:
+            e.target, e.index = rewrite(e.target), rewrite(e.index)
+        elif t is FunctionCall:
+            e.args = [rewrite(a) for a in e.args]
+        elif t is Array:
+            e.elements = [rewrite(x) for x in e.elements]
+        elif t is DictNode:
+            e.pairs = [(rewrite(k), rewrite(v)) for k, v in e.pairs]
+        elif t is ListComp or t is DictComp:
+            e.iterable = rewrite(e.iterable)  # évalué une fois, hors de la portée de la variable
+        return e
+
+    def rewrite_block(stmts: List[Any]) -> None:
+        for i, s in enumerate(stmts):
+            t = type(s)
+            if t is Assign:
+                s.value = rewrite(s.value)
+            elif t is PrintStmt:
+                s.expression = rewrite(s.expression)
+            elif t is Return:
+                if s.value is not None:
+                    s.value = rewrite(s.value)
+            elif t is IfStmt:
+                s.condition = rewrite(s.condition)
+                rewrite_block(s.body)
+                s.elifs = [(rewrite(c), b) for c, b in s.elifs]
+                for _, b in s.elifs:
+                    rewrite_block(b)
+                rewrite_block(s.orelse)
+            elif t is WhileStmt:
+                s.condition = rewrite(s.condition)
+                rewrite_block(s.body)
+            elif t is ForStmt:
+                s.iterable = rewrite(s.iterable)
+                rewrite_block(s.body)
+            elif t is not ResetInvariants:
+                stmts[i] = rewrite(s)
+
+    if type(loop) is WhileStmt:
+        loop.condition = rewrite(loop.condition)
+    rewrite_block(loop.body)
+    if keys:
+        loop.invariant_keys = sorted(keys.values())
@@ -1,12 +1,40 @@
 from backend.ast_nodes import (
     Number, Variable, BinaryOp, Assign, PrintStmt, IfStmt, Program,
     WhileStmt, FunctionDef, FunctionCall, Array, String,
-    Bool, Dict, Index, ForStmt, Return
+    Bool, Dict, Index, ForStmt, Return, ImportStmt, ListComp, DictComp
 )
 
+# Types de tokens entiers : la boucle d'expressions compare des entiers
+# plutôt que des chaînes.
+(K_EOF, K_NUMBER, K_STRING, K_ID, K_KEYWORD, K_OP, K_LPAREN, K_RPAREN,
+ K_LBRACKET, K_RBRACKET, K_LBRACE, K_RBRACE, K_COMMA, K_OTHER) = range(14)
+
+TOKEN_KINDS = {
+    'EOF': K_EOF, 'NUMBER': K_NUMBER, 'STRING': K_STRING, 'ID': K_ID,
+    'KEYWORD': K_KEYWORD, 'OP': K_OP, 'LPAREN': K_LPAREN, 'RPAREN': K_RPAREN,
+    'LBRACKET': K_LBRACKET, 'RBRACKET': K_RBRACKET, 'LBRACE': K_LBRACE,
+    'RBRACE': K_RBRACE, 'COMMA': K_COMMA,
+}
+
+# Puissances de liaison (gauche, droite) des opérateurs binaires.
+# Gauche < droite : associatif à gauche ; égales : associatif à droite.
+BINARY_BP = {
+    '>': (10, 11), '<': (10, 11), '==': (10, 11),
+    '!=': (10, 11), '>=': (10, 11), '<=': (10, 11),
+    '+': (20, 21), '-': (20, 21),
+    '*': (30, 31), '/': (30, 31), '//': (30, 31), '%': (30, 31),
+    '**': (40, 40),
+}
+
+
 class Parser:
     def __init__(self, tokens):
+        lines = getattr(tokens, "lines", None)  # lignes source, si les tokens viennent du lexer
+        if not tokens or tokens[-1][0] != 'EOF':
+            tokens = list(tokens) + [('EOF', None)]
         self.tokens = tokens
+        self.lines = lines
+        self.kinds = [TOKEN_KINDS.get(t[0], K_OTHER) for t in tokens]
         self.pos = 0
 
     def current(self):
@@ -33,35 +61,48 @@ class Parser:
 
     def parse(self):
         statements = []
-        while self.current()[0] != 'EOF':
-            if self.current()[0] == 'NEWLINE':
-                self.eat('NEWLINE')
-                continue
-            stmt = self.parse_statement()
-            if stmt:
-                statements.append(stmt)
+        try:
+            while self.current()[0] != 'EOF':
+                if self.current()[0] == 'NEWLINE':
+                    self.eat('NEWLINE')
+                    continue
+                stmt = self.parse_statement()
+                if stmt:
+                    statements.append(stmt)
+        except RecursionError:
+            raise SyntaxError("Expression trop imbriquée")
         return Program(statements)
 
     def parse_block(self):
-        body = []
+        # Bloc sur la même ligne : `if x: print(x)`
+        if self.current()[0] != 'NEWLINE':
+            stmt = self.parse_statement()
+            return [stmt] if stmt else []
+
         while self.current()[0] == 'NEWLINE':
             self.eat('NEWLINE')
+        self.eat('INDENT')
+        body = []
         while self.current()[0] not in ('EOF', 'DEDENT'):
-            if self.current()[0] == 'EOF':
-                break
             if self.current()[0] == 'NEWLINE':
                 self.eat('NEWLINE')
                 continue
             stmt = self.parse_statement()
             if stmt:
                 body.append(stmt)
-            while self.current()[0] == 'NEWLINE':
-                self.eat('NEWLINE')
-            if self.current()[0] in ('EOF', 'DEDENT', 'COLON'):
-                break
+        if self.current()[0] == 'DEDENT':
+            self.eat('DEDENT')
         return body
 
     def parse_statement(self):
+        """Statement suivant, annoté de sa ligne source (`line`) quand elle est connue."""
+        line = self.lines[self.pos] if self.lines and self.pos < len(self.lines) else None
+        stmt = self._statement()
+        if stmt is not None and line is not None:
+            stmt.line = line
+        return stmt
+
+    def _statement(self):
         token_type, value = self.current()
 
         if token_type == 'ID':
@@ -128,7 +169,7 @@ class Parser:
                     params.append(self.eat('ID'))
             self.eat('RPAREN')
             self.eat('COLON')
-            body = [self.parse_statement()]
+            body = self.parse_block()
             return FunctionDef(name, params, body)
 
         elif token_type == 'KEYWORD' and value == 'return':
@@ -138,111 +179,98 @@ class Parser:
             val = self.parse_expression()
             return Return(val)
 
+        elif token_type == 'KEYWORD' and value == 'import':
+            self.eat('KEYWORD')
+            return ImportStmt(self.eat('ID'))
+
         else:
             expr = self.parse_expression()
             return expr
 
-    def parse_expression(self):
-        return self.parse_comparison()
-
-    def parse_comparison(self):
-        left = self.parse_add()
-        while self.current()[0] == 'OP' and self.current()[1] in ('>', '<', '==', '!=', '>=', '<='):
-            op = self.eat('OP')
-            right = self.parse_add()
-            left = BinaryOp(left, op, right)
-        return left
-
-    def parse_add(self):
-        left = self.parse_mul()
-        while self.current()[0] == 'OP' and self.current()[1] in ('+', '-'):
-            op = self.eat('OP')
-            right = self.parse_mul()
-            left = BinaryOp(left, op, right)
-        return left
-
-    def parse_mul(self):
-        left = self.parse_power()
-        while self.current()[0] == 'OP' and self.current()[1] in ('*', '/', '//', '%'):
-            op = self.eat('OP')
-            right = self.parse_power()
-            left = BinaryOp(left, op, right)
-        return left
-
-    def parse_power(self):
-        left = self.parse_unary()
-        if self.current()[0] == 'OP' and self.current()[1] == '**':
-            op = self.eat('OP')
-            right = self.parse_power()  # droite-associatif
+    def parse_expression(self, min_bp=0):
+        """Expression par précédence (Pratt) : une boucle par niveau d'imbrication."""
+        tokens = self.tokens
+        kinds = self.kinds
+        left = self.parse_prefix()
+        while kinds[self.pos] == K_OP:
+            op = tokens[self.pos][1]
+            bp = BINARY_BP.get(op)
+            if bp is None or bp[0] < min_bp:
+                break
+            self.pos += 1
+            right = self.parse_expression(bp[1])
             left = BinaryOp(left, op, right)
         return left
 
-    def parse_unary(self):
-        if self.current()[0] == 'OP' and self.current()[1] in ('+', '-'):
-            op = self.eat('OP')
-            expr = self.parse_unary()
-            if op == '+':
-                return BinaryOp(Number(0), '+', expr)
-            else:
-                return BinaryOp(Number(0), '-', expr)
-        return self.parse_postfix()
-
-    def parse_postfix(self):
+    def parse_prefix(self):
+        # + / - unaires : lient plus fort que tout opérateur binaire
+        if self.kinds[self.pos] == K_OP:
+            op = self.tokens[self.pos][1]
+            if op == '+' or op == '-':
+                self.pos += 1
+                return BinaryOp(Number(0), op, self.parse_prefix())
         node = self.parse_atom()
-        while True:
-            tok_type, tok_val = self.current()
-            if tok_type == 'LBRACKET':
-                self.eat('LBRACKET')
-                idx = self.parse_expression()
-                self.eat('RBRACKET')
-                node = Index(node, idx)
-                continue
-            else:
-                break
+        while self.kinds[self.pos] == K_LBRACKET:
+            self.pos += 1
+            idx = self.parse_expression()
+            self.eat('RBRACKET')
+            node = Index(node, idx)
         return node
 
     def parse_atom(self):
-        token_type, value = self.current()
+        token_type, value = self.tokens[self.pos]
+        kind = self.kinds[self.pos]
 
-        if token_type == 'NUMBER':
-            self.eat('NUMBER')
+        if kind == K_NUMBER:
+            self.pos += 1
             return Number(value)
 
-        elif token_type == 'STRING':
-            self.eat('STRING')
+        elif kind == K_STRING:
+            self.pos += 1
             return String(value)
 
-        elif token_type == 'KEYWORD' and value in ('true', 'false'):
-            self.eat('KEYWORD')
+        elif kind == K_ID:
+            if self.kinds[self.pos + 1] == K_LPAREN:
+                return self.parse_function_call()
+            self.pos += 1
+            return Variable(value)
+
+        elif kind == K_KEYWORD and value in ('true', 'false'):
+            self.pos += 1
             return Bool(True if value == 'true' else False)
 
-        elif token_type == 'ID':
-            if self.peek()[0] == 'LPAREN':
-                return self.parse_function_call()
-            name = self.eat('ID')
-            return Variable(name)
+        elif kind == K_KEYWORD and value == 'range' and self.kinds[self.pos + 1] == K_LPAREN:
+            return self.parse_function_call()
 
-        elif token_type == 'LBRACKET':
-            self.eat('LBRACKET')
+        elif kind == K_LBRACKET:
+            self.pos += 1
             elements = []
-            if self.current()[0] != 'RBRACKET':
+            if self.kinds[self.pos] != K_RBRACKET:
                 elements.append(self.parse_expression())
-                while self.current()[0] == 'COMMA':
-                    self.eat('COMMA')
+                if self._at_keyword('for'):
+                    var_name, iterable, condition = self.parse_comprehension()
+                    self.eat('RBRACKET')
+                    return ListComp(elements[0], var_name, iterable, condition)
+                while self.kinds[self.pos] == K_COMMA:
+                    self.pos += 1
                     elements.append(self.parse_expression())
             self.eat('RBRACKET')
             return Array(elements)
 
-        elif token_type == 'LBRACE':
-            self.eat('LBRACE')
+        elif kind == K_LBRACE:
+            self.pos += 1
             pairs = []
-            if self.current()[0] != 'RBRACE':
+            if self.kinds[self.pos] != K_RBRACE:
                 k = self.parse_expression()
                 self.eat('COLON')
                 v = self.parse_expression()
+                if self._at_keyword('for'):
+                    var_name, iterable, condition = self.parse_comprehension()
+                    self.eat('RBRACE')
+                    return DictComp(k, v, var_name, iterable, condition)
                 pairs.append((k, v))
-                while self.current()[0] == 'COMMA':
-                    self.eat('COMMA')
+                while self.kinds[self.pos] == K_COMMA:
+                    self.pos += 1
                     k = self.parse_expression()
                     self.eat('COLON')
                     v = self.parse_expression()
@@ -250,8 +278,8 @@ class Parser:
             self.eat('RBRACE')
             return Dict(pairs)
 
-        elif token_type == 'LPAREN':
-            self.eat('LPAREN')
+        elif kind == K_LPAREN:
+            self.pos += 1
             expr = self.parse_expression()
             self.eat('RPAREN')
             return expr
@@ -259,14 +287,34 @@ class Parser:
         else:
             raise SyntaxError(f"Facteur inattendu : {token_type}")
 
+    def _at_keyword(self, word):
+        return self.kinds[self.pos] == K_KEYWORD and self.tokens[self.pos][1] == word
+
+    def parse_comprehension(self):
+        """`for var in iterable [if condition]`, après le premier élément d'une liste ou d'un dict."""
+        self.eat('KEYWORD')  # for
+        var_name = self.eat('ID')
+        self.eat_specific('KEYWORD', 'in')
+        iterable = self.parse_expression()
+        condition = None
+        if self._at_keyword('if'):
+            self.pos += 1
+            condition = self.parse_expression()
+        return var_name, iterable, condition
+
     def parse_function_call(self):
-        name = self.eat('ID')
+        if self._at_keyword('range'):  # mot-clé pour le lexer, builtin ordinaire ici
+            self.pos += 1
+            name = 'range'
+        else:
+            name = self.eat('ID')
         self.eat('LPAREN')
         args = []
-        if self.current()[0] != 'RPAREN':
+        kinds = self.kinds
+        if kinds[self.pos] != K_RPAREN:
             args.append(self.parse_expression())
-            while self.current()[0] == 'COMMA':
-                self.eat('COMMA')
+            while kinds[self.pos] == K_COMMA:
+                self.pos += 1
                 args.append(self.parse_expression())
         self.eat('RPAREN')
         return FunctionCall(name, args)
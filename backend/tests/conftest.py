@@ -0,0 +1,46 @@
+import io
+import sys
+
+import pytest
+
+from backend.lexer import lexer
+from backend.parser import Parser
+from backend.optimiser import optimise
+from backend.errors import format_error
+from backend.interpreter.runtime import make_runtime
+from backend.interpreter.evaluator import Evaluator
+from backend.interpreter.scheduler import TaskEvaluator
+
+
+class Runner:
+    """
+    Exécute un programme MicroScript et renvoie sa sortie ; une erreur y est
+    ajoutée sous la forme "! Type: message". Le dernier évaluateur utilisé
+    reste accessible (`run.ev`, et son runtime `run.ev.rt`).
+    """
+    def __init__(self):
+        self.ev = None
+
+    def __call__(self, code, engine=Evaluator, optimised=False, rt=None):
+        ast = Parser(lexer(code)).parse()
+        if optimised:
+            optimise(ast)
+        self.ev = ev = engine(rt if rt is not None else make_runtime())
+        old, sys.stdout = sys.stdout, io.StringIO()
+        try:
+            if isinstance(ev, TaskEvaluator):
+                gen = ev.run(ast)
+                for _ in iter(lambda: gen.send(None), None):
+                    pass
+            else:
+                ev.eval(ast)
+            return sys.stdout.getvalue()
+        except Exception as ex:
+            return sys.stdout.getvalue() + f"! {format_error(ex)}"
+        finally:
+            sys.stdout = old
+
+
+@pytest.fixture
+def run():
+    return Runner()
@@ -0,0 +1,55 @@
+from backend.api import app
+from backend.batch import run_batch
+
+
+ITEMS = [
+    {"code": "x = 2\nprint(x * 21)"},
+    {"code": "print(undefined)"},
+    {"code": "x = 2\nprint(x * 21)"},
+    {"code": "x = ("},
+    {"code": "print(\"ok\")"},
+]
+
+
+def _check(results):
+    assert [r["success"] for r in results] == [True, False, True, False, True]
+    assert results[0]["output"].strip() == "42"
+    assert results[2]["output"].strip() == "42"
+    assert results[4]["output"].strip() == "ok"
+    assert "undefined" in results[1]["output"]
+    assert all(r["time_ms"] >= 0 for r in results)
+
+
+def test_run_batch_serial():
+    _check(run_batch(ITEMS, workers=1))
+
+
+def test_run_batch_parallel():
+    _check(run_batch(ITEMS * 4, workers=2)[:5])
+
+
+def test_batch_endpoint():
+    client = app.test_client()
+    res = client.post("/run/batch", json={"items": ITEMS})
+    data = res.get_json()
+    assert res.status_code == 200
+    assert data["success"] is False
+    _check(data["results"])
+
+    bad = client.post("/run/batch", json={"items": "nope"})
+    assert bad.status_code == 400
+
+
+def test_invalid_inputs_fail_only_their_item():
+    items = [
+        {"code": "print(input())", "inputs": 5},
+        {"code": "print(input())", "inputs": "ab"},
+        {"code": "print(input())", "inputs": ["ab"]},
+    ]
+    for workers in (1, 2):
+        results = run_batch(items, workers=workers)
+        assert [r["success"] for r in results] == [False, False, True]
+        assert "inputs" in results[0]["output"]
+        assert results[2]["output"].strip() == "ab"
+    data = app.test_client().post("/run/batch", json={"items": items}).get_json()
+    assert [r["success"] for r in data["results"]] == [False, False, True]
@@ -0,0 +1,72 @@
+import json
+
+from backend.cli import main, read_source
+
+
+SCRIPT = """
+def fib(n):
+    if n < 2:
+        return n
+    return fib(n - 1) + fib(n - 2)
+print(fib(10))
+"""
+
+
+def _script(tmp_path, code=SCRIPT):
+    path = tmp_path / "script.ms"
+    path.write_text(code, encoding="utf-8")
+    return str(path)
+
+
+def test_run_prints_output(tmp_path, capsys):
+    assert main(["run", _script(tmp_path)]) == 0
+    assert capsys.readouterr().out.strip() == "55"
+
+
+def test_crlf_script(tmp_path, capsys):
+    path = tmp_path / "crlf.ms"
+    path.write_bytes(SCRIPT.replace("\n", "\r\n").encode("utf-8"))
+    assert main(["run", str(path)]) == 0
+    assert capsys.readouterr().out.strip() == "55"
+
+
+def test_read_source_decodes_mapping(tmp_path):
+    path = tmp_path / "utf8.ms"
+    path.write_bytes('print("é")\r\n'.encode("utf-8"))
+    assert read_source(str(path)) == 'print("é")\n'
+    path.write_bytes(b"")
+    assert read_source(str(path)) == ""
+
+
+def test_task_engine_matches_tree(tmp_path, capsys):
+    assert main(["run", _script(tmp_path), "--engine", "task"]) == 0
+    assert capsys.readouterr().out.strip() == "55"
+
+
+def test_compiled_engine_matches_tree(tmp_path, capsys):
+    assert main(["run", _script(tmp_path), "--engine", "compiled", "--profile"]) == 0
+    assert capsys.readouterr().out.strip() == "55"
+
+
+def test_bench_json(tmp_path, capsys):
+    out = tmp_path / "timings.json"
+    assert main(["run", _script(tmp_path), "--bench", "3", "--warmup", "0", "--json", str(out)]) == 0
+    report = json.loads(out.read_text(encoding="utf-8"))
+    assert report["runs"] == 3
+    assert set(report["phases_ms"]) == {"lex", "parse", "optimise", "eval", "total"}
+    assert "55" not in capsys.readouterr().out  # sortie du script ignorée en mode bench
+
+
+def test_coverage_accumulates_over_runs(tmp_path, capsys):
+    out = tmp_path / "report.json"
+    assert main(["run", _script(tmp_path), "--coverage", "--bench", "2", "--warmup", "0", "--json", str(out)]) == 0
+    report = json.loads(out.read_text(encoding="utf-8"))["coverage"]
+    assert report["missed"] == [] and report["percent"] == 100.0
+    assert "couverture : 100.0 %" in capsys.readouterr().err
+
+
+def test_budget_limits(tmp_path, capsys):
+    assert main(["run", _script(tmp_path), "--max-steps", "20"]) == 1
+    assert "Budget dépassé" in capsys.readouterr().err
+    assert main(["run", _script(tmp_path), "--max-depth", "3"]) == 1
+    assert "profondeur" in capsys.readouterr().err
@@ -0,0 +1,92 @@
+import pytest
+
+from backend.lexer import lexer
+from backend.parser import Parser
+from backend.ast_nodes import ListComp, DictComp, FunctionCall, walk
+from backend.interpreter.evaluator import Evaluator
+from backend.interpreter.scheduler import TaskEvaluator
+from backend.interpreter.transpiler import CompiledEvaluator, Unsupported, transpile
+from backend.interpreter.debugger import Debugger
+
+ENGINES = [Evaluator, TaskEvaluator, CompiledEvaluator]
+
+
+def test_parse():
+    comp = Parser(lexer("[x * 2 FOR x in range(3) if x > 0]")).parse().statements[0]
+    assert type(comp) is ListComp and comp.var_name == "x"
+    assert type(comp.iterable) is FunctionCall and comp.iterable.name == "range"
+    assert comp.condition is not None
+    comp = Parser(lexer('{k: 1 for k in "ab"}')).parse().statements[0]
+    assert type(comp) is DictComp and comp.condition is None
+    with pytest.raises(SyntaxError):
+        Parser(lexer("[x for x in xs, 1]")).parse()
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_comprehensions(engine, run):
+    code = """xs = [1, 2, 3, 4]
+x = "kept"
+print([x * 10 for x in xs])
+print([x for x in xs if x % 2 == 0])
+print({x: x * x for x in xs if x > 2})
+print([[c + str(y) for c in "ab"] for y in xs][1])
+print(x)
+def scaled(k):
+    return [k * v for v in xs]
+print(scaled(3))
+print([len(w) for w in ["a", "bcd"]])
+print([x for x in 5])
+"""
+    assert run(code, engine) == (
+        "[10, 20, 30, 40]\n[2, 4]\n{3: 9, 4: 16}\n['a2', 'b2']\nkept\n[3, 6, 9, 12]\n[1, 3]\n"
+        "! RuntimeErrorMS: Objet non itérable dans une compréhension"
+    )
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_variable_does_not_leak(engine, run):
+    code = 'def f():\n    return [w + "!" for w in ["a"]]\nprint(f())\nprint([w for w in [1]])\nprint(w)'
+    assert run(code, engine) == "['a!']\n[1]\n! NameError: Variable non définie : w"
+
+
+@pytest.mark.parametrize("engine", [TaskEvaluator, CompiledEvaluator])
+def test_calls_inside_comprehension(engine, run):
+    code = """def slow(n):
+    sleep(0)
+    return n + 1
+print([slow(n) for n in [1, 2] if slow(n) > 2])
+print({slow(n): slow(n * 10) for n in [1]})
+"""
+    assert run(code, engine) == "[3]\n{2: 11}\n"
+
+
+def test_optimised_loop(run):
+    code = """xs = [1, 2, 3]
+total = 0
+i = 0
+while i < 3:
+    ys = [x + i for x in xs if x != i]
+    total = total + sum(ys) + len([k for k in [len(xs) * 2]])
+    i = i + 1
+print(total)
+"""
+    expected = run(code)
+    for engine in ENGINES:
+        assert run(code, engine, optimised=True) == expected
+
+
+def test_compiled_falls_back_when_a_function_sees_the_variable(run):
+    code = "def peek():\n    return x\nprint([peek() for x in [1, 2]])"
+    with pytest.raises(Unsupported):
+        transpile(Parser(lexer(code)).parse())
+    assert run(code, CompiledEvaluator) == run(code) == "[1, 2]\n"
+
+
+def test_debugger_history_restores_scope():
+    dbg = Debugger()
+    dbg.load_program(Parser(lexer("a = [t * 2 for t in [1, 2]]\nprint(a)\n")).parse())
+    dbg.step()
+    state = dbg.step()
+    assert state["variables"] == {"a": [2, 4]}
+    state = dbg.back()
+    assert "t" not in state["variables"]
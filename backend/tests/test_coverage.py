@@ -0,0 +1,103 @@
+import io
+import sys
+
+import pytest
+
+from backend.api import app
+from backend.batch import run_batch
+from backend.lexer import lexer
+from backend.parser import Parser
+from backend.optimiser import optimise
+from backend.interpreter.coverage import Coverage, line_ranges
+from backend.interpreter.runtime import make_runtime
+from backend.interpreter.evaluator import Evaluator
+from backend.interpreter.scheduler import TaskEvaluator
+
+
+CODE = """x = input()
+if x == "a":
+    print("A")
+elif x == "b":
+    print("B")
+else:
+    print("?")
+
+def f(n):
+    if n > 0:
+        return n
+    return 0
+print(f(1))
+"""
+
+
+def cover(code, inputs=(), evaluator=Evaluator, coverage=None):
+    ast = Parser(lexer(code)).parse()
+    rt = make_runtime()
+    cov = rt.cover(ast, coverage)
+    old = sys.stdin, sys.stdout
+    sys.stdin = io.StringIO("".join(f"{v}\n" for v in inputs))
+    sys.stdout = io.StringIO()
+    try:
+        ev = evaluator(rt)
+        if evaluator is Evaluator:
+            ev.eval(ast)
+        else:
+            gen, value = ev.run(ast), None
+            for req in iter(lambda: gen.send(value), None):
+                value = input() if req[0] == "input" else None
+    finally:
+        sys.stdin, sys.stdout = old
+    return cov
+
+
+def test_line_ranges_skip_non_statement_lines():
+    universe = [1, 2, 5, 7, 8, 9]
+    assert line_ranges([1, 2, 5, 8, 9], universe) == [[1, 5], [8, 9]]
+    assert line_ranges([7], universe) == [[7, 7]]
+    assert line_ranges([], universe) == []
+
+
+@pytest.mark.parametrize("evaluator", [Evaluator, TaskEvaluator])
+def test_report(evaluator):
+    report = cover(CODE, ["a"], evaluator).report()
+    assert report["executed"] == [[1, 3], [9, 11], [13, 13]]
+    assert report["missed"] == [[5, 7], [12, 12]]
+    assert report["statements"] == 10
+    assert report["covered"] == 7
+
+
+def test_merge_and_accumulate():
+    merged = cover(CODE, ["a"]).merge(cover(CODE, ["b"]))
+    assert merged.report()["missed"] == [[7, 7], [12, 12]]
+
+    shared = cover(CODE, ["a"])
+    cover(CODE, ["?"], coverage=shared)  # autre AST du même source : même numérotation
+    assert shared.report()["missed"] == [[5, 5], [12, 12]]
+
+    with pytest.raises(ValueError):
+        merged.merge(Coverage(Parser(lexer("print(1)")).parse()))
+
+
+def test_optimised_if_keeps_its_line():
+    ast = Parser(lexer("x = 1\nif x > 2:\n    print(x)\n")).parse()
+    optimise(ast)
+    assert [s.line for s in ast.statements] == [1, 2]
+
+
+def test_run_endpoint():
+    client = app.test_client()
+    data = client.post("/run", json={"code": "x = 1\nif x > 2:\n    print(x)\nprint(y)", "coverage": True}).get_json()
+    assert data["success"] is False
+    assert data["coverage"]["executed"] == [[1, 2], [4, 4]]
+    assert data["coverage"]["missed"] == [[3, 3]]
+    assert "coverage" not in client.post("/run", json={"code": "print(1)"}).get_json()
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_batch_merges_per_source(workers):
+    items = [{"code": CODE, "inputs": [v]} for v in ("a", "b", "a", "b")] + [{"code": "x = ("}]
+    coverage = {}
+    results = run_batch(items, workers=workers, coverage=coverage)
+    assert [r["success"] for r in results] == [True] * 4 + [False]
+    assert list(coverage) == [CODE]
+    assert coverage[CODE].report()["missed"] == [[7, 7], [12, 12]]
@@ -0,0 +1,103 @@
+import threading
+
+import pytest
+
+from backend.api import app
+from backend.lexer import lexer
+from backend.parser import Parser
+from backend.interpreter.debugger import Debugger
+from backend.debug_channel import DebugChannel, StateVersions, coalesce, parse_command
+
+CODE = """i = 0
+s = 0
+while i < 20:
+    s = s + i
+    i = i + 1
+print(s)
+"""
+
+
+def _channel(code=CODE):
+    dbg = Debugger()
+    dbg.load_program(Parser(lexer(code)).parse())
+    return DebugChannel(dbg, dbg.step())
+
+
+def test_parse_command():
+    assert parse_command("step") == ("step", 1)
+    assert parse_command("step 50") == ("step", 50)
+    assert parse_command("Run to line 12") == ("until", 12)
+    assert parse_command("watch x") == ("watch", "x")
+    for bad in ("", "step 0", "step x", "fly", "goto"):
+        with pytest.raises(ValueError):
+            parse_command(bad)
+
+
+def test_coalesce_merges_consecutive_moves():
+    a, b = {}, {}
+    cmds = [("step", 1, [a]), ("step", 2, [b]), ("back", 1, [a]), ("goto", 4, [a]),
+            ("goto", 9, [b]), ("continue", None, [a]), ("continue", None, [b])]
+    assert [c[:2] for c in coalesce(cmds)] == [
+        ("step", 3), ("back", 1), ("goto", 9), ("continue", None), ("continue", None)]
+    assert coalesce(cmds)[0][2] == [a, b]
+
+
+def test_versions_delta_per_variable():
+    v = StateVersions()
+    v.publish({"line": 1, "variables": {"a": 1, "b": 2}})
+    v.publish({"line": 2, "variables": {"a": 1, "b": True}})
+    assert not v.publish({"line": 2, "variables": {"a": 1, "b": True}})
+    v.publish({"line": 2, "variables": {"a": 1}})
+    assert v.version == 3
+    assert v.delta(1) == {"line": 2, "variables": {"set": {}, "unset": ["b"]}}
+    assert v.delta(3) == {}
+    assert v.delta(0) == {"line": 2, "variables": {"set": {"a": 1}, "unset": ["b"]}}
+
+
+def test_pipelined_commands():
+    ch = _channel()
+    reply = ch.send(["step 5", "run to line 6"], since=ch.version)
+    assert reply["delta"]["line"] == 6
+    assert reply["delta"]["variables"]["set"] == {"i": 20, "s": 190}
+    again = ch.send(["watch s"], since=reply["version"])
+    assert again["delta"] == {"watches": ["s"]}
+    assert ch.send([], since=again["version"])["delta"] == {}
+    assert ch.send(["unwatch s", "back 100", "run to line 4", "step 3"])["delta"]["step"] == 6
+
+
+def test_rapid_steps_are_coalesced():
+    ch = _channel()
+    gotos = []
+    goto = ch.debugger.goto
+    ch.debugger.goto = lambda step: gotos.append(step) or goto(step)
+    busy, release = threading.Event(), threading.Event()
+    blocker = threading.Thread(target=ch.call, args=(lambda d: busy.set() or release.wait(5),))
+    blocker.start()
+    busy.wait(5)
+    steppers = [threading.Thread(target=ch.send, args=(["step"],)) for _ in range(3)]
+    for t in steppers:
+        t.start()
+    while len(ch._pending) < 3:
+        threading.Event().wait(0.001)
+    release.set()
+    for t in [blocker] + steppers:
+        t.join(5)
+    assert gotos == [3]
+    assert ch.state["step"] == 3
+
+
+def test_channel_endpoints():
+    client = app.test_client()
+    start = client.post("/debug/start", json={"code": CODE}).get_json()
+    sid, version = start["session_id"], start["version"]
+    res = client.post("/debug/channel", json={"session_id": sid, "commands": ["step 2"], "since": version})
+    data = res.get_json()
+    assert data["delta"]["variables"] == {"set": {"i": 0, "s": 0}, "unset": []}
+    poll = client.get(f"/debug/channel?session_id={sid}&since={data['version']}&timeout=0").get_json()
+    assert poll == {"version": data["version"], "delta": {}}
+    poll = client.get(f"/debug/channel?session_id={sid}&since={version}&timeout=0").get_json()
+    assert poll["delta"]["step"] == 2
+    state = client.get(f"/debug/state?session_id={sid}").get_json()["state"]
+    assert state["step"] == 2
+    assert client.post("/debug/channel", json={"session_id": sid, "commands": ["fly"]}).status_code == 400
+    assert client.get("/debug/channel?session_id=nope").status_code == 400
@@ -0,0 +1,231 @@
+import pytest
+
+from backend.lexer import lexer
+from backend.parser import Parser
+from backend.interpreter.debugger import Debugger
+
+CODE = """
+xs = [1, 2]
+def f(n):
+    t = n * 2
+    push(xs, t)
+    return t
+i = 0
+s = ""
+while i < 5:
+    s = s + str(f(i))
+    i = i + 1
+r = randint(1, 1000000)
+print(s)
+print(xs)
+"""
+
+
+def _debugger(code=CODE, **kwargs):
+    dbg = Debugger(**kwargs)
+    dbg.load_program(Parser(lexer(code)).parse())
+    return dbg
+
+
+def _view(state):
+    """État affiché, sans les bornes de l'historique (qui avancent avec l'exécution)."""
+    return {k: v for k, v in state.items() if k != "history"}
+
+
+def _run_forward(dbg):
+    states = [dbg.step()]
+    while states[-1]["paused"]:
+        states.append(dbg.step())
+    return states
+
+
+def test_step_pauses_between_statements():
+    dbg = _debugger()
+    state = dbg.step()
+    assert state["paused"] and state["step"] == 0 and state["variables"] == {}
+    state = dbg.step()
+    assert state["variables"] == {"xs": [1, 2]}
+    end = dbg.run_to_end()
+    assert not end["paused"] and end["error"] is None
+    assert end["output"] == "02468\n[1, 2, 0, 2, 4, 6, 8]\n"
+
+
+def test_back_and_goto_match_forward_run():
+    dbg = _debugger(interval=4)
+    states = _run_forward(dbg)
+    for k in range(len(states) - 1, -1, -1):
+        assert _view(dbg.goto(k)) == _view(states[k])
+    assert _view(dbg.back()) == _view(states[0])
+    # pas avant dans l'historique : pas de ré-exécution
+    assert _view(dbg.step()) == _view(states[1])
+    assert dbg.history.last == states[-1]["step"]
+
+
+def test_frames_are_rebuilt():
+    dbg = _debugger(interval=3)
+    states = _run_forward(dbg)
+    inside = [s for s in states if s["callstack"]]
+    assert inside and all(s["callstack"][0]["function"] == "f" for s in inside)
+    k = inside[1]["step"]
+    dbg.run_to_end()
+    state = dbg.goto(k)
+    assert _view(state) == _view(inside[1])
+    assert state["variables"]["n"] == state["callstack"][0]["locals"]["n"]
+
+
+def test_callstack_reports_elided_tail_calls():
+    code = """def loop(n):
+    if n == 0:
+        return 0
+    return loop(n - 1)
+loop(5)
+"""
+    dbg = _debugger(code, interval=3)
+    states = _run_forward(dbg)
+    elided = [s["callstack"][0]["elided"] for s in states if s["callstack"]]
+    assert elided[0] == 0 and elided[-1] == 5
+    assert elided == sorted(elided)
+    for s in states:
+        assert _view(dbg.goto(s["step"])) == _view(s)
+
+
+def test_callbacks_do_not_copy_unrelated_containers():
+    code = """big = range(1000)
+out = []
+def inc(x):
+    push(out, x)
+    return x + 1
+i = 0
+while i < 3:
+    ys = map(inc, [i])
+    i = i + 1
+zs = map(pop, [[1, 2]])
+print(out)
+"""
+    dbg = _debugger(code)
+    end = dbg.run_to_end()
+    assert end["output"] == "[0, 1, 2]\n"
+    entries = [e for seg in dbg.history.segments for step in seg.writes for e in step]
+    # l'affectation, puis map(pop, ...) : un builtin mutant en callback échappe au journal
+    assert sum(e[0] == "set" and e[2] == "big" for e in entries) == 2
+    for s in _run_forward(_debugger(code)):
+        assert _view(dbg.goto(s["step"])) == _view(s)
+
+
+def test_budget_bounds_history_and_replay_is_deterministic():
+    dbg = _debugger(interval=4, budget=2)
+    states = _run_forward(dbg)
+    assert len(dbg.history.segments) == 2
+    assert dbg.history.first > 0
+    # étape oubliée : ré-exécution depuis le début avec les mêmes tirages
+    assert _view(dbg.goto(1)) == _view(states[1])
+    assert _view(dbg.run_to_end()) == _view(states[-1])
+    assert states[-1]["variables"]["r"] == dbg.variables()["r"]
+
+
+def test_debug_endpoints():
+    from backend.api import app
+
+    client = app.test_client()
+    res = client.post("/debug/start", json={"code": CODE, "checkpoint_interval": 2})
+    assert res.status_code == 200
+    sid = res.get_json()["session_id"]
+    for _ in range(4):
+        state = client.post("/debug/step", json={"session_id": sid}).get_json()["state"]
+    assert state["step"] == 4
+    back = client.post("/debug/back", json={"session_id": sid}).get_json()["state"]
+    assert back["step"] == 3
+    end = client.post("/debug/continue", json={"session_id": sid}).get_json()["state"]
+    assert end["output"].startswith("02468")
+    res = client.post("/debug/goto", json={"session_id": sid, "step": 2})
+    assert res.get_json()["state"]["step"] == 2
+    state = client.get(f"/debug/state?session_id={sid}").get_json()["state"]
+    assert state["step"] == 2 and state["paused"]
+
+
+def test_watchpoints_stop_on_write_and_mutation():
+    dbg = _debugger(interval=3)
+    dbg.watch("xs")
+    dbg.watch("t")
+    dbg.step()
+    hits = []
+    state = dbg.continue_()
+    while state["paused"]:
+        hits.append([(h["name"], h["function"]) for h in state["watch_hits"]])
+        state = dbg.continue_()
+    assert hits[0] == [("xs", "<global>")]
+    assert hits[1:3] == [[("t", "f")], [("xs", "<global>")]]
+    assert len(hits) == 11
+
+    # même arrêts en rejouant l'historique
+    dbg.goto(0)
+    dbg.unwatch("t")
+    first = dbg.continue_()
+    second = dbg.continue_()
+    assert second["watch_hits"] == [
+        {"name": "xs", "function": "<global>", "old": [1, 2], "new": [1, 2, 0]}
+    ]
+    assert second["step"] > first["step"]
+
+
+def test_watch_endpoints():
+    from backend.api import app
+
+    client = app.test_client()
+    sid = client.post("/debug/start", json={"code": CODE, "watches": ["i"]}).get_json()["session_id"]
+    res = client.post("/debug/watch", json={"session_id": sid, "name": "s"}).get_json()
+    assert res["watches"] == ["i", "s"]
+    state = client.post("/debug/continue", json={"session_id": sid}).get_json()["state"]
+    assert [h["name"] for h in state["watch_hits"]] == ["i"]
+    res = client.post("/debug/unwatch", json={"session_id": sid, "name": "i"}).get_json()
+    assert res["watches"] == ["s"]
+    state = client.post("/debug/continue", json={"session_id": sid}).get_json()["state"]
+    assert state["watch_hits"][0]["name"] == "s"
+
+
+LOOP = """
+total = 0
+i = 0
+while i < 1000:
+    total = total + i
+    i = i + 1
+print(total)
+"""
+
+
+def test_conditional_breakpoint_and_hit_count():
+    dbg = _debugger(LOOP)
+    dbg.set_breakpoints([{"line": 5, "condition": "i == 500"}, {"line": 6, "hit_condition": ">=998"}])
+    state = dbg.continue_()
+    assert state["line"] == 5 and state["variables"]["i"] == 500
+    assert state["breakpoint"]["hits"] == 1
+    state = dbg.continue_()
+    assert state["line"] == 6 and state["variables"]["i"] == 997
+    assert state["breakpoint"]["hits"] == 998
+    assert dbg.continue_()["variables"]["i"] == 998
+
+    # en revenant en arrière, la condition est réévaluée sur l'état reconstruit
+    dbg.goto(0)
+    dbg.set_breakpoints([{"line": 5, "condition": "total > 1000"}])
+    assert dbg.continue_()["variables"] == {"total": 1035, "i": 46}
+
+
+def test_log_points_do_not_stop():
+    dbg = _debugger(LOOP)
+    dbg.set_breakpoints([{"line": 6, "hit_condition": "%400", "log_message": "i={i}, double={i * 2}"}])
+    state = dbg.continue_()
+    assert not state["paused"] and state["output"] == "499500\n"
+    assert [log["message"] for log in state["logs"]] == ["i=399, double=798", "i=799, double=1598"]
+
+
+def test_breakpoint_validation():
+    dbg = _debugger(LOOP)
+    with pytest.raises(ValueError):
+        dbg.set_breakpoints([{"line": 5, "condition": "push([], 1)"}])
+    with pytest.raises(SyntaxError):
+        dbg.set_breakpoints([{"line": 5, "condition": "i =="}])
+    with pytest.raises(ValueError):
+        dbg.set_breakpoints([{"line": 5, "hit_condition": "beaucoup"}])
+    dbg.set_breakpoints([{"line": 5, "condition": "inconnu == 1"}])
+    state = dbg.continue_()
+    assert state["paused"] and "inconnu" in state["breakpoint"]["error"]
@@ -0,0 +1,77 @@
+import os
+
+import pytest
+
+from backend.interpreter import files
+from backend.interpreter.evaluator import Evaluator
+from backend.interpreter.transpiler import CompiledEvaluator
+
+
+@pytest.fixture
+def root(tmp_path, monkeypatch):
+    data = tmp_path / "data"
+    data.mkdir()
+    (data / "notes.txt").write_text("a\r\nb\nc", encoding="utf-8", newline="")
+    (data / "people.csv").write_text('name,age\nann,31\n"bo, jr",7\n', encoding="utf-8")
+    (data / "events.jsonl").write_text('{"n": 1}\n\n[2, true]\n', encoding="utf-8")
+    monkeypatch.setattr(files, "DATA_ROOT", str(data))
+    return data
+
+
+@pytest.mark.parametrize("engine", [Evaluator, CompiledEvaluator])
+def test_readers(root, engine, run):
+    code = """
+for line in read_lines("notes.txt"):
+    print(line)
+for row in read_csv("people.csv"):
+    print(row)
+for p in read_csv("people.csv", true):
+    print(get(p, "name") + ":" + get(p, "age"))
+for e in read_jsonl("events.jsonl"):
+    print(e)
+"""
+    assert run(code, engine) == (
+        "a\nb\nc\n['name', 'age']\n['ann', '31']\n['bo, jr', '7']\n"
+        "ann:31\nbo, jr:7\n{'n': 1}\n[2, True]\n"
+    )
+
+
+def test_readers_are_lazy(root):
+    reader = files.Reader("notes.txt")
+    it = iter(reader)
+    assert next(it) == "a"
+    it.close()  # fichier refermé sans avoir été lu en entier
+    assert list(reader) == ["a", "b", "c"]  # chaque itération repart du début
+
+
+def test_writer_buffers_until_close(root, run):
+    code = """
+w = writer("out/result.txt")
+write_line(w, "total")
+write_row(w, ["a,b", 2])
+write_json(w, {"k": [1, 2]})
+"""
+    (root / "out").mkdir()
+    assert run(code + "close(w)\nwrite_line(w, 1)") == "! ValueError: Writer fermé : out/result.txt"
+    assert (root / "out" / "result.txt").read_text(encoding="utf-8") == 'total\n"a,b",2\n{"k": [1, 2]}\n'
+    w = files.Writer("big.txt")
+    w.line("x")
+    assert (root / "big.txt").read_text() == ""  # encore dans le tampon
+    w.close()
+    assert (root / "big.txt").read_text() == "x\n"
+
+
+def test_sandbox(root, tmp_path, monkeypatch, run):
+    (tmp_path / "secret.txt").write_text("s", encoding="utf-8")
+    os.symlink(tmp_path / "secret.txt", root / "link.txt")
+    for path in ("../secret.txt", str(tmp_path / "secret.txt"), "link.txt"):
+        assert "hors de la racine" in run(f'for x in read_lines("{path}"):\n    print(x)')
+    assert "Fichier introuvable" in run('read_lines("missing.txt")')
+    assert "hors de la racine" in run('writer("../out.txt")')
+    monkeypatch.setattr(files, "DATA_ROOT", None)
+    assert "Accès aux fichiers désactivé" in run('read_lines("notes.txt")')
+
+
+def test_invalid_json_line(root, run):
+    (root / "bad.jsonl").write_text('1\n{oops\n', encoding="utf-8")
+    assert run('for e in read_jsonl("bad.jsonl"):\n    print(e)').startswith("1\n! ValueError: JSON invalide (bad.jsonl, ligne 2)")
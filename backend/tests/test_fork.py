@@ -0,0 +1,111 @@
+from backend.api import app
+from backend.interpreter.runtime import make_runtime
+
+
+PRELUDE = """
+data = [1, 2, 3]
+table = {"a": [1]}
+def total(xs): return sum(xs) + len(data)
+"""
+
+
+def test_fork_shares_until_touched(run):
+    rt = make_runtime()
+    run(PRELUDE, rt=rt)
+    child = rt.fork()
+    assert child.global_env.bindings.base["data"] is rt.global_env.bindings.base["data"]
+
+    run("push(data, 4)\npush(table[\"a\"], 2)", rt=child)
+    assert run("print(data)\nprint(table)", rt=child).split("\n")[:2] == ["[1, 2, 3, 4]", "{'a': [1, 2]}"]
+    assert run("print(data)\nprint(table)", rt=rt).split("\n")[:2] == ["[1, 2, 3]", "{'a': [1]}"]
+
+
+def test_reads_do_not_copy(run):
+    rt = make_runtime()
+    run("big = [0] * 100000\nalias = big\nother = [big]", rt=rt)
+    child = rt.fork()
+    assert run("print(len(big))\nprint(other[0] == big)", rt=child) == "100000\nTrue\n"
+    bindings = child.global_env.bindings
+    assert bindings["big"] is bindings.base["big"] and not bindings.copies
+
+    run("push(alias, 1)", rt=child)  # une seule copie, partagée par les deux noms
+    assert bindings["big"] is bindings["alias"] is not bindings.base["big"]
+    assert run("print(len(big))", rt=child) == "100001\n"
+    assert run("print(len(big))", rt=rt) == "100000\n"
+
+
+def test_aliases_created_after_fork_follow_the_copy(run):
+    code = """box = [xs]
+d = {"k": xs}
+def keep():
+    return box
+push(xs, 2)
+print(box)
+print(d)
+print(keep()[0] == xs)
+"""
+    rt = make_runtime()
+    run("xs = [1]", rt=rt)
+    expected = run(code, rt=rt)
+    assert expected == "[[1, 2]]\n{'k': [1, 2]}\nTrue\n"
+
+    base = make_runtime()
+    run("xs = [1]", rt=base)
+    child = base.fork()
+    assert run(code, rt=child) == expected
+    assert child.cow is None
+    assert run("print(xs)", rt=base) == "[1]\n"
+
+
+def test_closures_are_rebound_to_the_fork(run):
+    rt = make_runtime()
+    run("""
+total = 0
+def make():
+    n = 0
+    def inc():
+        n = n + 1
+        total = total + n
+        return n
+    return inc
+counter = make()
+counter()
+""", rt=rt)
+    child = rt.fork()
+    assert run("print(counter())\nprint(counter())\nprint(total)", rt=child) == "2\n3\n6\n"
+    assert run("print(total)\nprint(counter())\nprint(total)", rt=rt) == "1\n2\n3\n"
+    assert run("print(map(counter, [0]))", rt=child) == "[4]\n"
+
+
+def test_parent_mutation_not_visible_in_fork(run):
+    rt = make_runtime()
+    run(PRELUDE, rt=rt)
+    child = rt.fork()
+    run("push(data, 99)\ndata2 = 1", rt=rt)
+    assert run("print(data)", rt=child).strip() == "[1, 2, 3]"
+
+
+def test_forked_functions_use_fork_globals(run):
+    rt = make_runtime()
+    run(PRELUDE, rt=rt)
+    child = rt.fork()
+    run("data = [0]", rt=child)
+    assert run("print(total([10]))", rt=child).strip() == "11"
+    assert run("print(total([10]))", rt=rt).strip() == "13"
+    assert run("print(map(total, [[1]]))", rt=child).strip() == "[2]"
+
+
+def test_repl_fork_endpoint():
+    client = app.test_client()
+    sid = client.post("/repl/init").get_json()["session_id"]
+    client.post("/repl/exec", json={"session_id": sid, "line": "x = 41"})
+
+    res = client.post("/repl/fork", json={"session_id": sid, "count": 2})
+    data = res.get_json()
+    assert res.status_code == 200 and len(data["session_ids"]) == 2
+    a, b = data["session_ids"]
+    client.post("/repl/exec", json={"session_id": a, "line": "x = x + 1"})
+    assert client.post("/repl/exec", json={"session_id": a, "line": "print(x)"}).get_json()["output"].strip() == "42"
+    assert client.post("/repl/exec", json={"session_id": b, "line": "print(x)"}).get_json()["output"].strip() == "41"
+
+    assert client.post("/repl/fork", json={"session_id": "nope"}).status_code == 400
@@ -0,0 +1,65 @@
+from backend.lexer import lexer
+from backend.parser import Parser
+
+
+def test_builtin_call_sites_hit(run):
+    code = """
+xs = []
+i = 0
+while i < 100:
+    push(xs, i)
+    i = i + 1
+print(len(xs))
+"""
+    out = run(code)
+    ev = run.ev
+    assert out == "100\n"
+    stats = ev.profile_stats()["inline_cache"]
+    assert stats["hits"] >= 99
+    assert stats["hit_rate"] > 0.9
+
+
+def test_rebinding_invalidates(run):
+    code = """
+def f():
+    return 1
+def g():
+    return 2
+out = []
+for i in [0, 1, 2]:
+    push(out, f())
+    f = g
+print(out)
+"""
+    out = run(code)
+    assert out == "[1, 2, 2]\n"
+
+
+def test_param_shadowing_invalidates(run):
+    code = """
+def one():
+    return 1
+def two():
+    return 2
+def call(one):
+    return one()
+print(one())
+print(call(two))
+print(one())
+"""
+    out = run(code)
+    assert out == "1\n2\n1\n"
+
+
+def test_call_sites_are_per_runtime(run):
+    run("def f():\n    return 1\nprint(f())")
+    a = run.ev
+    run("def g():\n    return 2\nprint(g())")
+    b = run.ev
+    assert "f" in a.rt.sites.watched and "f" not in b.rt.sites.watched
+    version = a.rt.sites.version
+    b.eval(Parser(lexer("f = 3\ng = 4")).parse())
+    assert a.rt.sites.version == version
+    out = run("len = 5\nprint(len)")
+    assert out == "5\n"
+    assert run("print(len([1, 2]))") == "2\n"
@@ -0,0 +1,111 @@
+import pytest
+
+from backend.interpreter.runtime import make_runtime
+from backend.interpreter.evaluator import Evaluator
+from backend.interpreter.scheduler import TaskEvaluator
+
+
+FIB = """
+def fib(n):
+    if n < 2:
+        return n
+    return fib(n - 1) + fib(n - 2)
+fib = memo(fib)
+"""
+
+
+def test_memo_fib(run):
+    out = run(FIB + "print(fib(60))\nprint(fib(60))\n")
+    rt = run.ev.rt
+    assert out == "1548008755920\n1548008755920\n"
+    stats = rt.memo.stats()
+    assert stats["misses"] == 61
+    assert stats["hits"] > 0
+
+
+def test_memo_lru_limit(run):
+    rt = make_runtime(memo_limit=8)
+    run(FIB + "x = fib(30)\n", rt=rt)
+    stats = rt.memo.stats()
+    assert stats["size"] == 8
+    assert stats["evictions"] > 0
+
+
+def test_memo_stats_builtin(run):
+    out = run(FIB + "x = fib(5)\ns = memo_stats()\nprint(s[\"misses\"])\n")
+    assert out == "6\n"
+
+
+@pytest.mark.parametrize("engine", [Evaluator, TaskEvaluator])
+def test_memo_key_keeps_argument_types(engine, run):
+    code = """
+def f(x):
+    return str(x)
+g = memo(f)
+print(g(true))
+print(g(1))
+print(g(1.0))
+print(g(true))
+"""
+    assert run(code, engine) == "True\n1\n1.0\nTrue\n"
+
+
+@pytest.mark.parametrize("body", [
+    "ys = [push(acc, i) for i in range(n)]",
+    "ys = [random() for i in range(n)]",
+    "ys = {i: 1 for i in range(n) if push(acc, i)}",
+    "ys = [i for i in range(n) if random() > 0]",
+])
+def test_memo_refuses_impure_comprehension(body, run):
+    code = f"""
+acc = []
+def f(n):
+    {body}
+    return n
+g = memo(f)
+"""
+    assert run(code).startswith("! ValueError")
+
+
+def test_memo_accepts_pure_comprehension(run):
+    out = run("""
+def f(n):
+    return sum([i * n for i in range(n) if i > 0])
+g = memo(f)
+print(g(3))
+""")
+    assert out == "9\n"
+
+
+def test_memo_refuses_impure(run):
+    code = """
+def noisy(n):
+    print(n)
+    return n
+noisy = memo(noisy)
+"""
+    assert run(code).startswith("! ValueError")
+
+
+def test_memo_refuses_transitively_impure(run):
+    code = """
+def roll(n):
+    return n + random()
+def outer(n):
+    return roll(n)
+outer = memo(outer)
+"""
+    assert run(code).startswith("! ValueError")
+
+
+def test_memo_non_strict(run):
+    code = """
+def noisy(n):
+    print(n)
+    return n
+noisy = memo(noisy, false)
+x = noisy(1)
+x = noisy(1)
+"""
+    out = run(code)
+    assert out == "1\n"
@@ -0,0 +1,56 @@
+from backend.api import app, STATEMENTS, SCRIPT_ERRORS
+from backend.metrics import Histogram, Counter
+
+
+def test_histogram_render_is_cumulative():
+    h = Histogram("t_seconds", "test", ["phase"], buckets=(0.1, 1.0))
+    for v in (0.05, 0.5, 0.5, 3.0):
+        h.observe(v, phase="eval")
+    text = "\n".join(h.render())
+    assert 't_seconds_bucket{phase="eval",le="0.1"} 1' in text
+    assert 't_seconds_bucket{phase="eval",le="1.0"} 3' in text
+    assert 't_seconds_bucket{phase="eval",le="+Inf"} 4' in text
+    assert 't_seconds_count{phase="eval"} 4' in text
+
+
+def test_counter_labels():
+    c = Counter("e_total", "test", ["type"])
+    c.inc(type="NameError")
+    c.inc(2, type="NameError")
+    assert c.value(type="NameError") == 3
+    assert 'e_total{type="NameError"} 3' in "\n".join(c.render())
+
+
+def test_metrics_endpoint():
+    client = app.test_client()
+    client.post("/run", json={"code": "x = 1\nprint(x + 1)"})
+    client.post("/run", json={"code": "print(inconnue)"})
+    client.post("/repl/init")
+
+    res = client.get("/metrics")
+    assert res.status_code == 200
+    assert res.mimetype == "text/plain"
+    text = res.get_data(as_text=True)
+    for phase in ("lex", "parse", "eval", "capture", "encode"):
+        assert f'microscript_phase_seconds_count{{phase="{phase}"}}' in text
+    assert 'microscript_script_errors_total{type="NameError",phase="eval"}' in text
+    assert 'microscript_sessions{kind="repl"}' in text
+    assert 'microscript_http_requests_total{endpoint="run_code",status="200"}' in text
+    assert "microscript_output_bytes_total" in text
+    statements = [l for l in text.splitlines() if l.startswith("microscript_statements_total ")]
+    assert statements and float(statements[0].split()[1]) >= 2
+
+
+def test_debug_commands_are_measured():
+    client = app.test_client()
+    before = STATEMENTS.value()
+    errors = SCRIPT_ERRORS.value(type="ZeroDivisionError", phase="eval")
+    sid = client.post("/debug/start", json={"code": "a = 1\nb = 2\nc = a / 0\n"}).get_json()["session_id"]
+    client.post("/debug/step", json={"session_id": sid})
+    client.post("/debug/back", json={"session_id": sid})
+    client.post("/debug/goto", json={"session_id": sid, "step": 2})
+    state = client.post("/debug/continue", json={"session_id": sid}).get_json()["state"]
+    assert state["error"]
+    client.post("/debug/channel", json={"session_id": sid, "commands": ["step"]})
+    assert STATEMENTS.value() - before == 3
+    assert SCRIPT_ERRORS.value(type="ZeroDivisionError", phase="eval") == errors + 1
@@ -0,0 +1,132 @@
+import os
+
+import pytest
+
+from backend.lexer import lexer
+from backend.parser import Parser
+from backend.ast_nodes import ImportStmt
+from backend.cli import main
+from backend.api import app
+from backend.interpreter import modules
+from backend.interpreter.evaluator import Evaluator
+from backend.interpreter.scheduler import TaskEvaluator
+from backend.interpreter.transpiler import CompiledEvaluator
+from backend.interpreter.debugger import Debugger
+
+MATHX = """TABLE = [1, 2, 3]
+PI = 3
+def square(n):
+    return n * n
+def grow():
+    push(TABLE, 9)
+    return len(TABLE)
+"""
+
+GEO = """import mathx
+def area(r):
+    return PI * square(r)
+"""
+
+
+@pytest.fixture
+def libdir(tmp_path, monkeypatch):
+    (tmp_path / "mathx.ms").write_text(MATHX, encoding="utf-8")
+    (tmp_path / "geo.ms").write_text(GEO, encoding="utf-8")
+    monkeypatch.setattr(modules, "SEARCH_PATH", [str(tmp_path)])
+    return tmp_path
+
+
+def test_parse_import():
+    stmt = Parser(lexer("import mathx")).parse().statements[0]
+    assert type(stmt) is ImportStmt and stmt.name == "mathx"
+
+
+@pytest.mark.parametrize("engine", [Evaluator, TaskEvaluator, CompiledEvaluator])
+def test_import_definitions(libdir, engine, run):
+    code = "import mathx\nimport geo\nprint(area(2))\nprint(map(square, [1, 2]))\nprint(PI)"
+    assert run(code, engine) == "12\n[1, 4]\n3\n"
+
+
+def test_modules_are_shared_and_read_only(libdir, run):
+    code = "import mathx\nprint(grow())\npush(TABLE, 4)\nprint(TABLE)\nPI = 10\nprint(PI)"
+    first = run(code)
+    assert first == "4\n[1, 2, 3, 9, 4]\n10\n"
+    assert run(code) == first  # aucun état ne fuit d'un programme à l'autre
+    module = modules.load("mathx")
+    assert module.values["TABLE"] == [1, 2, 3] and module.values["PI"] == 3
+
+
+def test_imports_are_not_transitive(libdir, run):
+    assert run("import geo\nprint(area(1))\nprint(square(2))") == "3\n! NameError: Variable non définie : square"
+
+
+def test_cache_by_path_and_mtime(libdir, run):
+    module = modules.load("mathx")
+    assert modules.load("mathx") is module
+    path = libdir / "mathx.ms"
+    path.write_text("PI = 4\n", encoding="utf-8")
+    os.utime(path, ns=(module.mtime + 10**9, module.mtime + 10**9))
+    assert modules.load("mathx") is not module
+    assert run("import mathx\nprint(PI)") == "4\n"
+
+
+def test_import_errors(libdir, run):
+    (libdir / "loop_a.ms").write_text("import loop_b\n", encoding="utf-8")
+    (libdir / "loop_b.ms").write_text("import loop_a\n", encoding="utf-8")
+    assert "Module introuvable : nope" in run("import nope")
+    assert "Import circulaire : loop_a" in run("import loop_a")
+
+
+def test_coverage_ignores_module_statements(libdir):
+    data = app.test_client().post("/run", json={"code": "import mathx\nprint(square(3))", "coverage": True}).get_json()
+    assert data["success"] and data["output"] == "9\n"
+    assert data["coverage"]["executed"] == [[1, 2]] and data["coverage"]["statements"] == 2
+
+
+def test_forks_get_their_own_modules(libdir):
+    client = app.test_client()
+    sid = client.post("/repl/init").get_json()["session_id"]
+
+    def repl(session, line):
+        return client.post("/repl/exec", json={"session_id": session, "line": line}).get_json()["output"]
+
+    assert repl(sid, "import mathx\nprint(grow())") == "4\n"
+    child = client.post("/repl/fork", json={"session_id": sid}).get_json()["session_id"]
+    assert repl(child, "print(grow())\nimport geo\nprint(area(2))\nprint(map(square, [3]))") == "5\n12\n[9]\n"
+    assert repl(sid, "print(TABLE)") == "[1, 2, 3, 9]\n"
+    assert "Variable non définie : area" in repl(sid, "print(area(2))")
+
+
+def test_cli_searches_script_directory(libdir, capsys):
+    script = libdir / "main.ms"
+    script.write_text("import geo\nimport mathx\nprint(area(3))\n", encoding="utf-8")
+    assert main(["run", str(script)]) == 0
+    assert capsys.readouterr().out == "27\n"
+
+
+def test_breakpoint_conditions_call_pure_module_functions(libdir):
+    code = """import mathx
+def total(xs):
+    return sum(map(square, xs))
+i = 0
+while i < 6:
+    i = i + 1
+print(i)
+"""
+    dbg = Debugger()
+    dbg.load_program(Parser(lexer(code)).parse())
+    dbg.set_breakpoints([{"line": 6, "condition": "square(i) + total([i]) == 32"}])
+    state = dbg.continue_()
+    assert state["paused"] and state["variables"]["i"] == 4
+    assert dbg.back()["variables"]["i"] == 3
+    assert dbg.run_to_end()["output"] == "6\n"
+
+    dbg = Debugger()
+    dbg.load_program(Parser(lexer(code)).parse())
+    dbg.set_breakpoints([{"line": 6, "log_message": "{square(i)}"}, {"line": 5, "condition": "grow() > 0"}])
+    state = dbg.continue_()
+    assert state["paused"] and "grow (appelle push)" in state["breakpoint"]["error"]
+    assert [log["message"] for log in dbg.logs] == []
+    state = dbg.continue_()
+    assert state["output"] == "6\n"
+    assert [log["message"] for log in state["logs"]] == ["0", "1", "4", "9", "16", "25"]
@@ -0,0 +1,175 @@
+import pytest
+
+from backend.lexer import lexer
+from backend.parser import Parser
+from backend.ast_nodes import Assign, FunctionDef, IfStmt, LoopInvariant, walk
+from backend.optimiser import optimise
+
+
+PROGRAMS = {
+    "invariant_len": """
+xs = [1, 2, 3]
+k = 4
+i = 0
+while i < len(xs):
+    print(xs[i] * k + len(xs))
+    i = i + 1
+""",
+    "mutated_in_loop": """
+xs = [1]
+i = 0
+while len(xs) < 5:
+    push(xs, i)
+    i = i + 1
+print(xs)
+""",
+    "aliased_mutation": """
+xs = [1, 2]
+ys = xs
+i = 0
+while i < 3:
+    push(ys, len(xs))
+    i = i + 1
+print(xs)
+""",
+    "error_in_untaken_branch": """
+d = 0
+i = 0
+while i < 3:
+    print(i)
+    if i > 5:
+        print(10 / d)
+    i = i + 1
+""",
+    "error_order_kept": """
+d = 0
+for v in [1, 2]:
+    print(v)
+    print(1 / d)
+""",
+    "shadowed_builtin": """
+def len(x):
+    print("appel")
+    return 2
+i = 0
+while i < len([1]):
+    i = i + 1
+""",
+    "random_not_moved": """
+n = 0
+seen = 0
+while n < 20:
+    if random() >= 0:
+        seen = seen + 1
+    n = n + 1
+print(seen)
+""",
+    "nested_loops": """
+xs = [1, 2, 3]
+total = 0
+for a in xs:
+    for b in xs:
+        total = total + a * b + len(xs)
+print(total)
+""",
+    "dead_code": """
+def unused(x):
+    return unused(x)
+if false:
+    print("non")
+elif 2 > 1:
+    print("oui")
+else:
+    print("non")
+while false:
+    print("non")
+x = 1 + 2 * 3
+print(x)
+""",
+    "unused_failing_name": """
+print("avant")
+x = nope
+""",
+    "unused_failing_call": """
+def f(v):
+    unused = len(v)
+    return 1
+print(f(5))
+""",
+    "unused_failing_division": """
+d = 0
+q = 1 / d
+print("après")
+""",
+}
+
+
+@pytest.mark.parametrize("name", sorted(PROGRAMS))
+def test_same_behaviour(name, run):
+    code = PROGRAMS[name]
+    assert run(code, optimised=True) == run(code)
+
+
+def test_dead_code_removed():
+    ast = optimise(Parser(lexer(PROGRAMS["dead_code"])).parse())
+    nodes = list(walk(ast))
+    assert not any(type(n) in (FunctionDef, IfStmt) for n in nodes)
+    assert repr(ast.statements[0]) == 'Print(String("oui"))'
+
+
+def test_unused_pure_assignment_removed_but_effects_kept():
+    ast = optimise(Parser(lexer("a = 1 + 2\nb = pop([1])\nc = [a]\nprint(3)")).parse())
+    assert [repr(s) for s in ast.statements] == [
+        "Assign(Variable(b), Call(pop, [Array([Number(1)])]))",
+        'Print(Number(3))',
+    ]
+
+
+def test_unused_assignment_kept_when_it_can_fail():
+    code = """y = 1
+def f(p):
+    a = p
+    b = y
+    c = z
+    return 0
+if y > 0:
+    z = 2
+w = z
+k = {"a": [y, len]}
+print(f(1))
+"""
+    ast = optimise(Parser(lexer(code)).parse())
+    kept = {n.target.name for n in walk(ast) if type(n) is Assign}
+    assert kept == {"y", "c", "z", "w"}
+
+
+def test_invariants_cached():
+    ast = optimise(Parser(lexer(PROGRAMS["invariant_len"])).parse())
+    hoisted = [n for n in walk(ast) if type(n) is LoopInvariant]
+    assert {repr(n.expr) for n in hoisted} == {"Call(len, [Variable(xs)])"}
+
+    ast = optimise(Parser(lexer(PROGRAMS["mutated_in_loop"])).parse())
+    assert not any(type(n) is LoopInvariant for n in walk(ast))
+    ast = optimise(Parser(lexer(PROGRAMS["aliased_mutation"])).parse())
+    assert not any(type(n) is LoopInvariant for n in walk(ast))
+
+
+def test_invariants_kept_out_of_bindings(run):
+    code = """
+def count(xs, n):
+    j = 0
+    while j < len(xs):
+        if n > 0:
+            count(xs, n - 1)
+        j = j + 1
+    return j
+xs = [1, 2]
+i = 0
+while i < len(xs) * 2:
+    i = i + 1
+print(count(xs, 2))
+"""
+    assert run(code, optimised=True) == "2\n"
+    rt = run.ev.rt
+    assert not [k for k in rt.global_env.to_dict_flat() if k.startswith("#")]
+    assert rt._invariants == {}
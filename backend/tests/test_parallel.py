@@ -0,0 +1,112 @@
+from backend.interpreter import parallel
+
+
+CODE = """
+offset = 3
+def sq(x):
+    return x * x
+def score(x):
+    return sq(x) + offset
+def add(a, b):
+    return a + b
+xs = []
+i = 0
+while i < 200:
+    push(xs, i)
+    i = i + 1
+ys = pmap(score, xs)
+total = preduce(add, ys, 0)
+"""
+
+
+def _expected():
+    ys = [x * x + 3 for x in range(200)]
+    return ys, sum(ys)
+
+
+def test_pmap_serial_fallback(run):
+    run(CODE)
+    rt = run.ev.rt
+    ys, total = _expected()
+    assert rt.global_env.get("ys") == ys
+    assert rt.global_env.get("total") == total
+
+
+def test_pmap_parallel(monkeypatch, run):
+    monkeypatch.setattr(parallel, "SERIAL_BUDGET", 0.0)
+    monkeypatch.setattr(parallel, "CHUNK_TARGET", 0.0)
+    run(CODE)
+    rt = run.ev.rt
+    ys, total = _expected()
+    assert rt.global_env.get("ys") == ys
+    assert rt.global_env.get("total") == total
+    assert parallel._POOL is not None
+    # le code expédié n'est sérialisé qu'une fois par fonction
+    score = rt.global_env.get("score")
+    key1, code1, _ = parallel._ship(score)
+    key2, code2, _ = parallel._ship(score)
+    assert key1 == key2 and code1 is code2
+
+
+def test_pmap_impure_function_stays_serial(monkeypatch, run):
+    monkeypatch.setattr(parallel, "SERIAL_BUDGET", 0.0)
+    monkeypatch.setattr(parallel, "CHUNK_TARGET", 0.0)
+    monkeypatch.setattr(parallel, "_POOL", None)
+    code = """
+def show(x):
+    print(x)
+    return x + 1
+print(pmap(show, range(20)))
+"""
+    out = run(code)
+    lines = out.splitlines()
+    assert lines[:20] == [str(i) for i in range(20)]
+    assert lines[20] == str(list(range(1, 21)))
+    assert parallel._POOL is None
+
+
+def test_pmap_impure_comprehension_stays_serial(monkeypatch, run):
+    monkeypatch.setattr(parallel, "SERIAL_BUDGET", 0.0)
+    monkeypatch.setattr(parallel, "CHUNK_TARGET", 0.0)
+    monkeypatch.setattr(parallel, "_POOL", None)
+    code = """
+acc = []
+def f(x):
+    ys = [push(acc, x) for i in range(1)]
+    return x
+print(pmap(f, range(20)))
+print(len(acc))
+"""
+    out = run(code)
+    assert out.splitlines()[-1] == "20"
+    assert parallel._POOL is None
+
+
+def test_worker_state_does_not_leak_between_calls(run):
+    code = """
+def f(x):
+    return x + k
+"""
+    run(code)
+    rt = run.ev.rt
+    fn = rt.global_env.get("f")
+    rt.global_env.set("k", 10)
+    key, code1, data = parallel._ship(fn)
+    assert parallel._worker_map(key, code1, data, [1, 2]) == [11, 12]
+    rt.global_env.set("k", 100)
+    key, code2, data = parallel._ship(fn)
+    assert code2 is code1
+    assert parallel._worker_map(key, code2, data, [1]) == [101]
+    ev1, _ = parallel._worker_fn(key, code2, data)
+    ev2, _ = parallel._worker_fn(key, code2, data)
+    assert ev1.rt is not ev2.rt
+
+
+def test_user_function_in_map_builtin(run):
+    code = """
+def double(x):
+    return x * 2
+print(map(double, [1, 2, 3]))
+"""
+    out = run(code)
+    assert out == "[2, 4, 6]\n"
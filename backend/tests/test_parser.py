@@ -1,6 +1,8 @@
+import pytest
+
 from backend.lexer import lexer
 from backend.parser import Parser
-from backend.ast_nodes import Assign, Variable, Number, BinaryOp
+from backend.ast_nodes import Assign, Variable, Number, BinaryOp, IfStmt, FunctionDef
 
 def test_simple_expression():
     code = "x = 2 + 3"
@@ -13,3 +15,41 @@ def test_simple_expression():
     assert isinstance(ast.statements[0].value.left, Number)
     assert isinstance(ast.statements[0].value.right, Number)
 
+
+def test_indented_blocks():
+    code = "def f(x):\n    if x > 1:\n        y = 1\n    else:\n        y = 2\n    return y\nz = f(3)\n"
+    ast = Parser(lexer(code)).parse()
+
+    assert len(ast.statements) == 2
+    fn = ast.statements[0]
+    assert isinstance(fn, FunctionDef)
+    assert len(fn.body) == 2
+    assert isinstance(fn.body[0], IfStmt)
+    assert len(fn.body[0].orelse) == 1
+    assert isinstance(ast.statements[1], Assign)
+
+
+def test_operator_precedence():
+    ast = Parser(lexer("x = 1 + 2 * 3 ** 2 ** 2 < 4 - -5")).parse()
+    assert repr(ast.statements[0].value) == (
+        "BinaryOp(BinaryOp(Number(1), '+', BinaryOp(Number(2), '*', "
+        "BinaryOp(Number(3), '**', BinaryOp(Number(2), '**', Number(2))))), '<', "
+        "BinaryOp(Number(4), '-', BinaryOp(Number(0), '-', Number(5))))"
+    )
+
+
+def test_deep_nesting():
+    code = "x = " + "(" * 200 + "1" + ")" * 200
+    ast = Parser(lexer(code)).parse()
+    assert isinstance(ast.statements[0].value, Number)
+
+    too_deep = "x = " + "(" * 100000 + "1" + ")" * 100000
+    with pytest.raises(SyntaxError):
+        Parser(lexer(too_deep)).parse()
+
+
+def test_statement_lines():
+    code = "x = 1\n\nif x:\n    y = (1 +\n        2)\nprint(y)\n"
+    ast = Parser(lexer(code)).parse()
+    assign, cond, out = ast.statements
+    assert (assign.line, cond.line, cond.body[0].line, out.line) == (1, 3, 4, 6)
@@ -0,0 +1,54 @@
+from backend.interpreter.evaluator import QUICKEN_MAX_DEOPTS
+
+
+def test_int_loop_sites_specialised(run):
+    code = """
+i = 0
+total = 0
+while i < 50:
+    total = total + i * 2
+    i = i + 1
+print(total)
+"""
+    out = run(code)
+    ev = run.ev
+    assert out == "2450\n"
+    stats = ev.profile_stats()["quickening"]
+    # i < 50, i * 2, i + 1 et total + ...
+    assert stats["specialised_sites"] == 4
+    assert stats["deopts"] == 0
+
+
+def test_deopt_on_type_change(run):
+    code = """
+def add(a, b):
+    return a + b
+print(add(1, 2))
+print(add(3, 4))
+print(add("a", "b"))
+print(add(1.5, 2))
+"""
+    out = run(code)
+    ev = run.ev
+    assert out.splitlines() == ["3", "7", "ab", "3.5"]
+    assert ev.profile_stats()["quickening"]["deopts"] == 1
+
+
+def test_megamorphic_site_stays_generic(run):
+    code = """
+def add(a, b):
+    return a + b
+for v in [1, 1, "a", "a", 1.0, 1.0, 2, 2, "b", "b", 3.0, 3.0, 4, 4]:
+    add(v, v)
+print(add("x", "y"))
+"""
+    out = run(code)
+    ev = run.ev
+    assert out == "xy\n"
+    assert ev.profile_stats()["quickening"]["deopts"] == QUICKEN_MAX_DEOPTS
+    assert ev.profile_stats()["quickening"]["specialised_sites"] == 0
+
+
+def test_string_concat_semantics_kept(run):
+    out = run('x = 1\nprint("n=" + str(x) + "!")\nprint(2 * "ab" == "abab")')
+    assert out.splitlines() == ["n=1!", "True"]
@@ -0,0 +1,37 @@
+from backend.interpreter.runtime import make_runtime
+
+
+def test_enter_leave_recycles_env_and_frame():
+    rt = make_runtime()
+    env = rt.enter_function("f", ["a", "b"], [1, 2], rt.global_env)
+    assert env.bindings == {"a": 1, "b": 2}
+    rt.leave_function()
+    again = rt.enter_function("g", ["x"], [3], rt.global_env)
+    assert again is env
+    assert again.bindings == {"x": 3}
+    assert rt.stack.top().func_name == "g"
+    rt.leave_function()
+
+
+def test_arity_mismatch_falls_back_to_zip():
+    rt = make_runtime()
+    env = rt.enter_function("f", ["a", "b", "c"], [1], rt.global_env)
+    assert env.bindings == {"a": 1}
+    rt.leave_function()
+
+
+def test_captured_env_is_not_recycled(run):
+    code = """
+def make(n):
+    def get():
+        return n
+    return get
+a = make(1)
+b = make(2)
+print(a())
+print(b())
+"""
+    out = run(code)
+    rt = run.ev.rt
+    assert out == "1\n2\n"
+    assert all(not e.escaped for e in rt._env_pool)
@@ -0,0 +1,54 @@
+import time
+
+from backend.interpreter.scheduler import Scheduler
+
+
+def test_sleeping_scripts_interleave():
+    sched = Scheduler()
+    code = """
+def tick(n):
+    sleep(0.02)
+    print(n)
+i = 0
+while i < 3:
+    tick(i)
+    i = i + 1
+"""
+    tasks = [sched.spawn(code) for _ in range(50)]
+    t0 = time.monotonic()
+    sched.run()
+    elapsed = time.monotonic() - t0
+    assert all(t.done and t.error is None for t in tasks)
+    assert all(t.output == "0\n1\n2\n" for t in tasks)
+    # 50 tâches x 3 sommeils de 20 ms : en parallèle, pas en série (3 s)
+    assert elapsed < 1.0
+
+
+def test_busy_task_does_not_starve_others():
+    sched = Scheduler(quantum=10)
+    busy = sched.spawn("i = 0\nwhile i < 100000:\n    i = i + 1\n")
+    quick = sched.spawn("print(\"done\")")
+    while not quick.done:
+        sched.step()
+    assert not busy.done
+    sched.run()
+    assert busy.done
+
+
+def test_input_waits_for_feed():
+    sched = Scheduler()
+    task = sched.spawn("name = input(\"?\")\nprint(\"hi \" + name)")
+    sched.run()
+    assert not task.done
+    sched.feed(task, "bob")
+    sched.run()
+    assert task.output == "hi bob\n"
+
+
+def test_errors_stay_in_task():
+    sched = Scheduler()
+    bad = sched.spawn("print(nope)")
+    good = sched.spawn("print(1)")
+    sched.run()
+    assert bad.error and "nope" in bad.error
+    assert good.output == "1\n"
@@ -0,0 +1,41 @@
+from backend.interpreter.values import StringBuilder
+
+
+def test_accumulate_uses_builder(run):
+    code = """
+s = ""
+for i in [0, 1, 2, 3, 4]:
+    s = s + i
+"""
+    run(code)
+    rt = run.ev.rt
+    raw = rt.global_env.bindings["s"]
+    assert isinstance(raw, StringBuilder) and raw.implicit
+    assert rt.global_env.to_dict_flat()["s"] == "01234"
+
+
+def test_accumulate_is_not_aliased(run):
+    code = """
+s = "a"
+t = s
+s = s + "b"
+print(t)
+print(s)
+print(len(s))
+print(s[1])
+"""
+    out = run(code)
+    assert out == "a\nab\n2\nb\n"
+
+
+def test_explicit_builder(run):
+    code = """
+b = builder("x")
+append(b, 1, "y")
+print(b)
+print(len(b))
+print(b[2])
+print(type(b))
+"""
+    out = run(code)
+    assert out == "x1y\n3\ny\nbuilder\n"
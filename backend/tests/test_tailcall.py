@@ -0,0 +1,46 @@
+def test_deep_tail_recursion(run):
+    code = """
+def count(n, acc):
+    if n == 0:
+        return acc
+    return count(n - 1, acc + 1)
+print(count(20000, 0))
+"""
+    out = run(code)
+    rt = run.ev.rt
+    assert out == "20000\n"
+    assert rt.stack.elided == 20000
+    assert rt.stack.top() is None
+
+
+def test_non_tail_recursion_still_works(run):
+    code = """
+def fact(n):
+    if n < 2:
+        return 1
+    return n * fact(n - 1)
+print(fact(10))
+"""
+    out = run(code)
+    rt = run.ev.rt
+    assert out == "3628800\n"
+    assert rt.stack.elided == 0
+
+
+def test_tail_call_keeps_closures_distinct(run):
+    code = """
+def build(n, acc):
+    def get():
+        return n
+    acc = acc + [get]
+    if n == 0:
+        return acc
+    return build(n - 1, acc)
+fs = build(2, [])
+f0 = fs[0]
+f2 = fs[2]
+print(f0())
+print(f2())
+"""
+    out = run(code)
+    assert out == "2\n0\n"
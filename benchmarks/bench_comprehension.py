@@ -0,0 +1,76 @@
+"""
+Benchmark des compréhensions : construction d'une liste (ou d'un dict) par
+`[f(x) for x in xs]` face à la boucle `for` + `push` équivalente, pour les
+deux moteurs. Affiche le débit en éléments par seconde et le gain.
+
+    python -m benchmarks.bench_comprehension --size 20000
+"""
+import argparse
+import io
+from contextlib import redirect_stdout
+
+from backend.lexer import lexer
+from backend.parser import Parser
+from backend.interpreter.runtime import make_runtime
+from benchmarks.bench_suite import ENGINES, measure
+
+SETUP = "xs = range({size})\n"
+
+# (nom, boucle push, compréhension) : même résultat affiché
+CASES = [
+    ("map", """out = []
+for x in xs:
+    push(out, x * 2)
+print(len(out))
+""", """out = [x * 2 for x in xs]
+print(len(out))
+"""),
+    ("filter", """out = []
+for x in xs:
+    if x % 3 == 0:
+        push(out, x + 1)
+print(len(out))
+""", """out = [x + 1 for x in xs if x % 3 == 0]
+print(len(out))
+"""),
+    ("dict", """out = {}
+for x in xs:
+    setdefault(out, x, x * x)
+print(len(out))
+""", """out = {x: x * x for x in xs}
+print(len(out))
+"""),
+]
+
+
+def run(size: int, warmup: int, repeat: int, engine: str) -> list:
+    rows = []
+    for name, loop, comp in CASES:
+        times = []
+        for code in (loop, comp):
+            ast = Parser(lexer(SETUP.format(size=size) + code)).parse()
+
+            def once():
+                with redirect_stdout(io.StringIO()):
+                    ENGINES[engine](make_runtime()).eval(ast)
+
+            times.append(measure(once, warmup, repeat)["median"])
+        rows.append((name, size / times[0] * 1000, size / times[1] * 1000, times[0] / times[1]))
+    return rows
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--size", type=int, default=20000)
+    ap.add_argument("--warmup", type=int, default=2)
+    ap.add_argument("--repeat", type=int, default=7)
+    args = ap.parse_args()
+
+    print(f"{'moteur':<9} {'cas':<7} {'push (élts/s)':>15} {'compr. (élts/s)':>16} {'gain':>6}")
+    for engine in sorted(ENGINES, reverse=True):
+        for name, loop, comp, gain in run(args.size, args.warmup, args.repeat, engine):
+            print(f"{engine:<9} {name:<7} {loop:15,.0f} {comp:16,.0f} {gain:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
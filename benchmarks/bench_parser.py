@@ -0,0 +1,73 @@
+"""
+Benchmark du parser : débit (Mo/s) sur un programme généré et profondeur
+d'imbrication maximale avant erreur de récursion.
+
+    python -m benchmarks.bench_parser
+"""
+import argparse
+import time
+
+from backend.lexer import lexer
+from backend.parser import Parser
+
+LINE = "x{i} = (a + {i}) * b - c / 2 ** 2 + f(1, [2, 3])[0] >= -d % 7\n"
+
+
+def make_program(n_lines: int) -> str:
+    return "".join(LINE.format(i=i) for i in range(n_lines))
+
+
+def throughput(n_lines: int, repeat: int) -> dict:
+    src = make_program(n_lines)
+    tokens = lexer(src)
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        Parser(tokens).parse()
+        best = min(best, time.perf_counter() - t0)
+    size_mb = len(src.encode()) / 1e6
+    return {"bytes": len(src), "tokens": len(tokens), "seconds": best, "mb_per_s": size_mb / best}
+
+
+def _parses(src: str) -> bool:
+    try:
+        Parser(lexer(src)).parse()
+        return True
+    except (RecursionError, SyntaxError):
+        return False
+
+
+def max_depth(make, hi: int = 1 << 16) -> int:
+    """Plus grande profondeur n telle que make(n) se parse (recherche dichotomique)."""
+    lo = 0
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if _parses(make(mid)):
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+SHAPES = {
+    "parens": lambda n: "x = " + "(" * n + "1" + ")" * n,
+    "right_add": lambda n: "x = " + "1 + (" * n + "1" + ")" * n,
+    "unary": lambda n: "x = " + "-" * n + "1",
+    "power": lambda n: "x = " + "2 ** " * n + "1",
+}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--lines", type=int, default=5000)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    r = throughput(args.lines, args.repeat)
+    print(f"débit     : {r['mb_per_s']:.2f} Mo/s ({r['bytes']} octets, {r['tokens']} tokens, {r['seconds'] * 1000:.1f} ms)")
+    for name, make in SHAPES.items():
+        print(f"profondeur {name:<10}: {max_depth(make)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark de l'ordonnanceur coopératif : N scripts qui dorment en boucle sur
+un seul thread. Mesure le débit (tâches et tranches par seconde) et la
+mémoire par tâche (tracemalloc).
+
+    python -m benchmarks.bench_scheduler --tasks 2000
+"""
+import argparse
+import time
+import tracemalloc
+
+from backend.lexer import lexer
+from backend.parser import Parser
+from backend.interpreter.scheduler import Scheduler
+
+SCRIPT = """
+i = 0
+total = 0
+while i < {loops}:
+    sleep({delay})
+    total = total + i
+    i = i + 1
+print(total)
+"""
+
+
+def run(n_tasks: int, loops: int, delay: float) -> dict:
+    ast = Parser(lexer(SCRIPT.format(loops=loops, delay=delay))).parse()
+    sched = Scheduler()
+
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    tasks = [sched.spawn(ast) for _ in range(n_tasks)]
+    # une tranche par tâche : toutes sont démarrées et endormies
+    for _ in range(n_tasks):
+        sched.step()
+    per_task = (tracemalloc.get_traced_memory()[0] - base) / n_tasks
+    tracemalloc.stop()
+
+    t0 = time.perf_counter()
+    sched.run()
+    elapsed = time.perf_counter() - t0
+    assert all(t.done and t.error is None for t in tasks)
+    return {
+        "tasks": n_tasks,
+        "seconds": elapsed,
+        "ideal_seconds": loops * delay,
+        "tasks_per_s": n_tasks / elapsed,
+        "slices_per_s": sched.slices / elapsed,
+        "bytes_per_task": per_task,
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--tasks", type=int, default=2000)
+    ap.add_argument("--loops", type=int, default=5)
+    ap.add_argument("--delay", type=float, default=0.05)
+    args = ap.parse_args()
+
+    r = run(args.tasks, args.loops, args.delay)
+    print(f"tâches      : {r['tasks']}")
+    print(f"durée       : {r['seconds']:.2f} s (idéal {r['ideal_seconds']:.2f} s)")
+    print(f"débit       : {r['tasks_per_s']:.0f} tâches/s, {r['slices_per_s']:.0f} tranches/s")
+    print(f"mémoire     : {r['bytes_per_task'] / 1024:.1f} Kio par tâche")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Budget de démarrage : import à froid (processus neuf), coût de création d'un
+runtime, et détail `python -X importtime` des modules les plus lents.
+Sort en erreur si un budget est dépassé.
+
+    python -m benchmarks.bench_startup --top 15
+"""
+import argparse
+import subprocess
+import sys
+import time
+import timeit
+
+# budgets (millisecondes au-dessus d'un `python -c pass`, microsecondes par runtime)
+BUDGETS = {
+    "cold_runtime_ms": 40.0,   # worker : lexer + parser + évaluateur + stdlib
+    "cold_batch_ms": 80.0,     # worker de /run/batch
+    "cold_api_ms": 250.0,      # API complète (Flask compris)
+    "runtime_us": 5.0,         # make_runtime()
+}
+
+COLD = {
+    "cold_runtime_ms": "import backend.interpreter.evaluator, backend.parser",
+    "cold_batch_ms": "import backend.batch",
+    "cold_api_ms": "import backend.api",
+}
+
+
+def cold_start(stmt: str, repeat: int) -> float:
+    """Meilleur temps (ms) d'un processus neuf exécutant stmt."""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, "-c", stmt], check=True)
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def import_profile(module: str, top: int):
+    """(cumulé µs, module) des `top` imports les plus coûteux, via -X importtime."""
+    res = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in res.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), name.strip()))
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+def runtime_cost(number: int) -> float:
+    from backend.interpreter.runtime import make_runtime
+
+    best = min(timeit.repeat(make_runtime, number=number, repeat=5))
+    return best / number * 1e6
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--top", type=int, default=10)
+    ap.add_argument("--module", default="backend.api", help="module profilé avec -X importtime")
+    args = ap.parse_args()
+
+    base = cold_start("pass", args.repeat)
+    results = {name: cold_start(stmt, args.repeat) - base for name, stmt in COLD.items()}
+    results["runtime_us"] = runtime_cost(20000)
+
+    print(f"python nu   : {base:.1f} ms")
+    over = []
+    for name, value in results.items():
+        budget = BUDGETS[name]
+        status = "ok" if value <= budget else "DÉPASSÉ"
+        if value > budget:
+            over.append(name)
+        print(f"{name:<16}: {value:8.2f} (budget {budget:g}) {status}")
+
+    print(f"\n-X importtime {args.module} (cumulé) :")
+    for cumulative, name in import_profile(args.module, args.top):
+        print(f"  {cumulative / 1000:8.2f} ms  {name}")
+
+    if over:
+        sys.exit(f"budget dépassé : {', '.join(over)}")
+
+
+if __name__ == "__main__":
+    main()
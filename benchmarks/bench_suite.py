@@ -0,0 +1,177 @@
+"""
+Suite de référence : charges MicroScript canoniques (benchmarks/workloads/*.ms),
+chronométrées séparément pour le lexing, le parsing et l'évaluation.
+
+Chaque phase est échauffée puis répétée ; on garde min, médiane, moyenne et
+écart-type. Les résultats s'enregistrent en JSON (--out) et peuvent être
+comparés à une exécution précédente (--baseline) : une médiane plus lente
+de plus de --threshold est signalée comme régression (code de sortie 1).
+
+    python -m benchmarks.bench_suite --out base.json
+    python -m benchmarks.bench_suite --baseline base.json --threshold 0.1
+    python -m benchmarks.bench_suite --engine compiled --baseline base.json
+
+`--engine compiled` mesure le moteur par transpilation vers Python ; le code
+compilé est mis en cache sur l'AST dès l'échauffement, `eval` n'en mesure
+donc que l'exécution.
+"""
+import argparse
+import gc
+import io
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from backend.lexer import lexer
+from backend.parser import Parser
+from backend.interpreter.runtime import make_runtime
+from backend.interpreter.evaluator import Evaluator
+from backend.interpreter.transpiler import CompiledEvaluator
+
+WORKLOADS = Path(__file__).parent / "workloads"
+PHASES = ("lex", "parse", "eval")
+ENGINES = {"tree": Evaluator, "compiled": CompiledEvaluator}
+MIN_SAMPLE = 0.002  # lex/parse sont répétés en boucle jusqu'à ~2 ms par mesure
+
+
+def _calibrate(fn: Callable[[], Any]) -> int:
+    """Nombre d'appels par mesure pour que chaque mesure dure au moins MIN_SAMPLE."""
+    number = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        if time.perf_counter() - t0 >= MIN_SAMPLE or number >= 1 << 16:
+            return number
+        number *= 2
+
+
+def measure(fn: Callable[[], Any], warmup: int, repeat: int, number: int = 1) -> Dict[str, float]:
+    """Statistiques (ms par appel) de `repeat` mesures de `number` appels."""
+    for _ in range(warmup):
+        fn()
+    samples: List[float] = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()  # comme timeit : le ramasse-miettes ajoute surtout du bruit
+    try:
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            for _ in range(number):
+                fn()
+            samples.append((time.perf_counter() - t0) / number * 1000)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return {
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "runs": repeat,
+    }
+
+
+def bench_workload(code: str, warmup: int, repeat: int, engine: str = "tree") -> Dict[str, Dict[str, float]]:
+    tokens = lexer(code)
+    ast = Parser(tokens).parse()
+
+    def lex():
+        lexer(code)
+
+    def parse():
+        Parser(tokens).parse()
+
+    def run():
+        # runtime neuf à chaque exécution, sortie du script ignorée
+        with redirect_stdout(io.StringIO()):
+            ENGINES[engine](make_runtime()).eval(ast)
+
+    return {
+        "lex": measure(lex, warmup, repeat, _calibrate(lex)),
+        "parse": measure(parse, warmup, repeat, _calibrate(parse)),
+        "eval": measure(run, warmup, repeat),
+    }
+
+
+def _commit() -> Optional[str]:
+    try:
+        res = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5)
+        return res.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def run_suite(names: List[str], warmup: int, repeat: int, engine: str = "tree") -> Dict[str, Any]:
+    results = {}
+    for name in names:
+        code = (WORKLOADS / f"{name}.ms").read_text(encoding="utf-8")
+        results[name] = bench_workload(code, warmup, repeat, engine)
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": _commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "warmup": warmup,
+            "repeat": repeat,
+            "engine": engine,
+        },
+        "results": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Régressions (médiane plus lente de plus de threshold) par rapport à baseline."""
+    regressions = []
+    for name, phases in current["results"].items():
+        old = baseline.get("results", {}).get(name)
+        if old is None:
+            continue
+        for phase in PHASES:
+            before, after = old[phase]["median"], phases[phase]["median"]
+            if before > 0 and after / before - 1 > threshold:
+                regressions.append(f"{name}/{phase} : {before:.3f} -> {after:.3f} ms (+{(after / before - 1) * 100:.0f} %)")
+    return regressions
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("workloads", nargs="*", help="sous-ensemble de charges (par défaut : toutes)")
+    ap.add_argument("--warmup", type=int, default=2)
+    ap.add_argument("--repeat", type=int, default=7)
+    ap.add_argument("--engine", choices=sorted(ENGINES), default="tree")
+    ap.add_argument("--out", help="fichier JSON où enregistrer les résultats")
+    ap.add_argument("--baseline", help="résultats JSON de référence à comparer")
+    ap.add_argument("--threshold", type=float, default=0.10, help="seuil de régression (0.10 = +10 %%)")
+    args = ap.parse_args()
+
+    names = args.workloads or sorted(p.stem for p in WORKLOADS.glob("*.ms"))
+    report = run_suite(names, args.warmup, args.repeat, args.engine)
+
+    print(f"{'charge':<14} {'phase':<6} {'médiane':>10} {'min':>10} {'σ':>8}  (ms)")
+    for name, phases in report["results"].items():
+        for phase in PHASES:
+            s = phases[phase]
+            print(f"{name:<14} {phase:<6} {s['median']:10.3f} {s['min']:10.3f} {s['stdev']:8.3f}")
+
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"\nrégressions (> {args.threshold * 100:.0f} %) :")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\naucune régression au-delà de {args.threshold * 100:.0f} %")
+
+
+if __name__ == "__main__":
+    main()
@@ -183,12 +183,45 @@ setStatus("Prêt");
 
 const DebugAPI = {
     sid: null,
+    version: 0,     // dernière version d'état reçue du canal
+    view: null,     // état complet reconstruit à partir des deltas
     async start(code, breakpoints = []) {
         const { ok, data } = await postJSON(`${API_URL}/debug/start`, { code, breakpoints }, { timeout: 15000 });
         if (!ok || data.error) throw new Error(data.error || "Erreur debug/start");
         this.sid = data.session_id;
+        this.version = data.version;
+        this.view = data.state;
         return data.state;
     },
+    _merge({ version, delta }) {
+        const { variables, ...rest } = delta;
+        const view = Object.assign(this.view || {}, rest);
+        if (variables) {
+            view.variables = Object.assign({}, view.variables, variables.set);
+            for (const name of variables.unset) delete view.variables[name];
+        }
+        this.version = version;
+        this.view = view;
+        return view;
+    },
+    // commandes en rafale : send("step 50"), send("run to line 12", "step")...
+    async send(...commands) {
+        if (!this.sid) throw new Error("Aucune session debug");
+        const { ok, data } = await postJSON(`${API_URL}/debug/channel`, { session_id: this.sid, commands, since: this.version });
+        if (!ok || data.error) throw new Error(data.error || "Erreur debug/channel");
+        return this._merge(data);
+    },
+    // long-poll : se résout au prochain changement d'état (ou après `timeout` s)
+    async poll(timeout = 25) {
+        if (!this.sid) throw new Error("Aucune session debug");
+        const url = new URL(`${API_URL}/debug/channel`);
+        url.searchParams.set("session_id", this.sid);
+        url.searchParams.set("since", this.version);
+        url.searchParams.set("timeout", timeout);
+        const res = await fetch(url.toString()).then(r => r.json());
+        if (res.error) throw new Error(res.error);
+        return this._merge(res);
+    },
     async setBreakpoints(lines = []) {
         if (!this.sid) throw new Error("Aucune session debug");
         const { ok, data } = await postJSON(`${API_URL}/debug/set_breakpoints`, { session_id: this.sid, breakpoints: lines });
@@ -201,6 +234,30 @@ const DebugAPI = {
         if (!ok || data.error) throw new Error(data.error || "Erreur debug/step");
         return data.state;
     },
+    async watch(name) {
+        if (!this.sid) throw new Error("Aucune session debug");
+        const { ok, data } = await postJSON(`${API_URL}/debug/watch`, { session_id: this.sid, name });
+        if (!ok || data.error) throw new Error(data.error || "Erreur debug/watch");
+        return data.watches;
+    },
+    async unwatch(name) {
+        if (!this.sid) throw new Error("Aucune session debug");
+        const { ok, data } = await postJSON(`${API_URL}/debug/unwatch`, { session_id: this.sid, name });
+        if (!ok || data.error) throw new Error(data.error || "Erreur debug/unwatch");
+        return data.watches;
+    },
+    async back() {
+        if (!this.sid) throw new Error("Aucune session debug");
+        const { ok, data } = await postJSON(`${API_URL}/debug/back`, { session_id: this.sid });
+        if (!ok || data.error) throw new Error(data.error || "Erreur debug/back");
+        return data.state;
+    },
+    async goto(step) {
+        if (!this.sid) throw new Error("Aucune session debug");
+        const { ok, data } = await postJSON(`${API_URL}/debug/goto`, { session_id: this.sid, step });
+        if (!ok || data.error) throw new Error(data.error || "Erreur debug/goto");
+        return data.state;
+    },
     async cont() {
         if (!this.sid) throw new Error("Aucune session debug");
         const { ok, data } = await postJSON(`${API_URL}/debug/continue`, { session_id: this.sid });